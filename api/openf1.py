@@ -1,67 +1,315 @@
+import atexit
+import contextlib
+import contextvars
+import functools
 import logging
-import requests
-import pandas as pd
-from urllib.parse import urlencode
-from datetime import timedelta
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from urllib.parse import urlencode
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 
 from config import (
+    API_CHUNK_TARGET_ROWS,
+    API_CONNECT_TIMEOUT,
+    API_MAX_ITEMS,
     API_MAX_RETRIES,
+    API_MAX_WORKERS,
+    API_POOL_BLOCK,
+    API_POOL_CONNECTIONS,
+    API_POOL_MAXSIZE,
+    API_RATE_LIMIT_PER_SECOND,
     API_RETRY_BACKOFF_SECONDS,
+    API_STREAM_CHUNK_BYTES,
+    API_STREAM_CHUNK_ROWS,
     API_TIMEOUT,
     BASE_URL,
+    CACHE_REFRESH_MAX_WORKERS,
+    CACHE_STALE_WHILE_REVALIDATE,
     DEFAULT_LAP_DURATION_MINUTES,
     MAX_DRIVER_NUMBER,
     MAX_MEETING_KEY,
     MAX_SESSION_KEY,
     MIN_SUPPORTED_YEAR,
+    TELEMETRY_FULL_SESSION,
+)
+from api.schemas import apply_schema
+from utils import circuit_breaker, file_lock, interval_cache, memory_cache, rate_limit, single_flight, telemetry_store
+from utils.cache import (
+    cache_expires_at,
+    cache_ttl_hours,
+    columns_expires_at,
+    conditional_headers,
+    get_cache_key,
+    has_remote_backend,
+    is_negative_cached,
+    load_columns,
+    load_frame,
+    load_frames,
+    load_validators,
+    pin_entry,
+    record_stale_served,
+    refresh_cache,
+    register_meeting_end,
+    register_session_end,
+    response_validators,
+    save_columns,
+    save_frame,
+    save_negative,
+    touch_entry,
+    warm_entries,
 )
-from utils.cache import get_cache_key, load_from_cache, save_to_cache
+from utils.json_stream import iter_frames, iter_json_array
 from utils.security import coerce_int
+from utils.telemetry import timestamp_to_ns
 
 logger = logging.getLogger(__name__)
 
-logger = logging.getLogger(__name__)
+_http_session: requests.Session | None = None
+_http_session_lock = threading.Lock()
+
+_http_stats_lock = threading.Lock()
+_http_stats = {"requests": 0, "bytes": 0, "errors": 0}
+
+_refresh_lock = threading.Lock()
+_refresh_executor: ThreadPoolExecutor | None = None
+_refreshing: set[str] = set()
+
 
+def _get_http_session() -> requests.Session:
+    """Restituisce il client HTTP condiviso con connessioni keep-alive riutilizzate per host."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=API_POOL_CONNECTIONS,
+                    pool_maxsize=API_POOL_MAXSIZE,
+                    pool_block=API_POOL_BLOCK,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
 
-def _build_dataframe(data, required_columns: list[str]) -> pd.DataFrame:
-    """Converte il payload API in DataFrame garantendo le colonne richieste."""
+
+def close_http_session() -> None:
+    """Chiude il client HTTP condiviso e le connessioni nel pool."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+atexit.register(close_http_session)
+
+
+def _build_dataframe(data, endpoint: str, required_columns: list[str] | None = None) -> pd.DataFrame:
+    """Converte il payload API in DataFrame con i dtype compatti dell'endpoint e le colonne richieste."""
     if not data:
         return pd.DataFrame()
 
-    df = pd.DataFrame(data)
-    for col in required_columns:
-        if col not in df.columns:
-            df[col] = None
+    df = _ensure_columns(pd.DataFrame(data), required_columns)
+    return apply_schema(df, endpoint)
+
+
+def _ensure_columns(df: pd.DataFrame, required_columns: list[str] | None) -> pd.DataFrame:
+    """Aggiunge le colonne mancanti senza modificare ``df``, che può essere condiviso tra chiamanti."""
+    if df.empty:
+        return pd.DataFrame()
+    missing = [col for col in required_columns or [] if col not in df.columns]
+    if missing:
+        df = df.assign(**{col: None for col in missing})
     return df
 
 
-def _fetch_json(endpoint: str, params: dict | None = None, cache_suffix: str | None = None):
-    """Recupera un endpoint OpenF1 usando cache file-based."""
-    params = params or {}
-    sanitized_params = {key: value for key, value in params.items() if value is not None}
+def _sanitize_params(params: dict | None) -> dict:
+    return {key: value for key, value in (params or {}).items() if value is not None}
+
+
+def _fetch_frame(
+    endpoint: str, params: dict | None = None, cache_suffix: str | None = None, pin: bool = False
+) -> pd.DataFrame:
+    """Recupera un endpoint OpenF1 come DataFrame tipizzato usando la cache file-based colonnare.
+
+    Le richieste concorrenti per la stessa chiave di cache vengono coalescite:
+    una sola va upstream e le altre ne condividono il risultato (tra processi
+    diversi tramite il lock per chiave di ``utils/file_lock.py``). I 404 e le
+    risposte vuote vengono salvati come voci negative a breve scadenza. Le
+    voci del vecchio formato JSON vengono convertite alla prima lettura.
+    Con ``pin`` la voce è protetta dall'eviction della cache su disco.
+    """
+    sanitized_params = _sanitize_params(params)
     cache_key = get_cache_key(endpoint, **sanitized_params, cache_suffix=cache_suffix or "base")
-    cached_data = load_from_cache(cache_key)
-    if cached_data is not None:
-        return cached_data
+    if pin:
+        pin_entry(cache_key)
+    ttl_hours = cache_ttl_hours(endpoint, sanitized_params)
+    cached = _load_cached_frame(endpoint, cache_key, ttl_hours)
+    if cached is not None:
+        return cached
+    if is_negative_cached(cache_key):
+        return pd.DataFrame()
+    migrate = functools.partial(_build_dataframe, endpoint=endpoint)
+
+    def load():
+        with file_lock.key_lock(cache_key):
+            # Un altro thread o worker potrebbe aver appena riempito la cache
+            cached = _load_cached_frame(endpoint, cache_key, ttl_hours)
+            if cached is not None:
+                return cached
+            if is_negative_cached(cache_key):
+                return pd.DataFrame()
+            df = _download_frame(endpoint, sanitized_params, cache_suffix, cache_key)
+            if df is None or df.empty:
+                save_negative(cache_key, "not_found" if df is None else "empty")
+                return pd.DataFrame()
+        memory_cache.put(cache_key, df, cache_expires_at(cache_key, ttl_hours))
+        return df
+
+    if CACHE_STALE_WHILE_REVALIDATE:
+        stale = load_frame(cache_key, None, migrate)
+        if stale is not None:
+            # Voce scaduta: la si serve subito e la si aggiorna in background
+            record_stale_served(cache_key)
+            _refresh_in_background(cache_key, load)
+            return stale
+
+    return single_flight.do(cache_key, load)
+
+
+def _load_cached_frame(endpoint: str, cache_key: str, ttl_hours: float | None) -> pd.DataFrame | None:
+    """Voce valida dal livello in memoria o, in mancanza, dal file (che poi resta in memoria)."""
+    df = memory_cache.get(cache_key)
+    if df is not None:
+        touch_entry(cache_key)
+        return df
+    df = load_frame(cache_key, ttl_hours, functools.partial(_build_dataframe, endpoint=endpoint))
+    if df is not None:
+        memory_cache.put(cache_key, df, cache_expires_at(cache_key, ttl_hours))
+    return df
+
+
+def _refresh_in_background(cache_key: str, load) -> None:
+    """Accoda l'aggiornamento di una voce scaduta (uno solo per chiave) nella corsia background."""
+    global _refresh_executor
+    with _refresh_lock:
+        if cache_key in _refreshing:
+            return
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=CACHE_REFRESH_MAX_WORKERS, thread_name_prefix="openf1-refresh"
+            )
+        _refreshing.add(cache_key)
+        _refresh_executor.submit(_run_refresh, cache_key, load)
+
 
+def _run_refresh(cache_key: str, load) -> None:
+    try:
+        with rate_limit.priority(rate_limit.BACKGROUND):
+            single_flight.do(cache_key, load)
+    except Exception as e:
+        logger.debug("Aggiornamento in background di %s fallito: %s", cache_key, e)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(cache_key)
+
+
+def shutdown_background_refresh() -> None:
+    global _refresh_executor
+    with _refresh_lock:
+        if _refresh_executor is not None:
+            _refresh_executor.shutdown(wait=False, cancel_futures=True)
+            _refresh_executor = None
+
+
+atexit.register(shutdown_background_refresh)
+
+
+def _download_frame(endpoint: str, sanitized_params: dict, cache_suffix: str | None, cache_key: str):
+    """Scarica un endpoint come DataFrame e aggiorna la cache; ``None`` se l'endpoint risponde 404.
+
+    Se su disco c'è una voce scaduta con i suoi validatori, la richiesta è
+    condizionale (``If-None-Match``/``If-Modified-Since``): un 304 rinnova il TTL
+    senza trasferire il corpo. Senza validatori HTTP il corpo viene confrontato
+    con l'hash salvato e, se invariato, la voce esistente viene solo rinnovata.
+    """
+    validators = load_validators(cache_key)
+    headers = conditional_headers(validators) if validators else None
+    resp = _send_request(endpoint, sanitized_params, cache_suffix, headers=headers)
+    if resp is None:
+        return None
+
+    if validators:
+        not_modified = resp.status_code == 304
+        if not_modified or response_validators(resp.headers, resp.content)["sha256"] == validators.get("sha256"):
+            stale = load_frame(cache_key, None, functools.partial(_build_dataframe, endpoint=endpoint))
+            if stale is not None:
+                refresh_cache(cache_key, validators, not_modified)
+                return stale
+            if not_modified:
+                # Voce illeggibile: serve comunque il corpo completo
+                resp = _send_request(endpoint, sanitized_params, cache_suffix)
+                if resp is None:
+                    return None
+
+    df = _build_dataframe(resp.json(), endpoint)
+    if not df.empty:
+        save_frame(cache_key, df, response_validators(resp.headers, resp.content))
+    return df
+
+
+def _send_request(
+    endpoint: str,
+    sanitized_params: dict,
+    cache_suffix: str | None = None,
+    stream: bool = False,
+    headers: dict | None = None,
+):
+    """Esegue la richiesta HTTP verso OpenF1 con retry sui 429.
+
+    Restituisce la risposta (da chiudere se ``stream=True``) o ``None`` se l'endpoint risponde 404.
+    """
     url = f"{BASE_URL}/{endpoint.strip('/')}"
+    session = _get_http_session()
     attempts = API_MAX_RETRIES + 1
     last_error = None
 
+    if cache_suffix:
+        query_string = urlencode(sanitized_params)
+        separator = "&" if query_string else ""
+        request_url, request_params = f"{url}?{query_string}{separator}{cache_suffix}", None
+    else:
+        request_url, request_params = url, sanitized_params
+
     for attempt in range(1, attempts + 1):
-        if cache_suffix:
-            query_string = urlencode(sanitized_params)
-            separator = "&" if query_string else ""
-            full_url = f"{url}?{query_string}{separator}{cache_suffix}"
-            resp = requests.get(full_url, timeout=API_TIMEOUT)
+        circuit_breaker.before_request()
+        rate_limit.acquire()
+        try:
+            resp = session.get(
+                request_url,
+                params=request_params,
+                headers=headers,
+                timeout=(API_CONNECT_TIMEOUT, API_TIMEOUT),
+                stream=stream,
+            )
+        except requests.RequestException:
+            # Ogni errore (anche ChunkedEncodingError, TooManyRedirects...) deve chiudere
+            # l'eventuale richiesta di prova del circuit breaker
+            circuit_breaker.record_failure()
+            _count_http(calls=1, errors=1)
+            raise
+        # Con stream=True i byte vengono contati man mano che il corpo viene letto
+        _count_http(calls=1, size=0 if stream else len(resp.content))
+        if resp.status_code >= 500:
+            circuit_breaker.record_failure()
         else:
-            resp = requests.get(url, params=sanitized_params, timeout=API_TIMEOUT)
+            circuit_breaker.record_success()
 
         if resp.status_code == 404:
             logger.info(
@@ -69,18 +317,20 @@ def _fetch_json(endpoint: str, params: dict | None = None, cache_suffix: str | N
                 endpoint,
                 sanitized_params,
             )
-            return []
+            resp.close()
+            return None
 
         if resp.status_code != 429:
+            if not resp.ok:
+                resp.close()
             resp.raise_for_status()
-            data = resp.json()
-            save_to_cache(cache_key, data)
-            return data
+            return resp
 
         last_error = requests.HTTPError(
             f"429 Too Many Requests for {resp.url}",
             response=resp,
         )
+        resp.close()
         if attempt >= attempts:
             break
 
@@ -96,7 +346,11 @@ def _fetch_json(endpoint: str, params: dict | None = None, cache_suffix: str | N
             attempts,
             wait_seconds,
         )
-        time.sleep(wait_seconds)
+        if API_RATE_LIMIT_PER_SECOND > 0:
+            # Il bucket condiviso fa attendere anche gli altri worker, non solo questo thread
+            rate_limit.penalize(wait_seconds)
+        else:
+            time.sleep(wait_seconds)
 
     raise requests.HTTPError(
         "OpenF1 ha risposto con 429 (Too Many Requests). "
@@ -104,35 +358,346 @@ def _fetch_json(endpoint: str, params: dict | None = None, cache_suffix: str | N
     ) from last_error
 
 
+def _ns_to_iso(value: int) -> str:
+    return pd.Timestamp(value, unit="ns", tz="UTC").isoformat()
+
+
+def _stream_frames(endpoint: str, sanitized_params: dict, cache_suffix: str | None):
+    """Scarica una risposta in streaming restituendo blocchi di DataFrame tipizzati.
+
+    La risposta viene decodificata man mano che arriva, quindi né il testo
+    completo né la lista di dict stanno mai interamente in memoria.
+    """
+    resp = _send_request(endpoint, sanitized_params, cache_suffix, stream=True)
+    if resp is None:
+        return
+    with resp:
+        chunks = _counted_chunks(resp.iter_content(API_STREAM_CHUNK_BYTES))
+        for frame in iter_frames(iter_json_array(chunks), API_STREAM_CHUNK_ROWS):
+            yield apply_schema(frame, endpoint)
+
+
+def _counted_chunks(chunks):
+    for chunk in chunks:
+        _count_http(size=len(chunk))
+        yield chunk
+
+
+def _count_http(calls: int = 0, size: int = 0, errors: int = 0) -> None:
+    with _http_stats_lock:
+        _http_stats["requests"] += calls
+        _http_stats["bytes"] += size
+        _http_stats["errors"] += errors
+
+
+def get_http_stats() -> dict:
+    """Richieste verso OpenF1 fatte da questo processo, byte ricevuti ed errori di connessione."""
+    with _http_stats_lock:
+        return dict(_http_stats)
+
+
+def _read_cached_segments(endpoint: str, keys: list[str], ttl_hours: float | None) -> dict[str, pd.DataFrame]:
+    """Rilegge i segmenti salvati da ``_fetch_chunk``: prima dal livello in memoria, gli altri con una lettura a blocchi."""
+    frames = {}
+    for key in keys:
+        df = memory_cache.get(key)
+        if df is not None:
+            touch_entry(key)
+            frames[key] = df
+    missing = [key for key in keys if key not in frames]
+    if missing:
+        loaded = load_frames(missing, ttl_hours, functools.partial(_build_dataframe, endpoint=endpoint))
+        for key, df in loaded.items():
+            memory_cache.put(key, df, cache_expires_at(key, ttl_hours))
+        frames.update(loaded)
+    return frames
+
+
+def _filter_window(df: pd.DataFrame, start: int, end: int) -> pd.DataFrame:
+    if df.empty or "date" not in df.columns:
+        return df
+    if start == interval_cache.UNBOUNDED_START and end == interval_cache.UNBOUNDED_END:
+        return df
+    dates = df["date"].to_numpy(dtype="datetime64[ns]").view("int64")
+    return df[(dates > start) & (dates < end)]
+
+
+def _combine_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    df = pd.concat(frames, ignore_index=True)
+    if "date" in df.columns:
+        # I segmenti scaricati con margine si sovrappongono ai bordi
+        identity = [col for col in ("date", "driver_number") if col in df.columns]
+        df = df.drop_duplicates(subset=identity).sort_values("date", kind="stable", ignore_index=True)
+    return df
+
+
+# Campioni al secondo attesi per pilota, per dimensionare i blocchi di date sotto API_MAX_ITEMS
+_ROWS_PER_SECOND = {"car_data": 3.7, "location": 3.7, "position": 0.02, "weather": 1 / 60}
+_PER_DRIVER_ENDPOINTS = {"car_data", "location", "position"}
+_DRIVERS_PER_SESSION = 20
+_MIN_CHUNK_NS = 1_000_000_000
+
+
+def _date_filters(start: int, end: int) -> str | None:
+    # Margine di 1 ms: i filtri OpenF1 sono esclusivi e i campioni sui bordi non vanno persi
+    filters = []
+    if start != interval_cache.UNBOUNDED_START:
+        filters.append(f"date>{_ns_to_iso(start - 1_000_000)}")
+    if end != interval_cache.UNBOUNDED_END:
+        filters.append(f"date<{_ns_to_iso(end + 1_000_000)}")
+    return "&".join(filters) or None
+
+
+def _chunk_step_ns(endpoint: str, params: dict) -> int | None:
+    """Durata di un blocco che dovrebbe restare entro ``API_CHUNK_TARGET_ROWS`` righe; ``None`` se non stimabile."""
+    rate = _ROWS_PER_SECOND.get(endpoint)
+    if rate is None:
+        return None
+    if endpoint in _PER_DRIVER_ENDPOINTS and "driver_number" not in params:
+        rate *= _DRIVERS_PER_SESSION
+    return max(_MIN_CHUNK_NS, int(API_CHUNK_TARGET_ROWS / rate * 1e9))
+
+
+def _session_bounds(session_key) -> tuple[int, int] | None:
+    """Inizio e fine di una sessione in ns, per dare dei confini alle richieste senza limiti di data."""
+    if session_key is None:
+        return None
+    try:
+        sessions = _fetch_frame("sessions", {"session_key": session_key})
+    except requests.RequestException as e:
+        logger.warning("Impossibile leggere i limiti della sessione %s: %s", session_key, e)
+        return None
+    if sessions.empty or not {"date_start", "date_end"} <= set(sessions.columns):
+        return None
+    session = sessions.iloc[0]
+    if pd.isna(session["date_start"]) or pd.isna(session["date_end"]):
+        return None
+    register_session_end(session_key, session["date_end"])
+    return timestamp_to_ns(session["date_start"]), timestamp_to_ns(session["date_end"])
+
+
+def _plan_chunks(endpoint: str, params: dict, start: int, end: int) -> list[tuple[int, int]]:
+    """Divide un buco della cache a intervalli in blocchi di date consecutivi.
+
+    I lati senza limite restano aperti (il primo e l'ultimo blocco coprono
+    quanto c'è prima/dopo la sessione), i tagli interni sono ancorati ai limiti
+    della sessione quando il buco non ne ha.
+    """
+    step = _chunk_step_ns(endpoint, params)
+    if step is None:
+        return [(start, end)]
+    anchor_start, anchor_end = start, end
+    if start == interval_cache.UNBOUNDED_START or end == interval_cache.UNBOUNDED_END:
+        bounds = _session_bounds(params.get("session_key"))
+        if bounds is None:
+            return [(start, end)]
+        if start == interval_cache.UNBOUNDED_START:
+            anchor_start = bounds[0]
+        if end == interval_cache.UNBOUNDED_END:
+            anchor_end = bounds[1]
+    cuts = [cut for cut in range(anchor_start + step, anchor_end, step) if start < cut < end]
+    edges = [start, *cuts, end]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _split_chunk(start: int, end: int, step: int, first_date: int | None = None) -> int | None:
+    """Punto in cui dividere un blocco saturo; ``None`` se non è più divisibile.
+
+    Un blocco senza limiti su entrambi i lati viene diviso alla prima data
+    ricevuta (``first_date``), se nota.
+    """
+    if start == interval_cache.UNBOUNDED_START and end == interval_cache.UNBOUNDED_END:
+        return first_date
+    if start == interval_cache.UNBOUNDED_START:
+        return end - step
+    if end == interval_cache.UNBOUNDED_END:
+        return start + step
+    if end - start < 2 * _MIN_CHUNK_NS:
+        return None
+    return start + (end - start) // 2
+
+
+def _fetch_chunk(endpoint: str, sanitized_params: dict, key: str, start: int, end: int) -> list[tuple]:
+    """Scarica un blocco come segmento; se torna ``API_MAX_ITEMS`` righe (risposta troncata) lo divide e riprova.
+
+    Il segmento viene unito e salvato solo a risposta completa, quindi la
+    lettura si interrompe appena supera ``API_MAX_ITEMS`` righe: in memoria
+    non resta mai più di un blocco di righe oltre il limite, anche quando il
+    blocco non ha limiti di data (sessione sconosciuta) e upstream non tronca.
+
+    Restituisce una lista di ``(inizio, fine, chiave segmento, frame, righe)``.
+    """
+    segment_key = interval_cache.segment_key(key, start, end)
+    filters = _date_filters(start, end)
+    logger.debug("Interval cache MISS %s: %s", key, filters)
+    frames, rows, first_date = [], 0, None
+    with contextlib.closing(_stream_frames(endpoint, sanitized_params, filters)) as stream:
+        for frame in stream:
+            frames.append(frame)
+            rows += len(frame)
+            if "date" in frame.columns and frame["date"].notna().any():
+                frame_first = timestamp_to_ns(frame["date"].min())
+                first_date = frame_first if first_date is None else min(first_date, frame_first)
+            if rows > API_MAX_ITEMS:
+                break
+    if rows >= API_MAX_ITEMS:
+        step = _chunk_step_ns(endpoint, sanitized_params) or (end - start) // 2
+        split = _split_chunk(start, end, step, first_date)
+        if split is not None:
+            logger.info("Blocco %s saturo (%d righe): lo divido in due", filters, rows)
+            return (
+                _fetch_chunk(endpoint, sanitized_params, key, start, split)
+                + _fetch_chunk(endpoint, sanitized_params, key, split, end)
+            )
+        logger.warning("Blocco %s saturo (%d righe) e non divisibile: possibili righe mancanti", filters, rows)
+    frames = [_combine_frames(frames)]
+    save_frame(segment_key, frames[0])
+    return [(start, end, segment_key, frames, rows)]
+
+
+def _fetch_time_window(endpoint: str, params: dict, date_start=None, date_end=None) -> pd.DataFrame:
+    """Recupera come DataFrame tipizzato le righe con ``date_start < date < date_end`` tramite la cache a intervalli.
+
+    Se l'intervallo richiesto è già coperto (anche da una finestra più ampia) non
+    viene fatta alcuna chiamata; altrimenti i buchi mancanti vengono divisi in
+    blocchi di date sotto ``API_MAX_ITEMS`` righe, scaricati in parallelo e
+    salvati come segmenti a risposta completa. ``None`` su un lato indica nessun
+    limite (es. intera sessione).
+
+    Con ``CACHE_STALE_WHILE_REVALIDATE``, se i buchi sono coperti da segmenti
+    scaduti la finestra viene servita subito da quelli e aggiornata in background.
+    """
+    return _fetch_window(endpoint, params, date_start, date_end)[0]
+
+
+def _fetch_window(
+    endpoint: str, params: dict, date_start=None, date_end=None, allow_stale: bool = True
+) -> tuple[pd.DataFrame, bool]:
+    """Come ``_fetch_time_window``; indica anche se le righe vengono da segmenti scaduti."""
+    sanitized_params = _sanitize_params(params)
+    start = timestamp_to_ns(date_start) if date_start else interval_cache.UNBOUNDED_START
+    end = timestamp_to_ns(date_end) if date_end else interval_cache.UNBOUNDED_END
+    key = interval_cache.entry_key(endpoint, sanitized_params)
+    ttl_hours = cache_ttl_hours(endpoint, sanitized_params)
+    fetched: dict[str, list[pd.DataFrame]] = {}
+
+    with interval_cache.entry_lock(key), file_lock.key_lock(key):
+        entry = interval_cache.load_entry(key, ttl_hours)
+        gaps = interval_cache.missing_ranges(interval_cache.covered_ranges(entry), start, end)
+        stale_segments = None
+        if gaps and allow_stale and CACHE_STALE_WHILE_REVALIDATE:
+            stale_segments = _stale_segments(key, start, end)
+        if stale_segments is not None:
+            gaps = []
+        chunks = [
+            chunk
+            for gap_start, gap_end in gaps
+            for chunk in _plan_chunks(endpoint, sanitized_params, gap_start, gap_end)
+        ]
+        if len(chunks) == 1:
+            results = [_fetch_chunk(endpoint, sanitized_params, key, *chunks[0])]
+            error = None
+        else:
+            results, error = _fetch_chunks_parallel(endpoint, sanitized_params, key, chunks)
+        for segments in results:
+            for chunk_start, chunk_end, segment_key, frames, rows in segments:
+                interval_cache.add_segment(entry, chunk_start, chunk_end, segment_key, rows)
+                fetched[segment_key] = frames
+        if gaps:
+            # I blocchi completati restano in cache anche se un altro è fallito
+            interval_cache.save_entry(key, entry)
+        elif stale_segments is None:
+            logger.debug("Interval cache HIT: %s", key)
+        if error is not None:
+            raise error
+        segments = stale_segments or interval_cache.overlapping_segments(entry, start, end)
+
+    if stale_segments is not None:
+        record_stale_served(key)
+        refresh = functools.partial(_fetch_window, endpoint, params, date_start, date_end, allow_stale=False)
+        _refresh_in_background(f"{key}_window={start}-{end}", refresh)
+        # Letti senza passare dal livello in memoria, che conserva solo voci valide
+        cached = load_frames(
+            [segment["key"] for segment in segments], None, functools.partial(_build_dataframe, endpoint=endpoint)
+        )
+    else:
+        cached = _read_cached_segments(
+            endpoint, [segment["key"] for segment in segments if segment["key"] not in fetched], ttl_hours
+        )
+    frames = []
+    for segment in segments:
+        segment_frames = fetched.get(segment["key"])
+        if segment_frames is None:
+            segment_frames = [cached[segment["key"]]] if segment["key"] in cached else []
+        frames.extend(_filter_window(frame, start, end) for frame in segment_frames)
+    return _combine_frames(frames), stale_segments is not None
+
+
+def _stale_segments(key: str, start: int, end: int) -> list[dict] | None:
+    """Segmenti, anche scaduti, che coprono per intero ``[start, end]``; ``None`` se resta qualche buco."""
+    entry = interval_cache.load_entry(key, None)
+    if interval_cache.missing_ranges(interval_cache.covered_ranges(entry), start, end):
+        return None
+    return interval_cache.overlapping_segments(entry, start, end)
+
+
+def _fetch_chunks_parallel(endpoint: str, sanitized_params: dict, key: str, chunks: list[tuple[int, int]]):
+    """Scarica più blocchi in parallelo; restituisce i risultati completati e il primo errore."""
+    workers = max(1, min(API_MAX_WORKERS, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openf1-chunk") as executor:
+        # Ogni blocco eredita la corsia del rate limiter del chiamante (es. prefetch in background)
+        futures = [
+            executor.submit(contextvars.copy_context().run, _fetch_chunk, endpoint, sanitized_params, key, *chunk)
+            for chunk in chunks
+        ]
+
+    results, error = [], None
+    for future in futures:
+        if future.exception() is not None:
+            error = error or future.exception()
+        else:
+            results.append(future.result())
+    return results, error
+
+
 def fetch_meetings(year: int | None = None) -> pd.DataFrame:
     """Recupera i meeting (Gran Premi) per anno."""
     params = {}
     if year is not None:
         params["year"] = coerce_int(year, field_name="year", minimum=MIN_SUPPORTED_YEAR)
-    data = _fetch_json("meetings", params=params)
-    return _build_dataframe(data, ["meeting_key", "year", "country_name", "meeting_name"])
+    df = _ensure_columns(_fetch_frame("meetings", params), ["meeting_key", "year", "country_name", "meeting_name"])
+    if "date_end" in df.columns:
+        for meeting_key, date_end in zip(df["meeting_key"], df["date_end"]):
+            register_meeting_end(meeting_key, date_end)
+    return df
 
 
 def fetch_sessions(meeting_key: int) -> pd.DataFrame:
     """Recupera le sessioni per un meeting."""
     params = {"meeting_key": coerce_int(meeting_key, field_name="meeting_key", minimum=1, maximum=MAX_MEETING_KEY)}
-    data = _fetch_json("sessions", params=params)
-    return _build_dataframe(data, ["session_key", "session_name", "session_type"])
+    df = _ensure_columns(_fetch_frame("sessions", params), ["session_key", "session_name", "session_type"])
+    if "date_end" in df.columns:
+        for session_key, date_end in zip(df["session_key"], df["date_end"]):
+            register_session_end(session_key, date_end)
+    return df
 
 
 def fetch_laps(session_key: int) -> pd.DataFrame:
-    """Recupera i giri per una sessione."""
+    """Recupera i giri per una sessione (la voce resta fissata in cache finché la sessione è tra le più recenti aperte)."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("laps", params=params)
-    return _build_dataframe(data, ["driver_number", "lap_number", "date_start", "date_end"])
+    return _ensure_columns(_fetch_frame("laps", params, pin=True), ["driver_number", "lap_number", "date_start", "date_end"])
 
 
 def fetch_drivers(session_key: int) -> pd.DataFrame:
     """Recupera i piloti per una sessione."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("drivers", params=params)
-    df = _build_dataframe(
-        data,
+    df = _ensure_columns(
+        _fetch_frame("drivers", params),
         [
             "driver_number",
             "full_name",
@@ -147,9 +712,8 @@ def fetch_drivers(session_key: int) -> pd.DataFrame:
     if df.empty:
         return df
 
-    df["driver_number"] = pd.to_numeric(df["driver_number"], errors="coerce")
     df = df.dropna(subset=["driver_number"]).copy()
-    df["driver_number"] = df["driver_number"].astype(int)
+    df["driver_number"] = df["driver_number"].astype("int16")
 
     missing_full_name = df["full_name"].isna() | (df["full_name"].astype(str).str.strip() == "")
     combined = (
@@ -169,9 +733,8 @@ def fetch_drivers(session_key: int) -> pd.DataFrame:
 def fetch_stints(session_key: int) -> pd.DataFrame:
     """Recupera le info stint (compound, lap start/end) per una sessione."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("stints", params=params)
-    return _build_dataframe(
-        data,
+    return _ensure_columns(
+        _fetch_frame("stints", params),
         ["driver_number", "stint_number", "compound", "lap_start", "lap_end", "tyre_life", "new"],
     )
 
@@ -179,16 +742,14 @@ def fetch_stints(session_key: int) -> pd.DataFrame:
 def fetch_pitstops(session_key: int) -> pd.DataFrame:
     """Recupera i pit stop per una sessione."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("pit", params=params)
-    return _build_dataframe(data, ["driver_number", "lap_number", "pit_duration", "pit_duration_ms"])
+    return _ensure_columns(_fetch_frame("pit", params), ["driver_number", "lap_number", "pit_duration", "pit_duration_ms"])
 
 
 def fetch_race_control(session_key: int) -> pd.DataFrame:
     """Recupera gli eventi race control per una sessione."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("race_control", params=params)
-    return _build_dataframe(
-        data,
+    return _ensure_columns(
+        _fetch_frame("race_control", params),
         [
             "category",
             "date",
@@ -204,12 +765,12 @@ def fetch_race_control(session_key: int) -> pd.DataFrame:
     )
 
 
-def fetch_weather(session_key: int) -> pd.DataFrame:
-    """Recupera i dati meteo di una sessione."""
+def fetch_weather(session_key: int, date_start=None, date_end=None) -> pd.DataFrame:
+    """Recupera i dati meteo di una sessione, opzionalmente limitati a una finestra temporale."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("weather", params=params)
-    return _build_dataframe(
-        data,
+    df = _fetch_time_window("weather", params, date_start, date_end)
+    return _ensure_columns(
+        df,
         [
             "air_temperature",
             "date",
@@ -225,12 +786,12 @@ def fetch_weather(session_key: int) -> pd.DataFrame:
     )
 
 
-def fetch_position(session_key: int) -> pd.DataFrame:
-    """Recupera la timeline delle posizioni per una sessione."""
+def fetch_position(session_key: int, date_start=None, date_end=None) -> pd.DataFrame:
+    """Recupera la timeline delle posizioni per una sessione, opzionalmente limitata a una finestra temporale."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("position", params=params)
-    return _build_dataframe(
-        data,
+    df = _fetch_time_window("position", params, date_start, date_end)
+    return _ensure_columns(
+        df,
         [
             "date",
             "driver_number",
@@ -244,9 +805,8 @@ def fetch_position(session_key: int) -> pd.DataFrame:
 def fetch_overtakes(session_key: int) -> pd.DataFrame:
     """Recupera i sorpassi per una sessione."""
     params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
-    data = _fetch_json("overtakes", params=params)
-    return _build_dataframe(
-        data,
+    return _ensure_columns(
+        _fetch_frame("overtakes", params),
         [
             "date",
             "meeting_key",
@@ -268,38 +828,84 @@ def _estimate_date_end(date_start) -> str | None:
     return (start_dt + timedelta(minutes=DEFAULT_LAP_DURATION_MINUTES)).isoformat()
 
 
-def fetch_car_data_for_lap(session_key: int, driver_number: int, lap_row: pd.Series) -> pd.DataFrame:
-    """Recupera i dati di telemetria /car_data per un singolo giro."""
+def _lap_window(lap_row: pd.Series) -> tuple[str | None, str | None]:
+    """Restituisce la finestra temporale (date_start, date_end) di un giro, stimando la fine se manca."""
     date_start = lap_row.get("date_start")
-    date_end = lap_row.get("date_end") or _estimate_date_end(date_start)
+    date_end = lap_row.get("date_end")
+    if date_start is not None and pd.isna(date_start):
+        date_start = None
+    if date_end is None or pd.isna(date_end) or not date_end:
+        date_end = _estimate_date_end(date_start)
+    return date_start, date_end
 
-    if not date_start or not date_end:
-        return pd.DataFrame()
-
-    if not date_end:
-        start_dt = pd.to_datetime(date_start, errors="coerce", utc=True)
-        if pd.isna(start_dt):
-            return pd.DataFrame()
-        date_end = (start_dt + timedelta(minutes=DEFAULT_LAP_DURATION_MINUTES)).isoformat()
-        logger.warning("date_end era None per driver %d, usando stima: %s", driver_number, date_end)
 
-    params = {
+def _telemetry_params(session_key: int, driver_number: int) -> dict:
+    return {
         "session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY),
         "driver_number": coerce_int(driver_number, field_name="driver_number", minimum=1, maximum=MAX_DRIVER_NUMBER),
     }
-    date_filter = f"date>{date_start}&date<{date_end}"
-    logger.debug("Query URL (car_data): %s/car_data?%s&%s", BASE_URL, urlencode(params), date_filter)
 
-    data = _fetch_json("car_data", params=params, cache_suffix=date_filter)
 
-    if not data:
-        logger.warning("Nessun car_data trovato per driver %d", driver_number)
-        return pd.DataFrame()
+# Endpoint di sessione scaricati per intero e con la cache a intervalli, per ``warm_session_cache``
+_SESSION_FRAME_ENDPOINTS = ("laps", "drivers", "stints", "pit", "race_control", "overtakes")
+_SESSION_WINDOW_ENDPOINTS = ("weather", "position")
+
 
-    df = pd.DataFrame(data)
+def warm_session_cache(session_key: int) -> int:
+    """Porta nei livelli locali della cache le voci di una sessione già presenti nella cache condivisa.
 
+    Serve solo con un backend di rete (``kv``): gli endpoint interi arrivano con
+    una sola lettura a blocchi, quelli a intervalli con una per l'indice e una
+    per i suoi segmenti, invece di un giro per voce. Restituisce quante voci ha trovato.
+    """
+    if not has_remote_backend():
+        return 0
+    params = {"session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY)}
+    keys_by_ttl: dict[float | None, list[str]] = {}
+    for endpoint in _SESSION_FRAME_ENDPOINTS:
+        key = get_cache_key(endpoint, **params, cache_suffix="base")
+        keys_by_ttl.setdefault(cache_ttl_hours(endpoint, params), []).append(key)
+    found = sum(warm_entries(keys, ttl_hours) for ttl_hours, keys in keys_by_ttl.items())
+    for endpoint in _SESSION_WINDOW_ENDPOINTS:
+        ttl_hours = cache_ttl_hours(endpoint, params)
+        entry = interval_cache.load_entry(interval_cache.entry_key(endpoint, params), ttl_hours)
+        found += warm_entries([segment["key"] for segment in entry["segments"]], ttl_hours)
+    return found
+
+
+def fetch_session_telemetry(endpoint: str, session_key: int, driver_number: int) -> dict:
+    """Scarica una sola volta la telemetria di sessione di un pilota e la conserva in forma colonnare.
+
+    Le colonne vengono salvate su disco come file ``.npy`` a dtype fisso e
+    rilette in memory-map: i worker condividono le stesse pagine tramite la
+    page cache. Nei frame per giro le colonne dei valori restano viste sul
+    memory-map; solo ``date`` viene convertita in datetime UTC e quindi copiata.
+    """
+    params = _telemetry_params(session_key, driver_number)
+    store_key = (endpoint, params["session_key"], params["driver_number"])
+    columns = telemetry_store.get_columns(store_key)
+    if columns is None:
+        columns_key = get_cache_key(f"columns_{endpoint}", **params)
+        ttl_hours = cache_ttl_hours(endpoint, params)
+        columns = load_columns(columns_key, ttl_hours)
+        if columns is None:
+            df, stale = _fetch_window(endpoint, params)
+            built = telemetry_store.build_columns(df)
+            if stale:
+                # Finché l'aggiornamento in background non termina, le colonne si ricostruiscono dai segmenti scaduti
+                return built
+            save_columns(columns_key, built)
+            columns = load_columns(columns_key, ttl_hours)
+            if columns is None:
+                columns = built
+        telemetry_store.put_columns(store_key, columns, columns_expires_at(columns_key, ttl_hours))
+    return columns
+
+
+def _finalize_lap_frame(df: pd.DataFrame, value_columns: list[str]) -> pd.DataFrame:
+    """Ordina per data, aggiunge ``t_rel_s`` e garantisce le colonne attese."""
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce", utc=True)
+        df["date"] = pd.to_datetime(df["date"], errors="coerce", utc=True, format="ISO8601")
         df = df.dropna(subset=["date"]).sort_values("date")
         if df.empty:
             return pd.DataFrame()
@@ -308,54 +914,88 @@ def fetch_car_data_for_lap(session_key: int, driver_number: int, lap_row: pd.Ser
     else:
         df["t_rel_s"] = range(len(df))
 
-    for col in ["speed", "throttle", "brake", "n_gear"]:
+    for col in value_columns:
         if col not in df.columns:
             df[col] = None
 
     return df
 
 
-def fetch_location_for_lap(session_key: int, driver_number: int, lap_row: pd.Series) -> pd.DataFrame:
-    """Recupera i dati di posizione /location per un singolo giro."""
-    date_start = lap_row.get("date_start")
-    date_end = lap_row.get("date_end") or _estimate_date_end(date_start)
-
+def _fetch_lap_telemetry(
+    endpoint: str,
+    session_key: int,
+    driver_number: int,
+    lap_row: pd.Series,
+    value_columns: list[str],
+) -> pd.DataFrame:
+    date_start, date_end = _lap_window(lap_row)
     if not date_start or not date_end:
         return pd.DataFrame()
 
-    if not date_end:
-        start_dt = pd.to_datetime(date_start, errors="coerce", utc=True)
-        if pd.isna(start_dt):
-            return pd.DataFrame()
-        date_end = (start_dt + timedelta(minutes=DEFAULT_LAP_DURATION_MINUTES)).isoformat()
-        logger.warning("(location) date_end era None per driver %d, usando stima: %s", driver_number, date_end)
-
-    params = {
-        "session_key": coerce_int(session_key, field_name="session_key", minimum=1, maximum=MAX_SESSION_KEY),
-        "driver_number": coerce_int(driver_number, field_name="driver_number", minimum=1, maximum=MAX_DRIVER_NUMBER),
-    }
-    date_filter = f"date>{date_start}&date<{date_end}"
-    logger.debug("Query URL (location): %s/location?%s&%s", BASE_URL, urlencode(params), date_filter)
+    if TELEMETRY_FULL_SESSION:
+        columns = fetch_session_telemetry(endpoint, session_key, driver_number)
+        window = telemetry_store.slice_columns(columns, date_start, date_end)
+        if window:
+            window["date"] = pd.to_datetime(window["date"], utc=True)
+        # Senza copy=False il costruttore consolida le colonne in un blocco nuovo
+        df = pd.DataFrame(window, copy=False)
+    else:
+        params = _telemetry_params(session_key, driver_number)
+        df = _fetch_time_window(endpoint, params, date_start, date_end)
 
-    data = _fetch_json("location", params=params, cache_suffix=date_filter)
-    if not data:
-        logger.warning("Nessun location trovato per driver %d", driver_number)
+    if df.empty:
+        logger.warning("Nessun %s trovato per driver %d", endpoint, driver_number)
         return pd.DataFrame()
 
-    df = pd.DataFrame(data)
+    return _finalize_lap_frame(df, value_columns)
 
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce", utc=True)
-        df = df.dropna(subset=["date"]).sort_values("date")
-        if df.empty:
-            return pd.DataFrame()
-        t0 = df["date"].min()
-        df["t_rel_s"] = (df["date"] - t0).dt.total_seconds()
-    else:
-        df["t_rel_s"] = range(len(df))
 
-    for col in ["x", "y", "z"]:
-        if col not in df.columns:
-            df[col] = None
+def fetch_car_data_for_lap(session_key: int, driver_number: int, lap_row: pd.Series) -> pd.DataFrame:
+    """Recupera i dati di telemetria /car_data per un singolo giro."""
+    return _fetch_lap_telemetry(
+        "car_data", session_key, driver_number, lap_row, ["speed", "throttle", "brake", "n_gear"]
+    )
 
-    return df
+
+def fetch_location_for_lap(session_key: int, driver_number: int, lap_row: pd.Series) -> pd.DataFrame:
+    """Recupera i dati di posizione /location per un singolo giro."""
+    return _fetch_lap_telemetry("location", session_key, driver_number, lap_row, ["x", "y", "z"])
+
+
+_TELEMETRY_FETCHERS = {
+    "car_data": fetch_car_data_for_lap,
+    "location": fetch_location_for_lap,
+}
+
+
+def fetch_telemetry_batch(jobs: list[tuple], max_workers: int = API_MAX_WORKERS) -> list[tuple]:
+    """Esegue in parallelo più richieste di telemetria per giro.
+
+    Ogni job è una tupla ``(endpoint, session_key, driver_number, lap_row)`` con
+    endpoint ``car_data`` o ``location``. Restituisce, nello stesso ordine dei job,
+    una lista di tuple ``(DataFrame, errore)``: in caso di errore il DataFrame è
+    vuoto e l'eccezione viene riportata senza interrompere gli altri job.
+    """
+    if not jobs:
+        return []
+
+    def run(job):
+        endpoint, session_key, driver_number, lap_row = job
+        fetcher = _TELEMETRY_FETCHERS.get(endpoint)
+        if fetcher is None:
+            raise ValueError(f"endpoint non supportato per la telemetria: {endpoint}")
+        return fetcher(session_key, driver_number, lap_row)
+
+    workers = max(1, min(max_workers, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openf1-fetch") as executor:
+        futures = [executor.submit(run, job) for job in jobs]
+
+    results = []
+    for job, future in zip(jobs, futures):
+        error = future.exception()
+        if error is not None:
+            logger.warning("Fetch %s fallito per driver %s: %s", job[0], job[2], error)
+            results.append((pd.DataFrame(), error))
+        else:
+            results.append((future.result(), None))
+    return results
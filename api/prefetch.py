@@ -0,0 +1,124 @@
+"""Prefetch in background degli endpoint di sessione.
+
+Quando viene selezionata una sessione, scalda la cache di tutti gli endpoint
+session-scoped (stint, pit, posizioni, sorpassi, meteo, race control) nella
+corsia di priorità ``background`` del rate limiter, così i cambi di tab
+trovano i dati già in cache.
+
+Con una cache condivisa (backend ``kv``) il primo job copia in locale, con
+letture a blocchi, le voci della sessione già scaricate da altre istanze; gli
+altri job partono dopo di lui.
+
+Il server è condiviso tra più utenti: il prefetch resta attivo per le ultime
+``PREFETCH_MAX_SESSIONS`` sessioni selezionate (LRU). Quando una sessione esce
+da questo elenco i suoi job non ancora avviati vengono annullati, e quelli in
+coda controllano la generazione della propria sessione prima di partire.
+"""
+
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from api.openf1 import (
+    fetch_overtakes,
+    fetch_pitstops,
+    fetch_position,
+    fetch_race_control,
+    fetch_stints,
+    fetch_weather,
+    warm_session_cache,
+)
+from config import PREFETCH_ENABLED, PREFETCH_MAX_SESSIONS, PREFETCH_MAX_WORKERS
+from utils import rate_limit
+
+logger = logging.getLogger(__name__)
+
+SESSION_FETCHERS = (
+    fetch_stints,
+    fetch_pitstops,
+    fetch_position,
+    fetch_overtakes,
+    fetch_weather,
+    fetch_race_control,
+)
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_generation = 0
+# sessione -> (generazione, job), dalla selezionata meno di recente
+_sessions: "OrderedDict[int, tuple[int, list[Future]]]" = OrderedDict()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="openf1-prefetch")
+    return _executor
+
+
+def _is_active(session_key: int, generation: int) -> bool:
+    with _lock:
+        entry = _sessions.get(session_key)
+        return entry is not None and entry[0] == generation
+
+
+def _warm(generation: int, session_key: int) -> None:
+    if not _is_active(session_key, generation):
+        return
+    try:
+        found = warm_session_cache(session_key)
+        if found:
+            logger.debug("Prefetch: %d voci della sessione %s dalla cache condivisa", found, session_key)
+    except Exception as e:
+        logger.debug("Prefetch dalla cache condivisa per sessione %s fallito: %s", session_key, e)
+
+
+def _run(generation: int, fetcher, session_key: int, warmed: Future) -> None:
+    wait((warmed,))
+    if not _is_active(session_key, generation):
+        logger.debug("Prefetch %s per sessione %s saltato: sessione non più recente", fetcher.__name__, session_key)
+        return
+    try:
+        with rate_limit.priority(rate_limit.BACKGROUND):
+            fetcher(session_key)
+    except Exception as e:
+        logger.debug("Prefetch %s per sessione %s fallito: %s", fetcher.__name__, session_key, e)
+
+
+def prefetch_session(session_key: int) -> None:
+    """Avvia il prefetch degli endpoint di sessione; annulla quello delle sessioni uscite dalle più recenti."""
+    global _generation
+    if not PREFETCH_ENABLED:
+        return
+
+    with _lock:
+        if session_key in _sessions:
+            _sessions.move_to_end(session_key)
+            return
+        _generation += 1
+        executor = _get_executor()
+        warmed = executor.submit(_warm, _generation, session_key)
+        _sessions[session_key] = (
+            _generation,
+            [warmed, *(executor.submit(_run, _generation, fetcher, session_key, warmed) for fetcher in SESSION_FETCHERS)],
+        )
+        while len(_sessions) > PREFETCH_MAX_SESSIONS:
+            evicted, (_, futures) = _sessions.popitem(last=False)
+            cancelled = sum(1 for future in futures if future.cancel())
+            if cancelled:
+                logger.debug("Prefetch: annullati %d job della sessione %s", cancelled, evicted)
+
+
+def shutdown_prefetch() -> None:
+    """Ferma il prefetch annullando i job in coda."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        _sessions.clear()
+
+
+atexit.register(shutdown_prefetch)
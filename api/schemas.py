@@ -0,0 +1,144 @@
+"""Registro degli schemi (dtype compatti) per i DataFrame di ogni endpoint OpenF1.
+
+I dtype interi vengono usati solo se la colonna non ha valori mancanti e i valori
+rientrano nel range; altrimenti si passa a ``float32`` (mancanti) o all'intero più
+largo successivo. Le colonne il cui contenuto non è convertibile senza perdere
+valori restano invariate.
+
+I tempi giro/settore restano ``float64`` per non perdere la precisione al
+millisecondo nei delta cumulati.
+"""
+
+import numpy as np
+import pandas as pd
+
+DATETIME = "datetime"
+CATEGORY = "category"
+
+_COMMON = {
+    "meeting_key": "int32",
+    "session_key": "int32",
+    "driver_number": "int16",
+    "date": DATETIME,
+}
+
+SCHEMAS: dict[str, dict[str, str]] = {
+    "meetings": {
+        "year": "int16",
+        "date_start": DATETIME,
+        "date_end": DATETIME,
+    },
+    "sessions": {
+        "year": "int16",
+        "session_type": CATEGORY,
+        "date_start": DATETIME,
+        "date_end": DATETIME,
+    },
+    "laps": {
+        "lap_number": "int16",
+        "date_start": DATETIME,
+        "date_end": DATETIME,
+        "lap_duration": "float64",
+        "duration_sector_1": "float64",
+        "duration_sector_2": "float64",
+        "duration_sector_3": "float64",
+        "i1_speed": "int16",
+        "i2_speed": "int16",
+        "st_speed": "int16",
+    },
+    "drivers": {
+        "team_name": CATEGORY,
+    },
+    "stints": {
+        "stint_number": "int8",
+        "lap_start": "int16",
+        "lap_end": "int16",
+        "tyre_age_at_start": "int16",
+        "compound": CATEGORY,
+    },
+    "pit": {
+        "lap_number": "int16",
+        "pit_duration": "float32",
+    },
+    "race_control": {
+        "lap_number": "int16",
+        "sector": "int8",
+        "category": CATEGORY,
+        "flag": CATEGORY,
+        "scope": CATEGORY,
+    },
+    "weather": {
+        "air_temperature": "float32",
+        "track_temperature": "float32",
+        "humidity": "float32",
+        "pressure": "float32",
+        "rainfall": "int8",
+        "wind_direction": "int16",
+        "wind_speed": "float32",
+    },
+    "position": {
+        "position": "int8",
+    },
+    "overtakes": {
+        "overtaking_driver_number": "int16",
+        "overtaken_driver_number": "int16",
+        "position": "int8",
+    },
+    "car_data": {
+        "speed": "int16",
+        "throttle": "int8",
+        "brake": "int8",
+        "n_gear": "int8",
+        "rpm": "int16",
+        "drs": "int8",
+    },
+    "location": {
+        "x": "int16",
+        "y": "int16",
+        "z": "int16",
+    },
+}
+
+_WIDER_INT = {"int8": "int16", "int16": "int32", "int32": "int64"}
+
+
+def schema_for(endpoint: str) -> dict[str, str]:
+    return {**_COMMON, **SCHEMAS.get(endpoint, {})}
+
+
+def _coerce_int(values: pd.Series, dtype: str) -> pd.Series:
+    if values.isna().any():
+        return values.astype("float32")
+    if values.empty:
+        return values.astype(dtype)
+    low, high = values.min(), values.max()
+    if (values % 1 != 0).any():
+        return values.astype("float32")
+    while dtype in _WIDER_INT and (low < np.iinfo(dtype).min or high > np.iinfo(dtype).max):
+        dtype = _WIDER_INT[dtype]
+    return values.astype(dtype)
+
+
+def coerce_column(column: pd.Series, dtype: str) -> pd.Series:
+    """Converte una colonna al dtype dello schema, lasciandola invariata se si perderebbero valori."""
+    if dtype == DATETIME:
+        if isinstance(column.dtype, pd.DatetimeTZDtype):
+            return column
+        return pd.to_datetime(column, errors="coerce", utc=True, format="ISO8601")
+    if dtype == CATEGORY:
+        return column.astype("category")
+
+    numeric = pd.to_numeric(column, errors="coerce")
+    if numeric.isna().sum() > column.isna().sum():
+        return column
+    if dtype.startswith("int"):
+        return _coerce_int(numeric, dtype)
+    return numeric.astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, endpoint: str) -> pd.DataFrame:
+    """Applica in place i dtype compatti dell'endpoint alle colonne presenti."""
+    for col, dtype in schema_for(endpoint).items():
+        if col in df.columns:
+            df[col] = coerce_column(df[col], dtype)
+    return df
@@ -0,0 +1,75 @@
+"""Benchmark: dimensione su disco e latenza di lettura delle voci colonnari per codec di compressione.
+
+Per ogni endpoint della gara sintetica di ``tools/fixtures.py`` salva il
+DataFrame in formato ``.npz`` (``utils/columnar.py``) senza compressione e con
+ciascun codec disponibile di ``utils/compression.py``, poi misura il tempo per
+rileggerlo come il backend ``file`` di ``utils/cache.py`` (lettura del file,
+riconoscimento del codec, decompressione, ``read_frame``).
+
+Uso (dalla root del repo):
+    python -m benchmarks.bench_cache_compression --codecs gzip:1 gzip:6 lzma:1 --repeat 5
+"""
+
+import argparse
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from api.openf1 import _build_dataframe
+from tools.fixtures import ENDPOINTS, SyntheticSession
+from utils import compression
+from utils.cache import _decode_frame
+from utils.columnar import write_frame
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _parse_codec(spec: str) -> tuple[str, int | None]:
+    codec, _, level = spec.partition(":")
+    return codec, int(level) if level else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--laps", type=int, default=57)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--codecs", nargs="+", default=[f"{codec}:1" for codec in compression.available_codecs()],
+        help="codec:livello (livello facoltativo)",
+    )
+    args = parser.parse_args()
+
+    codecs = [(spec, *_parse_codec(spec)) for spec in args.codecs]
+    unavailable = [spec for spec, codec, _ in codecs if codec not in compression.available_codecs()]
+    if unavailable:
+        parser.error(f"codec non disponibili: {', '.join(unavailable)}")
+
+    session = SyntheticSession(n_drivers=args.drivers, n_laps=args.laps)
+    print(f"{'endpoint':<14}{'codec':<10}{'MB':>9}{'ratio':>8}{'read ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for endpoint in ENDPOINTS:
+            buffer = io.BytesIO()
+            write_frame(buffer, _build_dataframe(session.records(endpoint, {}), endpoint))
+            raw = buffer.getvalue()
+            for spec, codec, level in [("none", None, None), *codecs]:
+                path = Path(tmp) / f"{endpoint}.{spec.replace(':', '-')}.npz"
+                path.write_bytes(compression.compress(raw, codec, level))
+                read_s = _best_of(lambda: _decode_frame(path.read_bytes()), args.repeat)
+                size = path.stat().st_size
+                print(
+                    f"{endpoint:<14}{spec:<10}{size / (1024 * 1024):>9.2f}{len(raw) / size:>7.1f}x"
+                    f"{read_s * 1000:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: dimensione su disco e tempo di lettura della cache, JSON contro formato colonnare.
+
+Per ogni endpoint della gara sintetica di ``tools/fixtures.py`` scrive la voce
+nel vecchio formato (``json.dump(..., indent=2)``) e nel formato colonnare
+``.npz`` di ``utils/columnar.py``, poi misura il tempo per riottenere il
+DataFrame tipizzato: ``json.load`` + ``_build_dataframe`` contro ``read_frame``.
+
+Uso (dalla root del repo):
+    python -m benchmarks.bench_cache_format --drivers 20 --laps 57
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from api.openf1 import _build_dataframe
+from tools.fixtures import ENDPOINTS, SyntheticSession
+from utils.columnar import read_frame, write_frame
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--laps", type=int, default=57)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    session = SyntheticSession(n_drivers=args.drivers, n_laps=args.laps)
+    print(f"{'endpoint':<14}{'rows':>9}{'json MB':>10}{'npz MB':>9}{'json ms':>10}{'npz ms':>9}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for endpoint in ENDPOINTS:
+            records = session.records(endpoint, {})
+            json_path = Path(tmp) / f"{endpoint}.json"
+            npz_path = Path(tmp) / f"{endpoint}.npz"
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(records, f, indent=2, ensure_ascii=False)
+            write_frame(npz_path, _build_dataframe(records, endpoint))
+
+            def load_json():
+                with open(json_path, "r", encoding="utf-8") as f:
+                    return _build_dataframe(json.load(f), endpoint)
+
+            json_s = _best_of(load_json, args.repeat)
+            npz_s = _best_of(lambda: read_frame(npz_path), args.repeat)
+            json_mb = json_path.stat().st_size / (1024 * 1024)
+            npz_mb = npz_path.stat().st_size / (1024 * 1024)
+            print(
+                f"{endpoint:<14}{len(records):>9}{json_mb:>10.2f}{npz_mb:>9.2f}"
+                f"{json_s * 1000:>10.1f}{npz_s * 1000:>9.1f}{json_s / npz_s:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark: latenza con connessioni fredde vs connessioni keep-alive dal pool.
+
+Avvia il server OpenF1 locale (``tools/openf1_stub.py``) e confronta:
+- cold: una nuova connessione TCP per ogni richiesta (come ``requests.get``);
+- warm: il client condiviso di ``api.openf1`` che riusa le connessioni del pool.
+
+Uso (dalla root del repo):
+    python -m benchmarks.bench_http_pool --requests 200 --connect-delay-ms 20
+
+``--connect-delay-ms`` aggiunge un ritardo all'apertura di ogni connessione
+per simulare l'handshake TCP/TLS verso api.openf1.org.
+"""
+
+import argparse
+import statistics
+import time
+
+import requests
+
+from api.openf1 import _get_http_session, close_http_session
+from tools.openf1_stub import start_stub_server
+
+
+def _measure(fn, n_requests: int) -> list[float]:
+    timings = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(label: str, timings: list[float]) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return (
+        f"{label:<6} mean={statistics.mean(timings):7.2f} ms  "
+        f"median={statistics.median(timings):7.2f} ms  p95={p95:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--connect-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with start_stub_server(connect_delay_ms=args.connect_delay_ms) as stub:
+        url = f"{stub.base_url}/stints"
+        params = {"session_key": stub.source.session_key}
+
+        def cold():
+            with requests.Session() as session:
+                session.get(url, params=params, timeout=5).json()
+
+        session = _get_http_session()
+
+        def warm():
+            session.get(url, params=params, timeout=5).json()
+
+        try:
+            warm()  # apre la connessione che verra riutilizzata
+            cold_timings = _measure(cold, args.requests)
+            warm_timings = _measure(warm, args.requests)
+        finally:
+            close_http_session()
+
+    print(_summary("cold", cold_timings))
+    print(_summary("warm", warm_timings))
+    print(f"speedup (mean): {statistics.mean(cold_timings) / statistics.mean(warm_timings):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark: memoria dei DataFrame per endpoint prima e dopo lo schema a dtype compatti.
+
+Usa la gara sintetica completa di ``tools/fixtures.py`` (20 piloti, 57 giri,
+telemetria di tutti i piloti) e confronta ``pd.DataFrame(records)`` con
+``_build_dataframe(records, endpoint)`` che applica ``api/schemas.py``.
+
+Uso (dalla root del repo):
+    python -m benchmarks.bench_schema_memory --drivers 20 --laps 57
+"""
+
+import argparse
+
+import pandas as pd
+
+from api.openf1 import _build_dataframe
+from tools.fixtures import ENDPOINTS, SyntheticSession
+
+
+def _mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--laps", type=int, default=57)
+    args = parser.parse_args()
+
+    session = SyntheticSession(n_drivers=args.drivers, n_laps=args.laps)
+    total_before = total_after = 0.0
+    print(f"{'endpoint':<14}{'rows':>9}{'before MB':>12}{'after MB':>11}{'ratio':>8}")
+    for endpoint in ENDPOINTS:
+        records = session.records(endpoint, {})
+        before = _mb(pd.DataFrame(records))
+        after = _mb(_build_dataframe(records, endpoint))
+        total_before += before
+        total_after += after
+        ratio = before / after if after else float("nan")
+        print(f"{endpoint:<14}{len(records):>9}{before:>12.2f}{after:>11.2f}{ratio:>7.1f}x")
+    print(f"{'totale':<14}{'':>9}{total_before:>12.2f}{total_after:>11.2f}{total_before / total_after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
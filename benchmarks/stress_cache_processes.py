@@ -0,0 +1,139 @@
+"""Stress test multi-processo della cache: letture mai troncate, chiavi fredde scaricate una volta sola.
+
+Simula più worker gunicorn sulla stessa ``OPENF1_CACHE_DIR`` temporanea:
+
+1. ``torn``: alcuni processi riscrivono di continuo le stesse voci (colonnari
+   e JSON) mentre altri le rileggono e ne verificano il contenuto. Ogni
+   lettura fallita o incoerente è una lettura troncata. ``--in-place`` scrive
+   invece direttamente sul file finale (com'era prima delle scritture
+   atomiche), per confronto.
+2. ``cold``: più processi chiedono nello stesso istante i giri di una sessione
+   non in cache al server OpenF1 locale (``tools/openf1_stub.py``). Grazie al
+   lock per chiave deve arrivare upstream una sola richiesta.
+
+Uso (dalla root del repo):
+    python -m benchmarks.stress_cache_processes --processes 8 --seconds 5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+_KEYS = ("stress_a", "stress_b", "stress_c")
+
+
+def _payload(version: int) -> list[dict]:
+    # Lunghezza e contenuto dipendono dalla versione: una lettura a metà non torna
+    return [{"version": version, "i": i} for i in range(500 + version % 500)]
+
+
+def _is_consistent(records) -> bool:
+    if not records:
+        return False
+    version = records[0]["version"]
+    return len(records) == 500 + version % 500 and all(record["version"] == version for record in records)
+
+
+def _writer(seconds: float, seed: int, in_place: bool) -> int:
+    import pandas as pd
+
+    from utils import cache
+
+    # Il tempo parte dopo gli import: l'avvio dei processi spawn è lento
+    deadline = time.time() + seconds
+    writes, version = 0, seed
+    while time.time() < deadline:
+        for key in _KEYS:
+            records = _payload(version)
+            if in_place:
+                with open(cache.get_cache_path(key), "w", encoding="utf-8") as f:
+                    json.dump(records, f, indent=2)
+            else:
+                cache.save_to_cache(key, records)
+                cache.save_frame(key, pd.DataFrame(records))
+            writes += 1
+        version += 7
+    return writes
+
+
+def _reader(seconds: float, in_place: bool) -> tuple[int, int]:
+    import logging
+
+    from utils import cache
+
+    logging.disable(logging.WARNING)
+    deadline = time.time() + seconds
+    reads = torn = 0
+    while time.time() < deadline:
+        for key in _KEYS:
+            records = cache.load_from_cache(key, None)
+            torn += not _is_consistent(records)
+            reads += 1
+            if not in_place:
+                df = cache.load_frame(key, None)
+                torn += df is None or not _is_consistent(df.to_dict("records"))
+                reads += 1
+    return reads, torn
+
+
+def _run_torn(processes: int, seconds: float, in_place: bool) -> None:
+    import pandas as pd
+
+    from utils import cache
+
+    for key in _KEYS:
+        cache.save_to_cache(key, _payload(0))
+        cache.save_frame(key, pd.DataFrame(_payload(0)))
+    writers = max(1, processes // 2)
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        write_jobs = [pool.apply_async(_writer, (seconds, seed, in_place)) for seed in range(writers)]
+        read_jobs = [pool.apply_async(_reader, (seconds, in_place)) for _ in range(processes - writers)]
+        writes = sum(job.get() for job in write_jobs)
+        reads, torn = (sum(values) for values in zip(*(job.get() for job in read_jobs)))
+    mode = "in place" if in_place else "atomiche"
+    print(f"torn  ({mode}): {writes} scritture, {reads} letture, {torn} letture troncate")
+
+
+def _cold_fetch(barrier, session_key: int) -> int:
+    from api.openf1 import close_http_session, fetch_laps
+
+    barrier.wait()
+    try:
+        return len(fetch_laps(session_key))
+    finally:
+        close_http_session()
+
+
+def _run_cold(processes: int) -> None:
+    from tools.openf1_stub import start_stub_server
+
+    with start_stub_server(latency_ms=200) as stub:
+        os.environ["OPENF1_BASE_URL"] = stub.base_url
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager, context.Pool(processes) as pool:
+            barrier = manager.Barrier(processes)
+            rows = pool.starmap(_cold_fetch, [(barrier, stub.source.session_key)] * processes)
+        requests_made = stub.stats["endpoints"].get("laps", 0)
+    print(f"cold: {processes} processi, righe {sorted(set(rows))}, richieste upstream per laps: {requests_made}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--in-place", action="store_true", help="scritture non atomiche, per confronto")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # I processi figli (spawn) ereditano l'ambiente e importano la cache da qui
+        os.environ["OPENF1_CACHE_DIR"] = os.path.join(tmp, "torn")
+        _run_torn(args.processes, args.seconds, args.in_place)
+        os.environ["OPENF1_CACHE_DIR"] = os.path.join(tmp, "cold")
+        _run_cold(args.processes)
+
+
+if __name__ == "__main__":
+    main()
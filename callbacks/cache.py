@@ -1,24 +1,116 @@
-from dash import Input, Output, callback, callback_context
-from utils.cache import clear_cache, cache_size_mb
+import time
+
+from dash import Input, Output, State, callback, callback_context
+from config import CACHE_MAX_MB
+from utils import circuit_breaker, memory_cache, rate_limit, single_flight
+from utils.cache import clear_cache, get_backend_stats, get_cache_stats, get_manifest_stats, invalidate_cache
+from utils.i18n import t, LANG_DEFAULT
+
+STALE_BANNER_SECONDS = 60
+
+
+def _cache_status(lang: str, manifest: dict) -> str:
+    stats = get_cache_stats()
+    parts = [
+        t(
+            lang, "cache_size",
+            size=manifest["bytes"] / (1024 * 1024), limit=CACHE_MAX_MB, entries=manifest["entries"], hits=manifest["hits"],
+        ),
+        t(lang, "cache_negative", hits=stats["negative_hits"], stored=stats["negative_stored"]),
+    ]
+    memory = memory_cache.get_stats()
+    parts.append(t(
+        lang, "cache_memory",
+        hits=memory["hits"], misses=memory["misses"], evictions=memory["evictions"], size=memory["bytes"] / (1024 * 1024),
+    ))
+    for backend in get_backend_stats():
+        if backend["name"] == "snapshot" and backend["entries"]:
+            parts.append(t(lang, "cache_snapshot", hits=backend["hits"], entries=backend["entries"]))
+        elif backend["name"] == "kv":
+            key = "cache_kv" if backend["available"] else "cache_kv_down"
+            parts.append(t(lang, key, hits=backend["hits"], errors=backend["errors"]))
+    if stats["evicted"]:
+        parts.append(t(lang, "cache_evicted", count=stats["evicted"]))
+    if stats["bytes_saved"]:
+        parts.append(t(lang, "cache_revalidated", saved=stats["bytes_saved"] / (1024 * 1024)))
+    return " · ".join(parts + _upstream_status(lang))
+
+
+def _upstream_status(lang: str) -> list[str]:
+    """Attese del rate limiter, circuit breaker e richieste coalescite di questo processo, se ce ne sono."""
+    parts = []
+    lanes = rate_limit.get_stats().values()
+    requests = sum(lane["requests"] for lane in lanes)
+    if requests:
+        parts.append(t(
+            lang, "cache_rate_limit",
+            requests=requests, waited=sum(lane["waited"] for lane in lanes),
+            max_wait=max(lane["max_wait_seconds"] for lane in lanes),
+        ))
+    breaker = circuit_breaker.get_stats()
+    if breaker["state"] != circuit_breaker.CLOSED or breaker["opened"] or breaker["failures"]:
+        key = "cache_breaker" if breaker["state"] == circuit_breaker.CLOSED else "cache_breaker_open"
+        parts.append(t(lang, key, opened=breaker["opened"], rejected=breaker["rejected"], failures=breaker["failures"]))
+    flights = single_flight.get_stats()
+    if flights["coalesced"]:
+        parts.append(t(
+            lang, "cache_single_flight",
+            coalesced=flights["coalesced"], total=flights["executed"] + flights["coalesced"],
+        ))
+    return parts
+
+
+def _endpoint_options(manifest: dict) -> list[dict]:
+    return [
+        {"label": f"{row['endpoint']} ({row['bytes'] / (1024 * 1024):.1f} MB)", "value": row["endpoint"]}
+        for row in manifest["endpoints"]
+    ]
 
 
 @callback(
     Output("cache-status", "children"),
-    inputs=[Input("clear-cache-btn", "n_clicks")],
+    Output("cache-endpoint-dropdown", "options"),
+    inputs=[
+        Input("clear-cache-btn", "n_clicks"),
+        Input("clear-session-cache-btn", "n_clicks"),
+        Input("clear-endpoint-cache-btn", "n_clicks"),
+        Input("cache-status-interval", "n_intervals"),
+    ],
+    state=[State("lang-store", "data"), State("session-dropdown", "value"), State("cache-endpoint-dropdown", "value")],
     prevent_initial_call=False,
 )
-def manage_cache(n_clicks):
-    """Unico callback che gestisce stato cache e pulizia."""
+def manage_cache(n_clicks, n_session_clicks, n_endpoint_clicks, _n_intervals, lang, session_key, endpoint):
+    """Unico callback che gestisce stato cache, pulizia e invalidazione per sessione o endpoint."""
+    lang = lang or LANG_DEFAULT
     ctx = callback_context
-    # Se non è stato triggerato (render iniziale), mostra dimensione cache
-    if not ctx.triggered:
-        size_mb = cache_size_mb()
-        return f"💾 Cache: {size_mb:.2f} MB"
-
-    prop = ctx.triggered[0]["prop_id"]
-    if "clear-cache-btn" in prop and n_clicks and n_clicks > 0:
+    prop = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
+    message = None
+    if "clear-cache-btn" in prop and n_clicks:
         clear_cache()
-        return "✅ Cache svuotato!"
+        message = t(lang, "cache_cleared")
+    elif "clear-session-cache-btn" in prop and n_session_clicks and session_key:
+        count = invalidate_cache(session_key=int(session_key))
+        message = t(lang, "cache_invalidated", target=f"session_key={session_key}", count=count)
+    elif "clear-endpoint-cache-btn" in prop and n_endpoint_clicks and endpoint:
+        count = invalidate_cache(endpoint=endpoint)
+        message = t(lang, "cache_invalidated", target=endpoint, count=count)
+
+    # Render iniziale e intervallo: stato dal manifest, senza scorrere la directory
+    manifest = get_manifest_stats()
+    return message or _cache_status(lang, manifest), _endpoint_options(manifest)
 
-    size_mb = cache_size_mb()
-    return f"💾 Cache: {size_mb:.2f} MB"
\ No newline at end of file
+
+@callback(
+    Output("stale-banner", "children"),
+    Output("stale-banner", "style"),
+    inputs=[Input("cache-status-interval", "n_intervals")],
+    state=[State("lang-store", "data")],
+)
+def show_stale_banner(_n_intervals, lang):
+    """Segnala quando i dati mostrati vengono dalla cache scaduta invece di mostrare un errore."""
+    lang = lang or LANG_DEFAULT
+    if circuit_breaker.is_open():
+        return t(lang, "stale_banner_open"), {"display": "block"}
+    if time.time() - get_cache_stats()["last_stale_served_at"] < STALE_BANNER_SECONDS:
+        return t(lang, "stale_banner_refresh"), {"display": "block"}
+    return "", {"display": "none"}
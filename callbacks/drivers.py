@@ -4,6 +4,7 @@ import pandas as pd
 from dash import Input, Output, State, callback
 
 from api.openf1 import fetch_laps, fetch_drivers
+from api.prefetch import prefetch_session
 from utils.telemetry import fmt_duration, lap_duration_seconds_from_row
 from utils.helpers import driver_label as _driver_label
 from utils.i18n import t, LANG_DEFAULT
@@ -29,6 +30,9 @@ def load_laps_and_drivers(session_key, lang):
     if not session_key:
         return None, [], None, [], None, t(lang, "status_select_session"), None
 
+    # Scalda in background la cache degli altri tab mentre carichiamo giri e piloti
+    prefetch_session(int(session_key))
+
     try:
         df_laps = fetch_laps(int(session_key))
     except Exception as e:
@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.graph_objects as go
 from dash import Input, Output, State, callback, callback_context, no_update
 
-from api.openf1 import fetch_car_data_for_lap, fetch_location_for_lap
+from api.openf1 import fetch_telemetry_batch
 from utils.telemetry import (
     compute_delta_time,
     lap_duration_seconds_from_row,
@@ -12,7 +12,7 @@ from utils.telemetry import (
 from config import COLOR1, COLOR2
 from utils.i18n import t, LANG_DEFAULT
 from utils.helpers import driver_label
-
+from utils.security import sanitize_error_message
 
 
 @callback(
@@ -89,14 +89,19 @@ def update_graphs(session_key, driver1, lap1_number, driver2, lap2_number, selec
     lap1_row = lap1_rows.iloc[0]
     lap2_row = lap2_rows.iloc[0]
 
-    try:
-        df1 = fetch_car_data_for_lap(int(session_key), int(driver1), lap1_row)
-        df2 = fetch_car_data_for_lap(int(session_key), int(driver2), lap2_row)
-        loc1 = fetch_location_for_lap(int(session_key), int(driver1), lap1_row)
-        loc2 = fetch_location_for_lap(int(session_key), int(driver2), lap2_row)
-    except Exception as e:
-        empty_fig.update_layout(title=t(lang, "error_generic", error=sanitize_error_message(e)))
+    results = fetch_telemetry_batch(
+        [
+            ("car_data", int(session_key), int(driver1), lap1_row),
+            ("car_data", int(session_key), int(driver2), lap2_row),
+            ("location", int(session_key), int(driver1), lap1_row),
+            ("location", int(session_key), int(driver2), lap2_row),
+        ]
+    )
+    errors = [error for _, error in results if error is not None]
+    if errors:
+        empty_fig.update_layout(title=t(lang, "error_generic", error=sanitize_error_message(errors[0])))
         return track_fig, delta_fig, empty_fig, empty_fig, empty_fig, empty_fig, empty_fig
+    (df1, _), (df2, _), (loc1, _), (loc2, _) = results
 
     if df1.empty and df2.empty:
         empty_fig.update_layout(title=t(lang, "lap_unavailable"))
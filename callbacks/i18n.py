@@ -27,6 +27,10 @@ from utils.i18n import t, LANG_DEFAULT
         Output("move-down-btn", "children"),
         Output("reset-graph-order-btn", "children"),
         Output("print-btn", "children"),
+        Output("clear-cache-btn", "children"),
+        Output("clear-session-cache-btn", "children"),
+        Output("clear-endpoint-cache-btn", "children"),
+        Output("cache-endpoint-dropdown", "placeholder"),
     ],
     inputs=[Input("language-dropdown", "value")],
 )
@@ -56,4 +60,8 @@ def translate_ui(lang):
         t(lang, "move_down"),
         t(lang, "reset_order"),
         t(lang, "print_pdf"),
+        t(lang, "clear_cache"),
+        t(lang, "clear_session_cache"),
+        t(lang, "clear_endpoint_cache"),
+        t(lang, "cache_endpoint_placeholder"),
     ]
@@ -2,6 +2,7 @@ import pandas as pd
 from dash import Input, Output, State, callback
 
 from api.openf1 import fetch_meetings, fetch_sessions
+from utils.helpers import as_text
 from utils.i18n import t, LANG_DEFAULT
 from utils.security import sanitize_error_message
 
@@ -129,7 +130,7 @@ def load_sessions(meeting_key, lang, meetings_data):
     ordered_sessions = _sort_latest_first(df_sessions)
     options = [
         {
-            "label": f"{row.get('session_name') or row.get('session_type') or 'Session'} "
+            "label": f"{as_text(row.get('session_name')) or as_text(row.get('session_type')) or 'Session'} "
                      f"(key={int(row['session_key'])})",
             "value": int(row["session_key"]),
         }
@@ -4,6 +4,7 @@ from dash import Input, Output, State, callback, html
 
 from api.openf1 import fetch_overtakes, fetch_position
 from config import COLOR1, COLOR2
+from utils.helpers import as_text
 from utils.i18n import LANG_DEFAULT, t
 from utils.security import sanitize_error_message
 
@@ -26,8 +27,8 @@ def _driver_label(num: int, df_drivers: pd.DataFrame) -> str:
     if row.empty:
         return f"Driver #{int(num)}"
     row = row.iloc[0]
-    full_name = row.get("full_name") or row.get("name_acronym") or ""
-    team = row.get("team_name") or ""
+    full_name = as_text(row.get("full_name")) or as_text(row.get("name_acronym"))
+    team = as_text(row.get("team_name"))
     if full_name and team:
         return f"#{int(num)} - {full_name} ({team})"
     if full_name:
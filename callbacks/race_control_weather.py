@@ -3,6 +3,7 @@ import plotly.graph_objects as go
 from dash import Input, Output, callback, html
 
 from api.openf1 import fetch_race_control, fetch_weather
+from utils.helpers import as_text
 from utils.i18n import LANG_DEFAULT, t
 from utils.security import sanitize_error_message
 
@@ -58,11 +59,11 @@ def _build_race_control_table(df: pd.DataFrame, lang: str):
             html.Tr(
                 [
                     html.Td(row.get("date_fmt") or "-", style=cell_style),
-                    html.Td(row.get("category") or "-", style=cell_style),
-                    html.Td(row.get("flag") or "-", style=cell_style),
+                    html.Td(as_text(row.get("category")) or "-", style=cell_style),
+                    html.Td(as_text(row.get("flag")) or "-", style=cell_style),
                     html.Td(lap_label, style=cell_style),
                     html.Td(driver_label, style=cell_style),
-                    html.Td(row.get("message") or "-", style=cell_style),
+                    html.Td(as_text(row.get("message")) or "-", style=cell_style),
                 ]
             )
         )
@@ -235,9 +236,9 @@ def render_race_control_weather(session_key, lang):
         latest_event = race_control.iloc[-1] if not race_control.empty else None
         if latest_event is not None:
             event_label = (
-                latest_event.get("message")
-                or latest_event.get("flag")
-                or latest_event.get("category")
+                as_text(latest_event.get("message"))
+                or as_text(latest_event.get("flag"))
+                or as_text(latest_event.get("category"))
                 or t(lang, "rcw_event_unknown")
             )
         else:
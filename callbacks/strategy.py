@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 def _compound_color(compound: str | None) -> str:
-    if not compound:
+    if not isinstance(compound, str) or not compound:
         return "#888888"
     c = compound.upper()
     mapping = {
@@ -125,6 +125,7 @@ def render_strategy(session_key, driver1, driver2, lang, laps_data, drivers_data
                     end_int = start_int
                 width = max(end_int - start_int + 1, 1)
                 compound = row.get("compound")
+                compound = compound if isinstance(compound, str) else None
                 compound_label = compound if compound else t(lang, "compound_unknown")
                 color_fill = _compound_color(compound)
                 stint_num = row.get("stint_number") if pd.notna(row.get("stint_number")) else idx + 1
@@ -244,6 +245,7 @@ def render_strategy(session_key, driver1, driver2, lang, laps_data, drivers_data
         if not drv_stints.empty:
             last = drv_stints.iloc[-1]
             last_comp = last.get("compound")
+            last_comp = last_comp if isinstance(last_comp, str) else None
         compound_label = last_comp if last_comp else t(lang, "compound_unknown")
         return html.Div(t(lang, "strategy_driver_summary", driver=label, count=count, compound=compound_label))
 
@@ -74,6 +74,9 @@ def create_layout():
                 className="app-body",
                 children=[
 
+                    # Avviso dati dalla cache quando OpenF1 non risponde
+                    html.Div(id="stale-banner", className="status-msg", style={"display": "none"}),
+
                     # ── Selection panel ──────────────────────────
                     html.Div(
                         className="panel",
@@ -176,6 +179,29 @@ def create_layout():
                                         children=[
                                             html.Div(id="laps-status", className="status-msg"),
                                             html.Div(id="lap-compare-status"),
+                                            html.Div(
+                                                style={"display": "flex", "gap": "8px", "alignItems": "center"},
+                                                children=[
+                                                    html.Button(id="clear-cache-btn", children="🗑 Svuota cache", n_clicks=0),
+                                                    html.Div(id="cache-status", className="status-msg"),
+                                                ],
+                                            ),
+                                            # Invalidazione mirata: sessione selezionata o un endpoint
+                                            html.Div(
+                                                style={"display": "flex", "gap": "8px", "alignItems": "center"},
+                                                children=[
+                                                    dcc.Dropdown(
+                                                        id="cache-endpoint-dropdown",
+                                                        options=[],
+                                                        value=None,
+                                                        placeholder="Endpoint in cache",
+                                                        style={"flex": "1"},
+                                                    ),
+                                                    html.Button(id="clear-endpoint-cache-btn", children="🗑 Endpoint", n_clicks=0),
+                                                    html.Button(id="clear-session-cache-btn", children="🗑 Sessione", n_clicks=0),
+                                                ],
+                                            ),
+                                            dcc.Interval(id="cache-status-interval", interval=15_000),
                                         ],
                                     ),
                                 ],
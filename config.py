@@ -1,12 +1,18 @@
-BASE_URL = "https://api.openf1.org/v1"
+import os
+import tempfile
+from pathlib import Path
+
+# Sovrascrivibile per puntare a un server locale (es. tools/openf1_stub.py)
+BASE_URL = os.environ.get("OPENF1_BASE_URL", "https://api.openf1.org/v1").rstrip("/")
 
 # Colori fissi per i due piloti (coerenti su tutti i grafici)
 COLOR1 = "#e10600"   # F1 red   — Pilota 1
 COLOR2 = "#00b4e6"   # sky blue — Pilota 2
 
-# Timeout API
+# Timeout API (secondi): connessione TCP/TLS e lettura della risposta
+API_CONNECT_TIMEOUT = 5
 API_TIMEOUT = 30
-API_MAX_ITEMS = 20000
+API_MAX_ITEMS = 20000   # righe oltre le quali una risposta viene considerata troncata
 MIN_SUPPORTED_YEAR = 2018
 MAX_DRIVER_NUMBER = 999
 MAX_SESSION_KEY = 999999
@@ -17,5 +23,82 @@ MAX_LAP_NUMBER = 500
 API_MAX_RETRIES = 3
 API_RETRY_BACKOFF_SECONDS = 1.5
 
+# Pool di connessioni keep-alive del client HTTP condiviso
+API_POOL_CONNECTIONS = 4      # host distinti tenuti in pool
+API_POOL_MAXSIZE = 16         # connessioni riutilizzabili per host
+API_POOL_BLOCK = False        # se True, attende una connessione libera invece di aprirne una extra
+
+# Rate limiter proattivo (token bucket condiviso tra i worker tramite file locale)
+API_RATE_LIMIT_PER_SECOND = 3.0          # 0 disattiva il limiter
+API_RATE_LIMIT_BURST = 3                 # token massimi accumulabili
+API_RATE_LIMIT_BACKGROUND_RESERVE = 1    # token lasciati liberi per le richieste interattive
+API_RATE_LIMIT_STATE_FILE = Path(
+    os.environ.get("OPENF1_RATE_LIMIT_FILE", Path(tempfile.gettempdir()) / "openf1-ratelimit.bin")
+)
+
+# Decodifica in streaming degli endpoint grandi (position, location, car_data, weather)
+API_STREAM_CHUNK_BYTES = 256 * 1024   # byte letti dal socket per blocco
+API_STREAM_CHUNK_ROWS = 20000         # righe per blocco di DataFrame
+
+# Le query con filtro di data vengono divise in blocchi da circa queste righe
+API_CHUNK_TARGET_ROWS = API_MAX_ITEMS // 2
+
+# Circuit breaker: dopo N errori upstream consecutivi le richieste falliscono subito per X secondi
+API_BREAKER_FAILURE_THRESHOLD = 3
+API_BREAKER_RESET_SECONDS = 30
+
+# Richieste concorrenti massime per i fetch batch (es. telemetria di due piloti)
+API_MAX_WORKERS = 4
+
 # Default per stima data_end se mancante (minuti)
 DEFAULT_LAP_DURATION_MINUTES = 2
+
+# Prefetch in background degli endpoint di sessione alla selezione di una sessione
+PREFETCH_ENABLED = True
+PREFETCH_MAX_WORKERS = 2
+# Sessioni selezionate di recente (da tutti gli utenti) il cui prefetch resta attivo; la meno recente viene annullata
+PREFETCH_MAX_SESSIONS = 4
+
+# TTL della cache per endpoint (ore) finché la sessione/meeting è recente o la data di fine è
+# sconosciuta; le sessioni finite da più di CACHE_IMMUTABLE_AFTER_DAYS giorni non scadono più
+CACHE_TTL_HOURS = {
+    "meetings": 1,
+    "sessions": 1,
+}
+CACHE_IMMUTABLE_AFTER_DAYS = 3
+# 404 e risposte vuote restano in cache per poco, per non ripetere la chiamata a ogni callback
+CACHE_NEGATIVE_TTL_MINUTES = 10
+# Le voci scadute vengono servite subito e aggiornate in background (stale-while-revalidate)
+CACHE_STALE_WHILE_REVALIDATE = True
+CACHE_REFRESH_MAX_WORKERS = 2
+# Livello in memoria (LRU) dei DataFrame già letti, davanti alla cache su file
+CACHE_MEMORY_MAX_MB = 256
+# Budget della cache su disco: oltre il limite si rimuovono le voci usate meno di recente
+# (su Vercel /tmp ha 512 MB in tutto). Le ultime voci fissate (giri della sessione aperta) restano.
+CACHE_MAX_MB = int(os.environ.get("OPENF1_CACHE_MAX_MB", 400))
+CACHE_PINNED_MAX_ENTRIES = 4
+# Attesa massima del lock tra processi su una chiave fredda (un solo worker la scarica)
+CACHE_LOCK_TIMEOUT_SECONDS = 120
+# Compressione delle voci colonnari: None, "gzip", "bz2", "lzma" o "zstd" (pacchetto zstandard);
+# livello None = default del codec. Le voci vengono riconosciute in lettura, qualunque sia il codec
+CACHE_COMPRESSION = os.environ.get("OPENF1_CACHE_COMPRESSION") or None
+CACHE_COMPRESSION_LEVEL = int(os.environ["OPENF1_CACHE_COMPRESSION_LEVEL"]) if os.environ.get("OPENF1_CACHE_COMPRESSION_LEVEL") else None
+# Livelli della cache in ordine di lettura (utils/cache_backends.py): "memory", "file", "snapshot", "kv".
+# Le letture si fermano al primo livello che ha la voce, le scritture vanno a tutti quelli scrivibili.
+# Es. "file,snapshot,kv" per condividere la cache tra worker e istanze, "memory,kv" senza voci su disco:
+# in CACHE_DIR restano comunque voci negative, validatori (.meta.json), colonne .cols, locks/ e manifest
+CACHE_BACKENDS = tuple(
+    name.strip() for name in os.environ.get("OPENF1_CACHE_BACKENDS", "file,snapshot").split(",") if name.strip()
+)
+CACHE_MEMORY_BACKEND_MAX_MB = 128
+# Server chiave-valore compatibile Redis del backend "kv" (in locale: python -m tools.kv_server)
+CACHE_KV_URL = os.environ.get("OPENF1_CACHE_KV_URL", "redis://127.0.0.1:6379/0")
+CACHE_KV_TIMEOUT_SECONDS = 1.0
+# Se il server non risponde il backend resta spento per questo tempo
+CACHE_KV_RETRY_SECONDS = 30
+CACHE_KV_EXPIRY_HOURS = 24 * 7
+
+# Telemetria: scarica car_data/location dell'intera sessione per pilota una sola volta
+# e ritaglia i giri localmente (False = una query date>/date< per ogni giro)
+TELEMETRY_FULL_SESSION = True
+TELEMETRY_STORE_MAX_ENTRIES = 8   # (endpoint, sessione, pilota) tenuti in memoria
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# La cache viene letta da OPENF1_CACHE_DIR all'import: i test non toccano quella del repo
+os.environ.setdefault("OPENF1_CACHE_DIR", tempfile.mkdtemp(prefix="openf1-test-cache-"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from tools import backfill
+
+
+@pytest.fixture
+def season(monkeypatch):
+    monkeypatch.setattr(backfill, "fetch_meetings", lambda year: pd.DataFrame({"meeting_key": [1229]}))
+    monkeypatch.setattr(
+        backfill, "fetch_sessions", lambda meeting_key: pd.DataFrame({"session_key": [9472], "session_name": ["Race"]})
+    )
+    monkeypatch.setattr(backfill, "fetch_drivers", lambda session_key: pd.DataFrame({"driver_number": [1, 16]}))
+
+
+def test_drivers_are_backfilled_without_telemetry(season, tmp_path):
+    checkpoint = backfill.Checkpoint(tmp_path / "checkpoint.json")
+
+    jobs = backfill.plan_season(2024, None, False, checkpoint)
+
+    assert "9472/drivers" in {job[0] for job in jobs}
+    assert not any(job[0].startswith("9472/car_data") for job in jobs)
+
+
+def test_telemetry_plans_one_job_per_driver(season, tmp_path):
+    checkpoint = backfill.Checkpoint(tmp_path / "checkpoint.json")
+
+    job_ids = {job[0] for job in backfill.plan_season(2024, None, True, checkpoint)}
+
+    assert {"9472/car_data/1", "9472/location/16"} <= job_ids
+    assert "9472/drivers" in checkpoint.done
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from utils import cache, file_lock
+
+
+def test_remove_from_cache_drops_the_key_lock():
+    cache.save_frame("cleanup_entry", pd.DataFrame({"x": [1, 2]}))
+    with file_lock.key_lock("cleanup_entry"):
+        pass
+    assert cache.get_lock_path("cleanup_entry").exists()
+
+    cache.remove_from_cache("cleanup_entry")
+
+    assert not cache.get_lock_path("cleanup_entry").exists()
+
+
+def test_clear_cache_removes_locks_and_leftover_temporaries():
+    with file_lock.key_lock("cleanup_lock_only"):
+        pass
+    leftover = cache.CACHE_DIR / "cleanup_crashed.npz.1234.5678.tmp"
+    leftover.write_bytes(b"scrittura interrotta")
+    leftover_dir = cache.CACHE_DIR / "columns_cleanup_crashed.cols.1234.5678.tmp"
+    leftover_dir.mkdir()
+
+    cache.clear_cache()
+
+    assert not (cache.CACHE_DIR / "locks").exists()
+    assert not leftover.exists()
+    assert not leftover_dir.exists()
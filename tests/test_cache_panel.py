@@ -0,0 +1,31 @@
+from callbacks import cache as cache_panel
+from utils import circuit_breaker, rate_limit, single_flight
+
+
+def test_upstream_stats_are_shown_in_the_cache_panel(monkeypatch):
+    monkeypatch.setattr(rate_limit, "get_stats", lambda: {
+        rate_limit.INTERACTIVE: {"requests": 7, "waited": 2, "wait_seconds": 0.5, "max_wait_seconds": 0.4},
+        rate_limit.BACKGROUND: {"requests": 5, "waited": 3, "wait_seconds": 2.0, "max_wait_seconds": 1.5},
+    })
+    monkeypatch.setattr(circuit_breaker, "get_stats", lambda: {
+        "state": circuit_breaker.OPEN, "consecutive_failures": 3, "opened": 1, "rejected": 4, "failures": 3,
+    })
+    monkeypatch.setattr(single_flight, "get_stats", lambda: {"executed": 6, "coalesced": 2, "in_flight": 0})
+
+    assert cache_panel._upstream_status("en") == [
+        "Rate limit: 12 requests, 5 waited (max 1.5 s)",
+        "Circuit breaker open: 1 trips, 4 requests rejected, 3 errors",
+        "Coalesced requests: 2 of 8",
+    ]
+
+
+def test_idle_upstream_adds_nothing(monkeypatch):
+    monkeypatch.setattr(rate_limit, "get_stats", lambda: {
+        lane: {"requests": 0, "waited": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0} for lane in rate_limit.LANES
+    })
+    monkeypatch.setattr(circuit_breaker, "get_stats", lambda: {
+        "state": circuit_breaker.CLOSED, "consecutive_failures": 0, "opened": 0, "rejected": 0, "failures": 0,
+    })
+    monkeypatch.setattr(single_flight, "get_stats", lambda: {"executed": 0, "coalesced": 0, "in_flight": 0})
+
+    assert cache_panel._upstream_status("it") == []
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from tools.openf1_stub import start_stub_server
+from utils.cache_snapshot import INDEX_NAME, build_snapshot
+
+REPO = Path(__file__).resolve().parent.parent
+
+FETCH = (
+    "import json, sys; from api import openf1; "
+    "rows = [len(getattr(openf1, name)(int(sys.argv[1]))) for name in ('fetch_laps', 'fetch_stints', 'fetch_drivers')]; "
+    "print(json.dumps({'rows': rows, 'requests': openf1.get_http_stats()['requests']}))"
+)
+
+
+def _run(args: list[str], **env) -> subprocess.CompletedProcess:
+    environ = {key: value for key, value in os.environ.items() if key != "OPENF1_CACHE_BACKENDS"}
+    return subprocess.run(
+        [sys.executable, *args], cwd=REPO, env={**environ, **env}, capture_output=True, text=True, check=True
+    )
+
+
+def test_old_snapshot_serves_a_concluded_session_on_a_cold_instance(tmp_path):
+    with start_stub_server() as stub:
+        session_key = stub.source.session_key
+        _run(
+            ["-m", "tools.backfill", str(stub.source.year), "--no-telemetry", "--checkpoint", str(tmp_path / "checkpoint.json")],
+            OPENF1_CACHE_DIR=str(tmp_path / "work"), OPENF1_BASE_URL=stub.base_url,
+        )
+        snapshot = tmp_path / "snapshot"
+        build_snapshot(tmp_path / "work", snapshot)
+
+        # Snapshot costruito 7 ore fa: oltre il TTL degli endpoint di sessione
+        index = json.loads((snapshot / INDEX_NAME).read_text(encoding="utf-8"))
+        for entry in index["entries"].values():
+            entry["mtime"] -= 7 * 3600
+        (snapshot / INDEX_NAME).write_text(json.dumps(index), encoding="utf-8")
+        upstream_before = stub.stats["requests"]
+
+        result = _run(
+            ["-c", FETCH, str(session_key)],
+            OPENF1_CACHE_DIR=str(tmp_path / "cold"), OPENF1_CACHE_SNAPSHOT_DIR=str(snapshot),
+            OPENF1_BASE_URL=stub.base_url,
+        )
+
+    fetched = json.loads(result.stdout.strip().splitlines()[-1])
+    assert all(fetched["rows"])
+    assert fetched["requests"] == 0
+    assert stub.stats["requests"] == upstream_before
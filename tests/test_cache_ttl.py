@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from api import openf1
+from api.schemas import apply_schema
+from config import CACHE_TTL_HOURS
+from utils import cache
+from utils.cache import CACHE_EXPIRY_HOURS
+
+FIXTURES = Path(__file__).parent / "fixtures"
+REPO = Path(__file__).resolve().parent.parent
+
+# Gara del Bahrain 2024 (fixture): conclusa il 2024-03-02 alle 17:00 UTC
+RACE = 9472
+MEETING = 1229
+DAY_AFTER = datetime(2024, 3, 3, 17, tzinfo=timezone.utc)
+WEEKS_AFTER = datetime(2024, 3, 20, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def registered(monkeypatch):
+    """Sessioni e meeting delle fixture letti da ``fetch_meetings``/``fetch_sessions``, come nell'app."""
+    def fetch_frame(endpoint, params=None, *args, **kwargs):
+        records = json.loads((FIXTURES / f"{endpoint}.json").read_text(encoding="utf-8"))
+        return apply_schema(pd.DataFrame(records), endpoint)
+
+    monkeypatch.setattr(openf1, "_fetch_frame", fetch_frame)
+    openf1.fetch_meetings(2024)
+    openf1.fetch_sessions(MEETING)
+
+
+def test_concluded_session_never_expires(registered):
+    assert cache.cache_ttl_hours("laps", {"session_key": RACE}, now=WEEKS_AFTER) is None
+    assert cache.cache_ttl_hours("car_data", {"session_key": RACE, "driver_number": 1}, now=WEEKS_AFTER) is None
+
+
+def test_recent_session_keeps_the_endpoint_ttl(registered):
+    assert cache.cache_ttl_hours("laps", {"session_key": RACE}, now=DAY_AFTER) == CACHE_EXPIRY_HOURS
+    assert cache.cache_ttl_hours("sessions", {"session_key": RACE}, now=DAY_AFTER) == CACHE_TTL_HOURS["sessions"]
+
+
+def test_meeting_end_date(registered):
+    assert cache.cache_ttl_hours("sessions", {"meeting_key": MEETING}, now=WEEKS_AFTER) is None
+    assert cache.cache_ttl_hours("sessions", {"meeting_key": MEETING}, now=DAY_AFTER) == CACHE_TTL_HOURS["sessions"]
+
+
+def test_year_ends_on_new_year():
+    assert cache.cache_ttl_hours("meetings", {"year": 2023}, now=WEEKS_AFTER) is None
+    assert cache.cache_ttl_hours("meetings", {"year": 2024}, now=WEEKS_AFTER) == CACHE_TTL_HOURS["meetings"]
+    assert cache.cache_ttl_hours("meetings", {"year": 2024}, now=datetime(2025, 1, 5, tzinfo=timezone.utc)) is None
+
+
+def test_unknown_end_date_uses_the_endpoint_ttl():
+    assert cache.cache_ttl_hours("laps", {"session_key": 1}, now=WEEKS_AFTER) == CACHE_EXPIRY_HOURS
+    assert cache.cache_ttl_hours("laps", {}, now=WEEKS_AFTER) == CACHE_EXPIRY_HOURS
+
+
+def _ttl_in_fresh_process(endpoint: str, params: dict) -> float | None:
+    code = (
+        "import json, sys; from datetime import datetime; from utils import cache; "
+        "print(json.dumps(cache.cache_ttl_hours(sys.argv[1], json.loads(sys.argv[2]), "
+        "now=datetime.fromisoformat(sys.argv[3]))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, endpoint, json.dumps(params), WEEKS_AFTER.isoformat()],
+        cwd=REPO, env=os.environ.copy(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_cold_process_knows_end_dates_seen_by_another_process(registered):
+    # Un worker appena avviato non ha letto sessioni né meeting: le date vengono dal manifest
+    assert _ttl_in_fresh_process("laps", {"session_key": RACE}) is None
+    assert _ttl_in_fresh_process("sessions", {"meeting_key": MEETING}) is None
+    assert _ttl_in_fresh_process("laps", {"session_key": 1}) == CACHE_EXPIRY_HOURS
@@ -0,0 +1,44 @@
+import pytest
+import requests
+
+from api import openf1
+from utils import circuit_breaker, rate_limit
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    """Circuit breaker chiuso, che si apre al primo errore e lascia passare subito la prova."""
+    monkeypatch.setattr(circuit_breaker, "API_BREAKER_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(circuit_breaker, "API_BREAKER_RESET_SECONDS", 0)
+    monkeypatch.setattr(circuit_breaker, "_state", circuit_breaker.CLOSED)
+    monkeypatch.setattr(circuit_breaker, "_failures", 0)
+    monkeypatch.setattr(circuit_breaker, "_probe_in_flight", False)
+    monkeypatch.setattr(rate_limit, "acquire", lambda *args, **kwargs: None)
+    return circuit_breaker
+
+
+class _FailingSession:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def get(self, *args, **kwargs):
+        raise self.error
+
+
+@pytest.mark.parametrize(
+    "error",
+    [requests.exceptions.ChunkedEncodingError("corpo troncato"), requests.TooManyRedirects("redirect")],
+)
+def test_probe_failing_with_any_request_error_reopens_circuit(breaker, monkeypatch, error):
+    monkeypatch.setattr(openf1, "_get_http_session", lambda: _FailingSession(error))
+    breaker.record_failure()
+    assert breaker.get_stats()["state"] == breaker.OPEN
+
+    # La richiesta di prova passa e fallisce con un errore diverso da timeout/connessione
+    with pytest.raises(type(error)):
+        openf1._send_request("laps", {"session_key": 1})
+
+    assert breaker.get_stats()["state"] == breaker.OPEN
+    # Il circuito non resta bloccato in half-open: allo scadere passa una nuova prova
+    breaker.before_request()
+    assert breaker.get_stats()["state"] == breaker.HALF_OPEN
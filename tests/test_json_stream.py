@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from api import openf1
+from api.schemas import apply_schema
+from tools.fixtures import SyntheticSession
+from utils.json_stream import iter_frames, iter_json_array
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _recorded_body(endpoint: str) -> bytes:
+    return (FIXTURES / f"{endpoint}.json").read_bytes()
+
+
+def _synthetic_body(endpoint: str) -> bytes:
+    session = SyntheticSession(n_drivers=2, n_laps=2)
+    return json.dumps(session.records(endpoint, {"driver_number": 1})).encode("utf-8")
+
+
+def _split(body: bytes, size: int) -> list[bytes]:
+    return [body[offset : offset + size] for offset in range(0, len(body), size)]
+
+
+class _StreamedResponse:
+    def __init__(self, pieces: list[bytes]):
+        self.pieces = pieces
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+    def iter_content(self, chunk_size):
+        yield from self.pieces
+
+
+@pytest.mark.parametrize(
+    "endpoint, body",
+    [
+        ("race_control", _recorded_body("race_control")),
+        ("weather", _recorded_body("weather")),
+        ("car_data", _synthetic_body("car_data")),
+    ],
+    ids=["race_control", "weather", "car_data"],
+)
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096])
+def test_stream_frames_matches_json_loads(monkeypatch, endpoint, body, size):
+    monkeypatch.setattr(openf1, "_send_request", lambda *args, **kwargs: _StreamedResponse(_split(body, size)))
+
+    frames = list(openf1._stream_frames(endpoint, {}, None))
+
+    expected = apply_schema(pd.DataFrame(json.loads(body)), endpoint)
+    pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), expected)
+
+
+def test_every_split_point_decodes_the_same_records():
+    # Tagli dentro caratteri UTF-8 multibyte, sequenze di escape, numeri e parole chiave
+    body = _recorded_body("race_control")
+    expected = json.loads(body)
+
+    for cut in range(1, len(body)):
+        assert list(iter_json_array([body[:cut], b"", body[cut:]])) == expected
+
+
+def test_frames_are_split_by_rows():
+    body = _recorded_body("race_control")
+    records = json.loads(body)
+
+    frames = list(iter_frames(iter_json_array(_split(body, 5)), chunk_rows=3))
+
+    assert [len(frame) for frame in frames] == [3, 3, 1]
+    for index, frame in enumerate(frames):
+        pd.testing.assert_frame_equal(frame, pd.DataFrame(records[index * 3 : index * 3 + 3]))
+
+
+@pytest.mark.parametrize("body", [b'[{"a": 1}, {"a": 2}', b'[{"a": 1}, {"a": '])
+def test_truncated_body_raises(body):
+    with pytest.raises(ValueError):
+        list(iter_json_array(_split(body, 4)))
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from api import prefetch
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """Prefetch con un solo worker, bloccato finché il test non rilascia ``release``."""
+    release = threading.Event()
+    fetched = []
+    lock = threading.Lock()
+
+    def fetcher(session_key):
+        with lock:
+            fetched.append(session_key)
+
+    monkeypatch.setattr(prefetch, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(prefetch, "PREFETCH_MAX_WORKERS", 1)
+    monkeypatch.setattr(prefetch, "PREFETCH_MAX_SESSIONS", 2)
+    monkeypatch.setattr(prefetch, "SESSION_FETCHERS", (fetcher, fetcher))
+    monkeypatch.setattr(prefetch, "warm_session_cache", lambda session_key: release.wait(10) and 0)
+    prefetch.shutdown_prefetch()
+    yield release, fetched
+    release.set()
+    prefetch.shutdown_prefetch()
+
+
+def _wait_all():
+    for _, futures in list(prefetch._sessions.values()):
+        for future in futures:
+            if not future.cancelled():
+                future.result(timeout=10)
+
+
+def test_users_on_different_sessions_do_not_cancel_each_other(queue):
+    release, fetched = queue
+    prefetch.prefetch_session(1)
+    prefetch.prefetch_session(2)
+    prefetch.prefetch_session(1)
+    release.set()
+    _wait_all()
+
+    assert sorted(fetched) == [1, 1, 2, 2]
+
+
+def test_only_sessions_evicted_from_the_recent_list_are_cancelled(queue):
+    release, fetched = queue
+    prefetch.prefetch_session(1)
+    prefetch.prefetch_session(2)
+    prefetch.prefetch_session(1)
+    prefetch.prefetch_session(3)  # esce la 2, selezionata meno di recente
+    release.set()
+    _wait_all()
+
+    assert list(prefetch._sessions) == [1, 3]
+    assert sorted(fetched) == [1, 1, 3, 3]
@@ -0,0 +1,35 @@
+import pandas as pd
+from dash import html
+
+from api.schemas import apply_schema
+from callbacks.race_control_weather import _build_race_control_table
+
+
+def _cells(component) -> list[str]:
+    body = next(child for child in _walk(component) if isinstance(child, html.Tbody))
+    return [cell.children for row in body.children for cell in row.children]
+
+
+def _walk(component):
+    yield component
+    children = getattr(component, "children", None)
+    for child in children if isinstance(children, list) else [children]:
+        if hasattr(child, "children"):
+            yield from _walk(child)
+
+
+def test_missing_categorical_values_render_as_dash():
+    df = apply_schema(
+        pd.DataFrame(
+            [
+                {"date": "2024-03-02T15:00:00+00:00", "category": "Flag", "flag": None, "message": "GREEN LIGHT"},
+                {"date": "2024-03-02T15:01:00+00:00", "category": None, "flag": None, "message": None},
+            ]
+        ),
+        "race_control",
+    )
+    assert isinstance(df["flag"].dtype, pd.CategoricalDtype)
+
+    cells = _cells(_build_race_control_table(df, "it"))
+    assert "nan" not in [str(cell).lower() for cell in cells]
+    assert cells.count("-") >= 4
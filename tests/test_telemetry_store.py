@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import cache, telemetry_store
+
+
+def _columns():
+    return {"date": np.arange(3, dtype="int64"), "speed": np.array([100, 200, 300], dtype="int16")}
+
+
+def test_expired_columns_are_a_miss():
+    telemetry_store.put_columns(("car_data", 1, 1), _columns(), time.time() - 1)
+    telemetry_store.put_columns(("car_data", 1, 2), _columns(), None)
+
+    assert telemetry_store.get_columns(("car_data", 1, 1)) is None
+    assert telemetry_store.get_columns(("car_data", 1, 2)) is not None
+
+
+def test_clear_cache_empties_the_store():
+    telemetry_store.put_columns(("car_data", 2, 1), _columns(), time.time() + 3600)
+
+    cache.clear_cache()
+
+    assert telemetry_store.get_columns(("car_data", 2, 1)) is None
+
+
+def test_columns_expire_with_the_cached_entry():
+    cache_key = "columns_car_data_test_expiry"
+    cache.save_columns(cache_key, _columns())
+    written = (cache.get_columns_dir(cache_key) / "columns.json").stat().st_mtime
+
+    assert cache.columns_expires_at(cache_key, None) is None
+    assert cache.columns_expires_at(cache_key, 2) == written + 2 * 3600
+
+
+def test_invalidation_drops_only_the_matching_store_entries():
+    for session_key in (7001, 7002):
+        columns_key = cache.get_cache_key("columns_car_data", driver_number=1, session_key=session_key)
+        cache.save_columns(columns_key, _columns())
+        telemetry_store.put_columns(("car_data", session_key, 1), _columns(), None)
+
+    cache.invalidate_cache(session_key=7001)
+
+    assert telemetry_store.get_columns(("car_data", 7001, 1)) is None
+    assert telemetry_store.get_columns(("car_data", 7002, 1)) is not None
+
+
+def test_lap_frame_shares_memory_with_the_memmapped_columns(monkeypatch):
+    from api import openf1
+
+    start = pd.Timestamp("2024-03-02T15:00:00Z").value
+    built = {
+        "date": start + np.arange(100, dtype="int64") * 250_000_000,
+        "speed": np.arange(100, dtype="int16"),
+        "throttle": np.full(100, 50, dtype="int8"),
+    }
+    columns_key = cache.get_cache_key("columns_car_data", driver_number=1, session_key=7003)
+    cache.save_columns(columns_key, built)
+    columns = cache.load_columns(columns_key, None)
+    monkeypatch.setattr(openf1, "TELEMETRY_FULL_SESSION", True)
+    monkeypatch.setattr(openf1, "fetch_session_telemetry", lambda *args: columns)
+    lap_row = pd.Series({"date_start": "2024-03-02T15:00:05+00:00", "date_end": "2024-03-02T15:00:15+00:00"})
+
+    df = openf1._fetch_lap_telemetry("car_data", 7003, 1, lap_row, ["speed", "throttle", "brake"])
+
+    assert len(df) == 39
+    assert isinstance(columns["speed"], np.memmap)
+    assert np.shares_memory(df["speed"].to_numpy(), columns["speed"])
+    assert np.shares_memory(df["throttle"].to_numpy(), columns["throttle"])
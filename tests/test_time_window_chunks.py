@@ -0,0 +1,91 @@
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from api import openf1
+from utils import cache
+
+_ROWS = 5000
+_BLOCK_ROWS = 200
+_MAX_ITEMS = 1000
+
+
+class _Upstream:
+    """Risposte in streaming a blocchi, senza troncamento, con il massimo di righe lette per richiesta."""
+
+    def __init__(self):
+        start = pd.Timestamp("2024-03-02T15:00:00Z")
+        self.data = pd.DataFrame(
+            {
+                "date": start + pd.to_timedelta(range(0, _ROWS * 270, 270), unit="ms"),
+                "driver_number": 1,
+                "speed": range(_ROWS),
+            }
+        )
+        self.requests = 0
+        self.max_rows_read = 0
+
+    def stream_frames(self, endpoint, sanitized_params, filters):
+        self.requests += 1
+        df = self.data
+        for condition in (filters or "").split("&"):
+            if condition.startswith("date>"):
+                df = df[df["date"] > pd.Timestamp(condition[5:])]
+            elif condition.startswith("date<"):
+                df = df[df["date"] < pd.Timestamp(condition[5:])]
+        read = 0
+        for offset in range(0, len(df), _BLOCK_ROWS):
+            block = df.iloc[offset : offset + _BLOCK_ROWS]
+            read += len(block)
+            self.max_rows_read = max(self.max_rows_read, read)
+            yield block.reset_index(drop=True)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    upstream = _Upstream()
+    monkeypatch.setattr(openf1, "_stream_frames", upstream.stream_frames)
+    monkeypatch.setattr(openf1, "_session_bounds", lambda session_key: None)
+    monkeypatch.setattr(openf1, "API_MAX_ITEMS", _MAX_ITEMS)
+    monkeypatch.setattr(openf1, "API_CHUNK_TARGET_ROWS", _MAX_ITEMS // 2)
+    return upstream
+
+
+def test_unbounded_window_without_session_bounds_is_read_in_bounded_chunks(upstream):
+    df = openf1._fetch_time_window("car_data", {"session_key": 424242, "driver_number": 1})
+
+    assert len(df) == _ROWS
+    assert df["speed"].tolist() == list(range(_ROWS))
+    # La lettura si ferma al primo blocco oltre il limite, anche se upstream non tronca
+    assert upstream.max_rows_read <= _MAX_ITEMS + _BLOCK_ROWS
+    assert upstream.requests > 1
+
+
+def _wait_for_refresh():
+    deadline = time.monotonic() + 10
+    while openf1._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_expired_segments_are_served_while_upstream_is_down(upstream, monkeypatch):
+    params = {"session_key": 424243, "driver_number": 1}
+    # Segmenti che scadono subito dopo il salvataggio
+    monkeypatch.setattr(openf1, "cache_ttl_hours", lambda endpoint, params: 1e-9)
+    fresh = openf1._fetch_time_window("car_data", params)
+
+    def upstream_down(*args, **kwargs):
+        raise requests.ConnectionError("OpenF1 non raggiungibile")
+        yield
+
+    monkeypatch.setattr(openf1, "_stream_frames", upstream_down)
+    stale_served = cache.get_cache_stats()["stale_served"]
+
+    df = openf1._fetch_time_window("car_data", params)
+    _wait_for_refresh()
+
+    pd.testing.assert_frame_equal(df, fresh)
+    assert cache.get_cache_stats()["stale_served"] == stale_served + 1
+    with pytest.raises(requests.ConnectionError):
+        openf1._fetch_window("car_data", params, allow_stale=False)
@@ -0,0 +1,200 @@
+"""Backfill offline della cache per una o più stagioni, con checkpoint per riprendere.
+
+Percorre ``fetch_meetings(anno)`` → ``fetch_sessions`` → tutti gli endpoint di
+sessione (giri, piloti, stint, pit, race control, meteo, posizioni, sorpassi)
+e la telemetria di sessione per pilota (``car_data`` e ``location``), così
+durante il weekend di gara gli utenti trovano già tutto in cache.
+
+I job girano nella corsia ``background`` del rate limiter (lasciando spazio
+all'app se gira sullo stesso host) con al più ``--workers`` job in parallelo.
+Ogni job completato viene annotato nel file di checkpoint: rilanciando lo
+stesso comando si riparte da dove ci si era fermati e si ritentano solo i job
+falliti. Alla fine viene stampato un riepilogo di job, richieste, byte ed errori.
+
+Uso (dalla root del repo):
+    python -m tools.backfill 2024 --workers 2
+    python -m tools.backfill 2023 2024 --sessions Race,Qualifying --no-telemetry
+
+Contro il server locale:
+    python -m tools.openf1_stub --port 8765 &
+    OPENF1_BASE_URL=http://127.0.0.1:8765/v1 python -m tools.backfill 2024
+"""
+
+import argparse
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from api.openf1 import (
+    close_http_session,
+    fetch_drivers,
+    fetch_laps,
+    fetch_meetings,
+    fetch_overtakes,
+    fetch_pitstops,
+    fetch_position,
+    fetch_race_control,
+    fetch_session_telemetry,
+    fetch_sessions,
+    fetch_stints,
+    fetch_weather,
+    get_http_stats,
+)
+from utils import cache, rate_limit
+
+logger = logging.getLogger(__name__)
+
+SESSION_FETCHERS = {
+    "laps": fetch_laps,
+    "drivers": fetch_drivers,
+    "stints": fetch_stints,
+    "pit": fetch_pitstops,
+    "race_control": fetch_race_control,
+    "weather": fetch_weather,
+    "position": fetch_position,
+    "overtakes": fetch_overtakes,
+}
+TELEMETRY_ENDPOINTS = ("car_data", "location")
+
+
+class Checkpoint:
+    """Job completati e falliti, salvati su file (scrittura atomica) dopo ogni job."""
+
+    def __init__(self, path: Path, reset: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done: set[str] = set()
+        self.failed: dict[str, str] = {}
+        if path.exists() and not reset:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.done = set(state.get("done", []))
+
+    def mark(self, job_id: str, error: Exception | None = None) -> None:
+        with self._lock:
+            if error is None:
+                self.done.add(job_id)
+                self.failed.pop(job_id, None)
+            else:
+                self.failed[job_id] = str(error)
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done), "failed": self.failed}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _job(job_id: str, fn, *args) -> tuple:
+    return job_id, fn, args
+
+
+def plan_season(year: int, session_names: set[str] | None, telemetry: bool, checkpoint: Checkpoint) -> list[tuple]:
+    """Elenco dei job di una stagione; meeting e sessioni (e i piloti, con la telemetria) vengono scaricati subito per conoscerli."""
+    jobs = []
+    meetings = fetch_meetings(year)
+    for meeting_key in meetings["meeting_key"].dropna().astype(int):
+        try:
+            sessions = fetch_sessions(meeting_key)
+        except Exception as e:
+            logger.warning("Sessioni del meeting %s non disponibili: %s", meeting_key, e)
+            checkpoint.mark(f"meeting/{meeting_key}", e)
+            continue
+        for session in sessions.itertuples(index=False):
+            if session_names and session.session_name not in session_names:
+                continue
+            session_key = int(session.session_key)
+            jobs.extend(
+                _job(f"{session_key}/{endpoint}", fetcher, session_key)
+                for endpoint, fetcher in SESSION_FETCHERS.items()
+            )
+            if not telemetry:
+                continue
+            # I piloti servono qui solo per pianificare i job per pilota: il job
+            # ``drivers`` qui sopra li scarica comunque, anche con --no-telemetry
+            try:
+                drivers = fetch_drivers(session_key)
+            except Exception as e:
+                logger.warning("Piloti della sessione %s non disponibili: %s", session_key, e)
+                continue
+            checkpoint.mark(f"{session_key}/drivers")
+            jobs.extend(
+                _job(f"{session_key}/{endpoint}/{driver_number}", fetch_session_telemetry, endpoint, session_key, driver_number)
+                for driver_number in drivers["driver_number"].dropna().astype(int)
+                for endpoint in TELEMETRY_ENDPOINTS
+            )
+    return jobs
+
+
+def _run_job(job: tuple) -> None:
+    _, fn, args = job
+    with rate_limit.priority(rate_limit.BACKGROUND):
+        fn(*args)
+
+
+def run_jobs(jobs: list[tuple], checkpoint: Checkpoint, workers: int) -> None:
+    """Esegue i job non ancora completati con al più ``workers`` in parallelo."""
+    pending = [job for job in jobs if job[0] not in checkpoint.done]
+    logger.info("Job: %d totali, %d già completati, %d da eseguire", len(jobs), len(jobs) - len(pending), len(pending))
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="openf1-backfill") as executor:
+        futures = {executor.submit(contextvars.copy_context().run, _run_job, job): job[0] for job in pending}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            job_id = futures[future]
+            error = future.exception()
+            if error is not None:
+                logger.warning("Job %s fallito: %s", job_id, error)
+            checkpoint.mark(job_id, error)
+            if completed % 25 == 0 or completed == len(pending):
+                logger.info("Avanzamento: %d/%d", completed, len(pending))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("years", type=int, nargs="+", help="stagioni da scaricare")
+    parser.add_argument("--workers", type=int, default=2, help="job in parallelo")
+    parser.add_argument("--sessions", default="", help="solo queste sessioni (es. Race,Qualifying)")
+    parser.add_argument("--no-telemetry", action="store_true", help="salta car_data/location per pilota")
+    parser.add_argument("--checkpoint", type=Path, help="file di checkpoint (default: nella cartella della cache)")
+    parser.add_argument("--reset", action="store_true", help="ignora il checkpoint esistente")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    checkpoint_path = args.checkpoint or cache.CACHE_DIR / "backfill" / f"{'-'.join(map(str, args.years))}.json"
+    checkpoint = Checkpoint(checkpoint_path, reset=args.reset)
+    session_names = {name.strip() for name in args.sessions.split(",") if name.strip()} or None
+
+    started, http_before = time.monotonic(), get_http_stats()
+    jobs: list[tuple] = []
+    try:
+        for year in args.years:
+            with rate_limit.priority(rate_limit.BACKGROUND):
+                jobs.extend(plan_season(year, session_names, not args.no_telemetry, checkpoint))
+        run_jobs(jobs, checkpoint, args.workers)
+    except KeyboardInterrupt:
+        logger.warning("Interrotto: rilancia lo stesso comando per riprendere (%s)", checkpoint_path)
+        return 130
+    finally:
+        close_http_session()
+        http = {name: value - http_before[name] for name, value in get_http_stats().items()}
+        print(
+            f"Backfill {', '.join(map(str, args.years))}: {len(jobs)} job, "
+            f"{sum(job[0] in checkpoint.done for job in jobs)} completati, {len(checkpoint.failed)} falliti · "
+            f"{http['requests']} richieste, {http['bytes'] / (1024 * 1024):.1f} MB scaricati, "
+            f"{http['errors']} errori di connessione · {time.monotonic() - started:.1f} s · "
+            f"cache {cache.cache_size_mb():.1f} MB"
+        )
+        for job_id, error in sorted(checkpoint.failed.items()):
+            print(f"  FALLITO {job_id}: {error}")
+    return 1 if checkpoint.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
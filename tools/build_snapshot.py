@@ -0,0 +1,57 @@
+"""Costruisce lo snapshot di cache in sola lettura da distribuire con il deploy.
+
+Esegue il backfill (``tools/backfill.py``) delle stagioni indicate in una
+cartella di lavoro, usata come ``OPENF1_CACHE_DIR`` senza limite di spazio,
+poi copia le voci in ``--out`` con l'indice ``index.json``
+(``utils/cache_snapshot.py``). Manifest, lock, checkpoint, validatori e voci
+negative restano fuori.
+
+La cartella di lavoro viene conservata: rilanciando il comando il backfill
+riparte dal checkpoint e scarica solo ciò che manca.
+
+Uso (dalla root del repo):
+    python -m tools.build_snapshot 2024 --no-telemetry
+    python -m tools.build_snapshot 2023 2024 --sessions Race,Qualifying --out cache-snapshot
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from utils.cache_snapshot import SNAPSHOT_DIR, build_snapshot
+
+DEFAULT_WORK_DIR = Path(tempfile.gettempdir()) / "openf1-snapshot-build"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("years", type=int, nargs="+", help="stagioni da includere")
+    parser.add_argument("--out", type=Path, default=SNAPSHOT_DIR, help=f"cartella dello snapshot (default: {SNAPSHOT_DIR})")
+    parser.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR, help="cache di lavoro del backfill")
+    parser.add_argument("--workers", type=int, default=2, help="job di backfill in parallelo")
+    parser.add_argument("--sessions", default="", help="solo queste sessioni (es. Race,Qualifying)")
+    parser.add_argument("--no-telemetry", action="store_true", help="salta car_data/location per pilota")
+    args = parser.parse_args(argv)
+
+    backfill = [sys.executable, "-m", "tools.backfill", *map(str, args.years), "--workers", str(args.workers)]
+    if args.sessions:
+        backfill += ["--sessions", args.sessions]
+    if args.no_telemetry:
+        backfill.append("--no-telemetry")
+    # La cache di lavoro non deve perdere voci per il budget di spazio
+    env = {**os.environ, "OPENF1_CACHE_DIR": str(args.work_dir), "OPENF1_CACHE_MAX_MB": str(10**9)}
+    returncode = subprocess.run(backfill, env=env, cwd=Path(__file__).parent.parent).returncode
+    if returncode != 0:
+        print(f"Backfill non completato (codice {returncode}): snapshot non aggiornato", file=sys.stderr)
+        return returncode
+
+    summary = build_snapshot(args.work_dir, args.out)
+    print(f"Snapshot {args.out}: {summary['entries']} voci, {summary['bytes'] / (1024 * 1024):.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
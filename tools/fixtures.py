@@ -0,0 +1,324 @@
+"""Fixture di sessione per il server OpenF1 locale: sintetiche o registrate.
+
+Le fixture sintetiche sono deterministiche (seed per pilota) e coprono tutti gli
+endpoint usati da ``api/openf1.py``. La telemetria (``car_data``/``location``)
+viene generata su richiesta per (sessione, pilota), così anche una gara completa
+non deve stare tutta in memoria.
+
+Le fixture registrate sono file ``<endpoint>.json`` (liste di record come
+restituite da OpenF1) in una cartella; la telemetria può essere divisa in
+``car_data.json``/``location.json`` o, per pilota, ``car_data_<driver>.json``.
+"""
+
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ENDPOINTS = (
+    "meetings",
+    "sessions",
+    "laps",
+    "drivers",
+    "stints",
+    "pit",
+    "race_control",
+    "weather",
+    "position",
+    "overtakes",
+    "car_data",
+    "location",
+)
+TELEMETRY_ENDPOINTS = ("car_data", "location")
+
+_DRIVERS = [
+    (1, "Max", "Verstappen", "VER", "Red Bull Racing"),
+    (11, "Sergio", "Perez", "PER", "Red Bull Racing"),
+    (16, "Charles", "Leclerc", "LEC", "Ferrari"),
+    (55, "Carlos", "Sainz", "SAI", "Ferrari"),
+    (44, "Lewis", "Hamilton", "HAM", "Mercedes"),
+    (63, "George", "Russell", "RUS", "Mercedes"),
+    (4, "Lando", "Norris", "NOR", "McLaren"),
+    (81, "Oscar", "Piastri", "PIA", "McLaren"),
+    (14, "Fernando", "Alonso", "ALO", "Aston Martin"),
+    (18, "Lance", "Stroll", "STR", "Aston Martin"),
+    (10, "Pierre", "Gasly", "GAS", "Alpine"),
+    (31, "Esteban", "Ocon", "OCO", "Alpine"),
+    (23, "Alexander", "Albon", "ALB", "Williams"),
+    (2, "Logan", "Sargeant", "SAR", "Williams"),
+    (22, "Yuki", "Tsunoda", "TSU", "RB"),
+    (3, "Daniel", "Ricciardo", "RIC", "RB"),
+    (77, "Valtteri", "Bottas", "BOT", "Kick Sauber"),
+    (24, "Guanyu", "Zhou", "ZHO", "Kick Sauber"),
+    (20, "Kevin", "Magnussen", "MAG", "Haas F1 Team"),
+    (27, "Nico", "Hulkenberg", "HUL", "Haas F1 Team"),
+]
+
+_SAMPLE_INTERVAL_S = 0.27  # ~3.7 Hz come car_data/location reali
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+
+class SyntheticSession:
+    """Sessione di gara sintetica: un meeting, una sessione, ``n_drivers`` piloti e ``n_laps`` giri."""
+
+    def __init__(
+        self,
+        year: int = 2024,
+        meeting_key: int = 1229,
+        session_key: int = 9472,
+        n_drivers: int = 20,
+        n_laps: int = 57,
+        base_lap_s: float = 92.0,
+        start: datetime | None = None,
+    ):
+        self.year = year
+        self.meeting_key = meeting_key
+        self.session_key = session_key
+        self.drivers = _DRIVERS[: max(1, min(n_drivers, len(_DRIVERS)))]
+        self.n_laps = n_laps
+        self.base_lap_s = base_lap_s
+        self.start = start or datetime(year, 3, 2, 15, 3, tzinfo=timezone.utc)
+        self._laps = self._build_laps()
+        self.end = max(datetime.fromisoformat(lap["date_end"]) for lap in self._laps) + timedelta(minutes=5)
+        self._telemetry_cache: dict[tuple, list[dict]] = {}
+
+    # ── endpoint di sessione ──────────────────────────────────
+    def _common(self) -> dict:
+        return {"meeting_key": self.meeting_key, "session_key": self.session_key}
+
+    def meetings(self) -> list[dict]:
+        return [
+            {
+                "meeting_key": self.meeting_key,
+                "year": self.year,
+                "country_name": "Bahrain",
+                "meeting_name": "Bahrain Grand Prix",
+                "circuit_short_name": "Sakhir",
+                "date_start": _iso(self.start - timedelta(days=2)),
+                "date_end": _iso(self.end),
+            }
+        ]
+
+    def sessions(self) -> list[dict]:
+        return [
+            {
+                **self._common(),
+                "session_name": "Race",
+                "session_type": "Race",
+                "year": self.year,
+                "date_start": _iso(self.start),
+                "date_end": _iso(self.end),
+            }
+        ]
+
+    def drivers_records(self) -> list[dict]:
+        return [
+            {
+                **self._common(),
+                "driver_number": number,
+                "first_name": first,
+                "last_name": last,
+                "full_name": f"{first} {last.upper()}",
+                "broadcast_name": f"{first[0]} {last.upper()}",
+                "name_acronym": acronym,
+                "team_name": team,
+            }
+            for number, first, last, acronym, team in self.drivers
+        ]
+
+    def _lap_time(self, grid_index: int, lap_number: int) -> float:
+        rng = random.Random(self.session_key * 1000 + grid_index * 100 + lap_number)
+        return self.base_lap_s + grid_index * 0.08 + rng.uniform(-0.6, 0.9) + (8.0 if lap_number == 1 else 0.0)
+
+    def _build_laps(self) -> list[dict]:
+        laps = []
+        for grid_index, (number, *_rest) in enumerate(self.drivers):
+            t = self.start + timedelta(seconds=grid_index * 0.3)
+            for lap_number in range(1, self.n_laps + 1):
+                duration = self._lap_time(grid_index, lap_number)
+                end = t + timedelta(seconds=duration)
+                laps.append(
+                    {
+                        **self._common(),
+                        "driver_number": number,
+                        "lap_number": lap_number,
+                        "date_start": _iso(t),
+                        "date_end": _iso(end),
+                        "lap_duration": round(duration, 3),
+                        "duration_sector_1": round(duration * 0.31, 3),
+                        "duration_sector_2": round(duration * 0.42, 3),
+                        "duration_sector_3": round(duration * 0.27, 3),
+                        "is_pit_out_lap": lap_number == self.n_laps // 2 + 1,
+                    }
+                )
+                t = end
+        return laps
+
+    def laps(self) -> list[dict]:
+        return list(self._laps)
+
+    def stints(self) -> list[dict]:
+        pit_lap = self.n_laps // 2
+        records = []
+        for number, *_rest in self.drivers:
+            records.append({**self._common(), "driver_number": number, "stint_number": 1, "compound": "MEDIUM",
+                            "lap_start": 1, "lap_end": pit_lap, "tyre_age_at_start": 0})
+            records.append({**self._common(), "driver_number": number, "stint_number": 2, "compound": "HARD",
+                            "lap_start": pit_lap + 1, "lap_end": self.n_laps, "tyre_age_at_start": 0})
+        return records
+
+    def pit(self) -> list[dict]:
+        pit_lap = self.n_laps // 2
+        by_driver = {(lap["driver_number"], lap["lap_number"]): lap for lap in self._laps}
+        records = []
+        for grid_index, (number, *_rest) in enumerate(self.drivers):
+            lap = by_driver[(number, pit_lap)]
+            records.append({**self._common(), "driver_number": number, "lap_number": pit_lap,
+                            "date": lap["date_end"], "pit_duration": round(22.5 + grid_index * 0.1, 1)})
+        return records
+
+    def race_control(self) -> list[dict]:
+        return [
+            {**self._common(), "date": _iso(self.start - timedelta(minutes=1)), "category": "Flag",
+             "flag": "GREEN", "scope": "Track", "sector": None, "lap_number": 1, "driver_number": None,
+             "message": "GREEN LIGHT - PIT EXIT OPEN"},
+            {**self._common(), "date": _iso(self.start + timedelta(minutes=40)), "category": "Flag",
+             "flag": "YELLOW", "scope": "Sector", "sector": 7, "lap_number": 25, "driver_number": None,
+             "message": "YELLOW IN TRACK SECTOR 7"},
+            {**self._common(), "date": _iso(self.end - timedelta(minutes=5)), "category": "Flag",
+             "flag": "CHEQUERED", "scope": "Track", "sector": None, "lap_number": self.n_laps,
+             "driver_number": None, "message": "CHEQUERED FLAG"},
+        ]
+
+    def weather(self) -> list[dict]:
+        records = []
+        t = self.start - timedelta(minutes=10)
+        minute = 0
+        while t < self.end:
+            records.append({**self._common(), "date": _iso(t), "air_temperature": round(18 + 0.02 * minute, 1),
+                            "track_temperature": round(26 + 0.03 * minute, 1), "humidity": 46.0,
+                            "pressure": 1017.2, "rainfall": 0, "wind_direction": 140, "wind_speed": 1.4})
+            t += timedelta(minutes=1)
+            minute += 1
+        return records
+
+    def position(self) -> list[dict]:
+        records = []
+        cumulative = {number: 0.0 for number, *_rest in self.drivers}
+        laps_by_number: dict[int, list[dict]] = {}
+        for lap in self._laps:
+            laps_by_number.setdefault(lap["lap_number"], []).append(lap)
+        for lap_number in sorted(laps_by_number):
+            for lap in laps_by_number[lap_number]:
+                cumulative[lap["driver_number"]] += lap["lap_duration"]
+            order = sorted(cumulative, key=cumulative.get)
+            for position, number in enumerate(order, start=1):
+                end = next(lap["date_end"] for lap in laps_by_number[lap_number] if lap["driver_number"] == number)
+                records.append({**self._common(), "date": end, "driver_number": number, "position": position})
+        records.sort(key=lambda r: r["date"])
+        return records
+
+    def overtakes(self) -> list[dict]:
+        records = []
+        previous: dict[int, int] = {}
+        for record in self.position():
+            number = record["driver_number"]
+            before = previous.get(number)
+            if before is not None and record["position"] < before:
+                records.append({**self._common(), "date": record["date"], "overtaking_driver_number": number,
+                                "overtaken_driver_number": None, "position": record["position"]})
+            previous[number] = record["position"]
+        return records
+
+    # ── telemetria ────────────────────────────────────────────
+    def _telemetry(self, endpoint: str, driver_number: int) -> list[dict]:
+        key = (endpoint, driver_number)
+        if key in self._telemetry_cache:
+            return self._telemetry_cache[key]
+        driver_laps = [lap for lap in self._laps if lap["driver_number"] == driver_number]
+        if not driver_laps:
+            return []
+        rng = random.Random(driver_number)
+        records = []
+        t = datetime.fromisoformat(driver_laps[0]["date_start"])
+        end = datetime.fromisoformat(driver_laps[-1]["date_end"])
+        lap_iter = iter(driver_laps)
+        lap = next(lap_iter)
+        lap_start = datetime.fromisoformat(lap["date_start"])
+        lap_end = datetime.fromisoformat(lap["date_end"])
+        while t < end:
+            while t >= lap_end:
+                lap = next(lap_iter)
+                lap_start = datetime.fromisoformat(lap["date_start"])
+                lap_end = datetime.fromisoformat(lap["date_end"])
+            phase = (t - lap_start).total_seconds() / lap["lap_duration"]
+            angle = 2 * math.pi * phase
+            common = {**self._common(), "driver_number": driver_number, "date": _iso(t)}
+            if endpoint == "car_data":
+                speed = 200 + 110 * math.sin(angle * 6) + rng.uniform(-3, 3)
+                braking = speed < 130
+                records.append({**common, "speed": int(speed), "throttle": 0 if braking else 100,
+                                "brake": 100 if braking else 0, "n_gear": max(1, min(8, int(speed // 40))),
+                                "rpm": int(7000 + speed * 25), "drs": 12 if speed > 300 else 0})
+            else:
+                records.append({**common, "x": int(4000 * math.cos(angle)), "y": int(2500 * math.sin(angle)),
+                                "z": int(100 * math.sin(angle * 2))})
+            t += timedelta(seconds=_SAMPLE_INTERVAL_S + rng.uniform(-0.02, 0.02))
+        self._telemetry_cache[key] = records
+        return records
+
+    def records(self, endpoint: str, params: dict) -> list[dict]:
+        """Record dell'endpoint; per la telemetria genera i dati del pilota richiesto."""
+        if endpoint in TELEMETRY_ENDPOINTS:
+            driver = params.get("driver_number")
+            if driver is None:
+                return [r for number, *_rest in self.drivers for r in self._telemetry(endpoint, number)]
+            try:
+                return self._telemetry(endpoint, int(driver))
+            except ValueError:
+                return []
+        if endpoint == "drivers":
+            return self.drivers_records()
+        if endpoint in ENDPOINTS:
+            return getattr(self, endpoint)()
+        return []
+
+
+class RecordedFixtures:
+    """Fixture registrate: una cartella con un file ``<endpoint>.json`` per endpoint."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._loaded: dict[str, list[dict]] = {}
+
+    def _load(self, name: str) -> list[dict]:
+        if name not in self._loaded:
+            path = self.directory / f"{name}.json"
+            self._loaded[name] = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+        return self._loaded[name]
+
+    def records(self, endpoint: str, params: dict) -> list[dict]:
+        driver = params.get("driver_number")
+        if endpoint in TELEMETRY_ENDPOINTS and driver is not None:
+            per_driver = self.directory / f"{endpoint}_{driver}.json"
+            if per_driver.exists():
+                return self._load(f"{endpoint}_{driver}")
+        return self._load(endpoint)
+
+
+def dump_fixtures(source, directory: Path) -> None:
+    """Scrive le fixture (es. sintetiche) in una cartella leggibile da ``RecordedFixtures``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for endpoint in ENDPOINTS:
+        if endpoint in TELEMETRY_ENDPOINTS:
+            for number, *_rest in source.drivers:
+                records = source.records(endpoint, {"driver_number": number})
+                (directory / f"{endpoint}_{number}.json").write_text(json.dumps(records), encoding="utf-8")
+            continue
+        records = source.records(endpoint, {})
+        (directory / f"{endpoint}.json").write_text(json.dumps(records), encoding="utf-8")
@@ -0,0 +1,204 @@
+"""Server chiave-valore locale compatibile Redis (RESP), per provare il backend di cache ``kv``.
+
+Implementa solo i comandi usati da ``utils/cache_backends.RespBackend`` e da
+uno ``redis-cli`` per ispezionare le chiavi: ``PING``, ``AUTH``, ``SELECT``,
+``GET``, ``MGET``, ``SET`` (con ``EX``/``PX``), ``GETRANGE``, ``DEL``,
+``EXISTS``, ``SCAN`` (con ``MATCH``/``COUNT``), ``DBSIZE``, ``FLUSHDB`` e
+``QUIT``. Tiene tutto in memoria in un solo database, con scadenza delle
+chiavi; ``--latency-ms`` simula la rete tra istanze e server.
+
+Uso (dalla root del repo):
+    python -m tools.kv_server --port 6380
+    OPENF1_CACHE_BACKENDS=file,kv OPENF1_CACHE_KV_URL=redis://127.0.0.1:6380/0 python main.py
+
+Dal codice (benchmark):
+    with start_kv_server() as kv:
+        ...  # kv.url
+"""
+
+import argparse
+import fnmatch
+import logging
+import socketserver
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _CommandError(Exception):
+    pass
+
+
+class KVServer:
+    """Server RESP in memoria in un thread; usabile come context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.stats = {"connections": 0, "commands": {}}
+        self._data: dict[bytes, tuple[bytes, float | None]] = {}
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "KVServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="kv-server")
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "KVServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _get(self, key: bytes) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and time.time() >= entry[1]:
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def execute(self, command: list[bytes]):
+        """Esegue un comando e restituisce la risposta (``bytes``, ``int``, ``list``, ``None`` o ``str`` per ``+OK``)."""
+        name, args = command[0].upper().decode("ascii", "replace"), command[1:]
+        with self._lock:
+            self.stats["commands"][name] = self.stats["commands"].get(name, 0) + 1
+            if name == "PING":
+                return "PONG"
+            if name in ("AUTH", "SELECT", "QUIT"):
+                return "OK"
+            if name == "GET":
+                return self._get(args[0])
+            if name == "MGET":
+                return [self._get(key) for key in args]
+            if name == "SET":
+                expires_at = None
+                options = [arg.upper() for arg in args[2::2]]
+                for option, value in zip(options, args[3::2]):
+                    if option == b"EX":
+                        expires_at = time.time() + int(value)
+                    elif option == b"PX":
+                        expires_at = time.time() + int(value) / 1000
+                    else:
+                        raise _CommandError(f"opzione SET non supportata: {option.decode()}")
+                self._data[args[0]] = (args[1], expires_at)
+                return "OK"
+            if name == "GETRANGE":
+                value = self._get(args[0]) or b""
+                start, end = int(args[1]), int(args[2])
+                end = len(value) + end if end < 0 else end
+                return value[start : end + 1]
+            if name == "DEL":
+                return sum(self._data.pop(key, None) is not None for key in args)
+            if name == "EXISTS":
+                return sum(self._get(key) is not None for key in args)
+            if name == "SCAN":
+                # Un solo giro: il cursore restituito è sempre 0
+                options = dict(zip((arg.upper() for arg in args[1::2]), args[2::2]))
+                pattern = options.get(b"MATCH", b"*").decode("utf-8", "replace")
+                keys = [key for key in list(self._data) if self._get(key) is not None]
+                return [b"0", [key for key in keys if fnmatch.fnmatchcase(key.decode("utf-8", "replace"), pattern)]]
+            if name == "DBSIZE":
+                return len(self._data)
+            if name in ("FLUSHDB", "FLUSHALL"):
+                self._data.clear()
+                return "OK"
+        raise _CommandError(f"comando sconosciuto '{name}'")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with server._lock:
+                    server.stats["connections"] += 1
+                while True:
+                    try:
+                        command = self._read_command()
+                    except (ConnectionError, ValueError):
+                        return
+                    if command is None:
+                        return
+                    if server.latency_ms:
+                        time.sleep(server.latency_ms / 1000)
+                    try:
+                        reply = server.execute(command)
+                    except (_CommandError, IndexError, ValueError) as e:
+                        reply = _CommandError(str(e) or "numero di argomenti errato")
+                    self.wfile.write(_encode_reply(reply))
+                    if command[0].upper() == b"QUIT":
+                        return
+
+            def _read_command(self) -> list[bytes] | None:
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b"*"):
+                    # Comando inline (es. da telnet)
+                    return line.split() or [b"PING"]
+                args = []
+                for _ in range(int(line[1:])):
+                    header = self.rfile.readline()
+                    if not header.startswith(b"$"):
+                        raise ValueError("atteso un bulk string")
+                    length = int(header[1:])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+        return Handler
+
+
+def _encode_reply(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, _CommandError):
+        return f"-ERR {reply}\r\n".encode("utf-8")
+    if isinstance(reply, str):
+        return f"+{reply}\r\n".encode("utf-8")
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(_encode_reply(item) for item in reply)
+
+
+def start_kv_server(**options) -> KVServer:
+    """Avvia un ``KVServer`` in background (porta libera di default)."""
+    return KVServer(**options).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="ritardo per comando")
+    args = parser.parse_args()
+
+    server = KVServer(host=args.host, port=args.port, latency_ms=args.latency_ms)
+    print(f"Server KV in ascolto su {server.url} (Ctrl+C per uscire)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Server locale che simula l'API OpenF1 per sviluppo, benchmark e load test.
+
+Serve tutti gli endpoint usati da ``api/openf1.py`` sotto ``/v1/<endpoint>``,
+con filtri di uguaglianza (``session_key=...``, ``driver_number=...``) e filtri
+di confronto sulle date (``date>...``, ``date<...``, ``>=``, ``<=``), a partire da
+fixture sintetiche o registrate (vedi ``tools/fixtures.py``).
+
+Simula anche le condizioni dell'API reale: latenza configurabile (per richiesta
+e per apertura connessione), 404 (anche per risultati vuoti, come OpenF1) e 429
+con ``Retry-After``, oltre al troncamento delle risposte troppo grandi
+(``max_items``). Le risposte 200 hanno ``ETag`` e ``Last-Modified`` e le
+richieste condizionali ricevono 304 (disattivabile con ``validators=False``).
+
+Uso (dalla root del repo):
+    python -m tools.openf1_stub --port 8765 --latency-ms 80
+    OPENF1_BASE_URL=http://127.0.0.1:8765/v1 python main.py
+
+Dal codice (benchmark):
+    with start_stub_server(latency_ms=50) as stub:
+        ...  # stub.base_url
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from tools.fixtures import ENDPOINTS, RecordedFixtures, SyntheticSession, dump_fixtures
+
+logger = logging.getLogger(__name__)
+
+_OPERATORS = (">=", "<=", ">", "<", "=")
+
+
+def _parse_query(query: str) -> list[tuple[str, str, str]]:
+    """Divide la query OpenF1 in (campo, operatore, valore); ``date>X`` non usa ``=``."""
+    filters = []
+    for part in query.split("&"):
+        if not part:
+            continue
+        part = unquote(part)
+        for op in _OPERATORS:
+            idx = part.find(op)
+            if idx > 0:
+                field, value = part[:idx], part[idx + len(op):]
+                # '+' del fuso orario arriva spesso non codificato e diventa spazio
+                filters.append((field, op, value.replace(" ", "+")))
+                break
+    return filters
+
+
+def _to_epoch(value) -> float | None:
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _matches(record: dict, field: str, op: str, value: str) -> bool:
+    if field not in record:
+        return True
+    current = record[field]
+    if field.startswith("date"):
+        left, right = _to_epoch(current), _to_epoch(value)
+    else:
+        try:
+            left, right = float(current), float(value)
+        except (TypeError, ValueError):
+            left, right = str(current), value
+    if left is None or right is None:
+        return False
+    if op == "=":
+        return left == right
+    if op == ">":
+        return left > right
+    if op == "<":
+        return left < right
+    if op == ">=":
+        return left >= right
+    return left <= right
+
+
+class StubServer:
+    """Server OpenF1 locale in un thread; usabile come context manager."""
+
+    def __init__(
+        self,
+        source=None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        connect_delay_ms: float = 0.0,
+        not_found: tuple[str, ...] = (),
+        empty_as_404: bool = True,
+        rate_limit_every: int = 0,
+        retry_after: int = 1,
+        max_items: int = 0,
+        validators: bool = True,
+    ):
+        self.source = source or SyntheticSession()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.connect_delay_ms = connect_delay_ms
+        self.not_found = set(not_found)
+        self.empty_as_404 = empty_as_404
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.max_items = max_items
+        self.validators = validators
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.stats = {"requests": 0, "bytes": 0, "status": {}, "endpoints": {}}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name="openf1-stub")
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def query(self, endpoint: str, filters: list[tuple[str, str, str]]) -> list[dict]:
+        equality = {field: value for field, op, value in filters if op == "="}
+        records = self.source.records(endpoint, equality)
+        for field, op, value in filters:
+            records = [record for record in records if _matches(record, field, op, value)]
+        if self.max_items:
+            records = records[: self.max_items]
+        return records
+
+    def _record(self, endpoint: str, status: int, size: int) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += size
+            self.stats["status"][status] = self.stats["status"].get(status, 0) + 1
+            self.stats["endpoints"][endpoint] = self.stats["endpoints"].get(endpoint, 0) + 1
+
+    def _is_not_modified(self, request_headers, etag: str) -> bool:
+        if not self.validators:
+            return False
+        if_none_match = request_headers.get("If-None-Match")
+        if if_none_match is not None:
+            return if_none_match == etag
+        if_modified_since = request_headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(self.last_modified)
+        except (TypeError, ValueError):
+            return False
+
+    def _next_is_rate_limited(self) -> bool:
+        if not self.rate_limit_every:
+            return False
+        with self._lock:
+            return (self.stats["requests"] + 1) % self.rate_limit_every == 0
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                # Costo di apertura connessione (handshake TCP/TLS verso l'API reale)
+                if stub.connect_delay_ms:
+                    time.sleep(stub.connect_delay_ms / 1000)
+
+            def _send(self, status: int, payload, headers: dict | None = None) -> int:
+                return self._send_body(status, json.dumps(payload).encode("utf-8"), headers)
+
+            def _send_body(self, status: int, body: bytes, headers: dict | None = None) -> int:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                return len(body)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1]
+                if stub.latency_ms or stub.jitter_ms:
+                    time.sleep(max(0.0, stub.latency_ms + random.uniform(-stub.jitter_ms, stub.jitter_ms)) / 1000)
+
+                if stub._next_is_rate_limited():
+                    size = self._send(429, {"detail": "Too Many Requests"}, {"Retry-After": str(stub.retry_after)})
+                    stub._record(endpoint, 429, size)
+                    return
+                if endpoint not in ENDPOINTS or endpoint in stub.not_found:
+                    size = self._send(404, {"detail": "Not Found"})
+                    stub._record(endpoint, 404, size)
+                    return
+
+                records = stub.query(endpoint, _parse_query(parts.query))
+                if not records and stub.empty_as_404:
+                    size = self._send(404, {"detail": "No results found."})
+                    stub._record(endpoint, 404, size)
+                    return
+                body = json.dumps(records).encode("utf-8")
+                headers = {}
+                if stub.validators:
+                    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                    headers = {"ETag": etag, "Last-Modified": stub.last_modified}
+                    if stub._is_not_modified(self.headers, etag):
+                        self.send_response(304)
+                        for name, value in headers.items():
+                            self.send_header(name, value)
+                        self.end_headers()
+                        stub._record(endpoint, 304, 0)
+                        return
+                size = self._send_body(200, body, headers)
+                stub._record(endpoint, 200, size)
+
+            def log_message(self, format, *args):
+                logger.debug("stub: " + format, *args)
+
+        return Handler
+
+
+def start_stub_server(**options) -> StubServer:
+    """Avvia un ``StubServer`` in background (porta libera di default)."""
+    return StubServer(**options).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, help="cartella con fixture registrate <endpoint>.json")
+    parser.add_argument("--laps", type=int, default=57, help="giri della sessione sintetica")
+    parser.add_argument("--drivers", type=int, default=20, help="piloti della sessione sintetica")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--connect-delay-ms", type=float, default=0.0, help="ritardo all'apertura di ogni connessione")
+    parser.add_argument("--not-found", default="", help="endpoint che rispondono sempre 404 (separati da virgola)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="risponde 429 ogni N richieste")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--max-items", type=int, default=0, help="tronca le risposte a N righe (0 = nessun limite)")
+    parser.add_argument("--no-validators", action="store_true", help="niente ETag/Last-Modified né 304")
+    parser.add_argument("--dump-synthetic", type=Path, help="scrive le fixture sintetiche nella cartella ed esce")
+    args = parser.parse_args()
+
+    synthetic = SyntheticSession(n_drivers=args.drivers, n_laps=args.laps)
+    if args.dump_synthetic:
+        dump_fixtures(synthetic, args.dump_synthetic)
+        print(f"Fixture sintetiche scritte in {args.dump_synthetic}")
+        return
+
+    stub = StubServer(
+        source=RecordedFixtures(args.fixtures) if args.fixtures else synthetic,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        connect_delay_ms=args.connect_delay_ms,
+        not_found=tuple(name for name in args.not_found.split(",") if name),
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        max_items=args.max_items,
+        validators=not args.no_validators,
+    )
+    print(f"OpenF1 stub in ascolto su {stub.base_url} (Ctrl+C per uscire)")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
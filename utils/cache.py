@@ -1,8 +1,37 @@
+import contextlib
+import hashlib
+import io
 import json
 import logging
 import os
+import shutil
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from config import (
+    CACHE_BACKENDS,
+    CACHE_COMPRESSION,
+    CACHE_COMPRESSION_LEVEL,
+    CACHE_IMMUTABLE_AFTER_DAYS,
+    CACHE_KV_EXPIRY_HOURS,
+    CACHE_KV_RETRY_SECONDS,
+    CACHE_KV_TIMEOUT_SECONDS,
+    CACHE_KV_URL,
+    CACHE_MAX_MB,
+    CACHE_MEMORY_BACKEND_MAX_MB,
+    CACHE_NEGATIVE_TTL_MINUTES,
+    CACHE_PINNED_MAX_ENTRIES,
+    CACHE_TTL_HOURS,
+)
+from utils import cache_snapshot, compression, memory_cache, telemetry_store
+from utils.cache_backends import CacheBackend, Entries, MemoryBackend, RespBackend, is_fresh
+from utils.cache_manifest import CacheManifest, describe_key
+from utils.columnar import read_frame, write_frame
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +42,37 @@ DEFAULT_CACHE_DIR = (
 )
 CACHE_DIR = Path(os.environ.get("OPENF1_CACHE_DIR", DEFAULT_CACHE_DIR))
 CACHE_EXPIRY_HOURS = 6
+NEGATIVE_TTL_HOURS = CACHE_NEGATIVE_TTL_MINUTES / 60
+_CACHE_PATTERNS = ("*.json", "*.npz", "*.cols")
+# Temporanei delle scritture atomiche rimasti da processi interrotti e lock per chiave
+_LEFTOVER_PATTERNS = ("*.tmp", "*.old", "locks")
+_ENTRY_SUFFIXES = (".meta.json", ".neg.json", ".json", ".npz", ".cols")
+_EVICTION_BATCH = 64
+
+_end_dates_lock = threading.Lock()
+_session_ends: dict[int, datetime] = {}
+_meeting_ends: dict[int, datetime] = {}
+
+_stats_lock = threading.Lock()
+_stats = {
+    "revalidated": 0,
+    "not_modified": 0,
+    "unchanged": 0,
+    "bytes_saved": 0,
+    "negative_hits": 0,
+    "negative_stored": 0,
+    "stale_served": 0,
+    "last_stale_served_at": 0.0,
+    "evicted": 0,
+    "evicted_bytes": 0,
+}
+_backend_hits: dict[str, int] = {}
+
+# Manifest delle voci su disco (``utils/cache_manifest.py``), condiviso tra i processi
+_manifest = CacheManifest(CACHE_DIR / "manifest.sqlite3")
+_manifest_lock = threading.Lock()
+_manifest_checked = False
+_pinned: deque = deque(maxlen=CACHE_PINNED_MAX_ENTRIES)
 
 
 def init_cache():
@@ -30,42 +90,495 @@ def get_cache_path(cache_key: str) -> Path:
     return CACHE_DIR / f"{cache_key}.json"
 
 
-def is_cache_valid(cache_path: Path) -> bool:
+def get_frame_path(cache_key: str) -> Path:
+    init_cache()
+    return CACHE_DIR / f"{cache_key}.npz"
+
+
+def _entry_path(cache_key: str) -> Path:
+    """File della voce: formato colonnare se presente, altrimenti JSON (anche legacy)."""
+    frame_path = get_frame_path(cache_key)
+    return frame_path if frame_path.exists() else get_cache_path(cache_key)
+
+
+def is_cache_valid(cache_path: Path, ttl_hours: float | None = CACHE_EXPIRY_HOURS) -> bool:
+    """Verifica esistenza e TTL di una voce; ``ttl_hours=None`` indica una voce che non scade."""
     if not cache_path.exists():
         return False
+    if ttl_hours is None:
+        return True
     file_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-    return datetime.now() < (file_time + timedelta(hours=CACHE_EXPIRY_HOURS))
+    return datetime.now() < (file_time + timedelta(hours=ttl_hours))
+
+
+def _entry_names(cache_key: str) -> list[str]:
+    """Nomi della voce nei backend: formato colonnare e JSON (anche legacy)."""
+    return [f"{cache_key}.npz", f"{cache_key}.json"]
+
+
+def cache_expires_at(cache_key: str, ttl_hours: float | None) -> float | None:
+    """Istante (epoch) in cui la voce scade con ``ttl_hours``; ``None`` se non scade."""
+    if ttl_hours is None:
+        return None
+    frame_name, json_name = _entry_names(cache_key)
+    created = _stat_entries([frame_name, json_name], None)
+    if not created:
+        return time.time()
+    return created.get(frame_name, created.get(json_name)) + ttl_hours * 3600
+
+
+def columns_expires_at(cache_key: str, ttl_hours: float | None) -> float | None:
+    """Come ``cache_expires_at``, per le colonne di ``save_columns``; se non sono in cache la scadenza parte da adesso."""
+    if ttl_hours is None:
+        return None
+    try:
+        created = (get_columns_dir(cache_key) / "columns.json").stat().st_mtime
+    except OSError:
+        created = cache_snapshot.created_at(cache_key) or time.time()
+    return created + ttl_hours * 3600
+
+
+def cached_keys(cache_keys: list[str], ttl_hours: float | None = CACHE_EXPIRY_HOURS) -> set[str]:
+    """Chiavi con una voce valida in uno dei backend, verificate con una sola lettura a blocchi per livello."""
+    names = {name: key for key in cache_keys for name in _entry_names(key)}
+    return {names[name] for name in _stat_entries(list(names), ttl_hours)}
 
 
-def load_from_cache(cache_key: str):
-    cache_path = get_cache_path(cache_key)
-    if not is_cache_valid(cache_path):
+def _as_utc(value) -> datetime | None:
+    if value is None or value != value:  # None, NaN, NaT
         return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def register_session_end(session_key, date_end) -> None:
+    """Registra la data di fine di una sessione, usata da ``cache_ttl_hours`` (anche dagli altri processi)."""
+    _register_end("session", _session_ends, session_key, date_end)
+
+
+def register_meeting_end(meeting_key, date_end) -> None:
+    """Registra la data di fine di un meeting, usata da ``cache_ttl_hours`` (anche dagli altri processi)."""
+    _register_end("meeting", _meeting_ends, meeting_key, date_end)
+
+
+def _register_end(kind: str, ends: dict[int, datetime], item_id, date_end) -> None:
+    date_end = _as_utc(date_end)
+    if item_id is None or item_id != item_id or date_end is None:
+        return
+    with _end_dates_lock:
+        changed = ends.get(int(item_id)) != date_end
+        ends[int(item_id)] = date_end
+    if changed:
+        # Nel manifest, così un worker o un'istanza appena avviati la conoscono senza rileggere sessioni e meeting
+        _manifest.record_end(kind, int(item_id), date_end.timestamp())
+
+
+def _lookup_end(kind: str, ends: dict[int, datetime], item_id) -> datetime | None:
+    item_id = int(item_id)
+    with _end_dates_lock:
+        date_end = ends.get(item_id)
+    if date_end is None:
+        timestamp = _manifest.end_date(kind, item_id)
+        if timestamp is None and "snapshot" in CACHE_BACKENDS:
+            # Istanza fredda con il manifest vuoto: le date arrivano con lo snapshot
+            timestamp = cache_snapshot.end_date(kind, item_id)
+        if timestamp is not None:
+            date_end = datetime.fromtimestamp(timestamp, timezone.utc)
+            with _end_dates_lock:
+                ends[item_id] = date_end
+    return date_end
+
+
+def _known_end(params: dict) -> datetime | None:
+    if params.get("session_key") is not None:
+        return _lookup_end("session", _session_ends, params["session_key"])
+    if params.get("meeting_key") is not None:
+        return _lookup_end("meeting", _meeting_ends, params["meeting_key"])
+    if params.get("year") is not None:
+        return datetime(int(params["year"]) + 1, 1, 1, tzinfo=timezone.utc)
+    return None
+
+
+def cache_ttl_hours(endpoint: str, params: dict, now: datetime | None = None) -> float | None:
+    """TTL in ore per una voce di ``endpoint`` con questi parametri; ``None`` se non scade mai.
+
+    I dati di una sessione (o meeting, o stagione) conclusa da più di
+    ``CACHE_IMMUTABLE_AFTER_DAYS`` giorni non cambiano più. Le date di fine
+    vengono da ``register_session_end``/``register_meeting_end`` di questo o di
+    un altro processo (manifest), o dallo snapshot. Negli altri casi, o se la data di fine non è
+    nota, vale ``CACHE_TTL_HOURS`` dell'endpoint.
+    """
+    date_end = _known_end(params)
+    now = now or datetime.now(timezone.utc)
+    if date_end is not None and now - date_end > timedelta(days=CACHE_IMMUTABLE_AFTER_DAYS):
+        return None
+    return CACHE_TTL_HOURS.get(endpoint, CACHE_EXPIRY_HOURS)
+
+
+def get_meta_path(cache_key: str) -> Path:
+    init_cache()
+    return CACHE_DIR / f"{cache_key}.meta.json"
+
+
+def get_lock_path(cache_key: str) -> Path:
+    """File del lock tra processi della chiave (``utils/file_lock.py``)."""
+    return CACHE_DIR / "locks" / f"{cache_key}.lock"
+
+
+def _read_json(cache_path: Path, cache_key: str):
     try:
         with open(cache_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        logger.debug("Cache HIT: %s", cache_key)
-        return data
+            return json.load(f)
     except (OSError, json.JSONDecodeError) as e:
         logger.warning("Errore lettura cache %s: %s", cache_key, e)
         return None
 
 
+def load_from_cache(cache_key: str, ttl_hours: float | None = CACHE_EXPIRY_HOURS):
+    data = _load_entries([f"{cache_key}.json"], ttl_hours).get(f"{cache_key}.json")
+    if data is None:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        logger.warning("Errore lettura cache %s: %s", cache_key, e)
+        return None
+
+
 def save_to_cache(cache_key: str, data) -> None:
-    cache_path = get_cache_path(cache_key)
+    _store_entries({f"{cache_key}.json": json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")})
+
+
+@contextlib.contextmanager
+def _atomic_writer(path: Path):
+    """File binario temporaneo che sostituisce ``path`` solo a scrittura completata.
+
+    Il nome del temporaneo è unico per processo e thread e ``os.replace`` è
+    atomico: chi legge in parallelo (anche da un altro worker) vede la voce
+    precedente o quella nuova, mai un file scritto a metà.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _write_json(path: Path, data, indent: int | None = None) -> None:
+    with _atomic_writer(path) as f:
+        f.write(json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8"))
+
+
+def _encode_frame(df) -> bytes:
+    buffer = io.BytesIO()
+    write_frame(buffer, df)
+    return compression.compress(buffer.getvalue(), CACHE_COMPRESSION, CACHE_COMPRESSION_LEVEL)
+
+
+def _decode_frame(data: bytes):
+    """Voce colonnare letta da un backend, compressa o no (il codec si riconosce dai primi byte)."""
+    return read_frame(io.BytesIO(compression.decompress(data)))
+
+
+def save_frame(cache_key: str, df, validators: dict | None = None, created: float | None = None) -> None:
+    """Salva un DataFrame in formato colonnare (``utils/columnar.py``), con gli eventuali validatori HTTP.
+
+    Con ``CACHE_COMPRESSION`` la voce viene compressa per intero (``utils/compression.py``).
+    I validatori restano solo su disco locale.
+    """
+    _store_entries({f"{cache_key}.npz": _encode_frame(df)}, created)
+    if validators is not None:
+        try:
+            _write_json(get_meta_path(cache_key), validators)
+        except OSError as e:
+            logger.warning("Errore salvataggio cache %s: %s", cache_key, e)
+
+
+def load_frame(cache_key: str, ttl_hours: float | None = CACHE_EXPIRY_HOURS, migrate=None):
+    """Carica una voce come DataFrame, o ``None`` se assente/scaduta (``ttl_hours=None``: ignora il TTL).
+
+    Se esiste solo la voce JSON del vecchio formato e ``migrate`` è indicato,
+    ``migrate(dati)`` la converte in DataFrame: la voce viene riscritta in
+    formato colonnare, con la stessa data di modifica, e il file JSON rimosso.
+    """
+    return load_frames([cache_key], ttl_hours, migrate).get(cache_key)
+
+
+def load_frames(cache_keys: list[str], ttl_hours: float | None = CACHE_EXPIRY_HOURS, migrate=None) -> dict:
+    """Come ``load_frame`` per più chiavi, con una sola lettura a blocchi per backend; mancano le voci assenti."""
+    entries = _load_entries([f"{key}.npz" for key in cache_keys], ttl_hours)
+    frames = {}
+    for key in cache_keys:
+        data = entries.get(f"{key}.npz")
+        if data is None:
+            df = _migrate_legacy(key, ttl_hours, migrate) if migrate is not None else None
+        else:
+            try:
+                df = _decode_frame(data)
+            except (OSError, ValueError) as e:
+                logger.warning("Errore lettura cache %s: %s", key, e)
+                df = None
+        if df is not None:
+            frames[key] = df
+    return frames
+
+
+def warm_entries(cache_keys: list[str], ttl_hours: float | None = CACHE_EXPIRY_HOURS) -> int:
+    """Copia nei backend che precedono quello che le ha le voci valide delle chiavi, senza decodificarle.
+
+    Restituisce quante voci sono state trovate; serve al prefetch da una cache condivisa.
+    """
+    return len(_load_entries([f"{key}.npz" for key in cache_keys], ttl_hours))
+
+
+def _migrate_legacy(cache_key: str, ttl_hours: float | None, migrate):
+    """Converte in formato colonnare la voce JSON del vecchio formato su disco, se valida."""
+    legacy_path = get_cache_path(cache_key)
+    if not is_cache_valid(legacy_path, ttl_hours):
+        return None
+    data = _read_json(legacy_path, cache_key)
+    if data is None:
+        return None
+    df = migrate(data)
+    try:
+        mtime = legacy_path.stat().st_mtime
+        save_frame(cache_key, df, created=mtime)
+        legacy_path.unlink()
+    except OSError as e:
+        logger.warning("Errore migrazione cache %s: %s", cache_key, e)
+    _record_write(cache_key)
+    logger.debug("Cache MIGRATE (json -> npz): %s", cache_key)
+    return df
+
+
+def get_columns_dir(cache_key: str) -> Path:
+    init_cache()
+    return CACHE_DIR / f"{cache_key}.cols"
+
+
+def save_columns(cache_key: str, columns: dict[str, np.ndarray]) -> None:
+    """Salva colonne a dtype fisso come file ``.npy`` separati, da rileggere in memory-map con ``load_columns``.
+
+    Le colonne a dtype oggetto vengono scartate. La directory viene scritta
+    a parte e poi sostituita con un rename, come le altre voci.
+    """
+    target = get_columns_dir(cache_key)
+    suffix = f"{os.getpid()}.{threading.get_ident()}"
+    tmp_dir = target.with_name(f"{target.name}.{suffix}.tmp")
+    old_dir = target.with_name(f"{target.name}.{suffix}.old")
+    try:
+        tmp_dir.mkdir()
+        names = []
+        for name, values in columns.items():
+            if values.dtype.kind in "biufM":
+                np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+                names.append(name)
+        rows = len(next(iter(columns.values()))) if columns else 0
+        _write_json(tmp_dir / "columns.json", {"columns": names, "rows": rows})
+        if target.exists():
+            os.replace(target, old_dir)
+        os.replace(tmp_dir, target)
+        logger.debug("Cache SAVE (colonne): %s", cache_key)
+    except OSError as e:
+        logger.warning("Errore salvataggio cache %s: %s", cache_key, e)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    _record_write(cache_key)
+
+
+def load_columns(cache_key: str, ttl_hours: float | None = CACHE_EXPIRY_HOURS) -> dict[str, np.ndarray] | None:
+    """Colonne salvate da ``save_columns`` come array in memory-map di sola lettura, o ``None`` se assenti/scadute.
+
+    Le pagine vengono lette dal disco solo quando servono e sono condivise tra
+    i processi tramite la page cache del sistema; i ritagli per giro restano
+    viste sugli array (``telemetry_store.slice_columns``).
+    """
+    directory = get_columns_dir(cache_key)
+    meta_path = directory / "columns.json"
+    from_snapshot = False
+    if not is_cache_valid(meta_path, ttl_hours):
+        directory = cache_snapshot.lookup(cache_key, "cols", ttl_hours) if "snapshot" in CACHE_BACKENDS else None
+        if directory is None:
+            return None
+        meta_path, from_snapshot = directory / "columns.json", True
+    meta = _read_json(meta_path, cache_key)
     try:
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        logger.debug("Cache SAVE: %s", cache_key)
+        if not meta["rows"]:
+            columns = {}
+        else:
+            columns = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r", allow_pickle=False) for name in meta["columns"]
+            }
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning("Errore lettura cache %s: %s", cache_key, e)
+        return None
+    if from_snapshot:
+        _count_hits("snapshot", 1)
+    else:
+        touch_entry(cache_key)
+        logger.debug("Cache HIT (colonne): %s", cache_key)
+    return columns
+
+
+def response_validators(headers, body: bytes) -> dict:
+    """Validatori di una risposta: ETag/Last-Modified se presenti, sempre hash e dimensione del corpo."""
+    validators = {"sha256": hashlib.sha256(body).hexdigest(), "bytes": len(body)}
+    if headers.get("ETag"):
+        validators["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        validators["last_modified"] = headers["Last-Modified"]
+    return validators
+
+
+def conditional_headers(validators: dict) -> dict:
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def load_validators(cache_key: str) -> dict | None:
+    """Validatori salvati per una voce ancora presente su disco, anche se scaduta."""
+    meta_path = get_meta_path(cache_key)
+    if not meta_path.exists() or not _entry_path(cache_key).exists():
+        return None
+    validators = _read_json(meta_path, cache_key)
+    return validators if isinstance(validators, dict) else None
+
+
+def refresh_cache(cache_key: str, validators: dict, not_modified: bool) -> None:
+    """Rinnova il TTL di una voce che upstream ha confermato invariata.
+
+    Con un 304 il corpo non è stato trasferito: la sua dimensione viene contata
+    nei byte risparmiati.
+    """
+    now = time.time()
+    for backend in _writable_backends():
+        backend.renew(_entry_names(cache_key), now)
+    touch_entry(cache_key)
+    saved = validators.get("bytes", 0) if not_modified else 0
+    with _stats_lock:
+        _stats["revalidated"] += 1
+        _stats["not_modified" if not_modified else "unchanged"] += 1
+        _stats["bytes_saved"] += saved
+    logger.debug("Cache REVALIDATED: %s (%s, %d byte risparmiati)", cache_key, "304" if not_modified else "hash", saved)
+
+
+def get_negative_path(cache_key: str) -> Path:
+    init_cache()
+    return CACHE_DIR / f"{cache_key}.neg.json"
+
+
+def is_negative_cached(cache_key: str) -> bool:
+    """``True`` se per la chiave è stato salvato da poco un 404 o una risposta vuota."""
+    if not is_cache_valid(get_negative_path(cache_key), NEGATIVE_TTL_HOURS):
+        return False
+    with _stats_lock:
+        _stats["negative_hits"] += 1
+    logger.debug("Cache HIT (negativa): %s", cache_key)
+    return True
+
+
+def save_negative(cache_key: str, reason: str) -> None:
+    """Salva una voce negativa (``reason``: ``not_found`` o ``empty``) valida ``CACHE_NEGATIVE_TTL_MINUTES``."""
+    try:
+        _write_json(get_negative_path(cache_key), {"reason": reason})
     except OSError as e:
         logger.warning("Errore salvataggio cache %s: %s", cache_key, e)
+        return
+    _record_write(cache_key)
+    with _stats_lock:
+        _stats["negative_stored"] += 1
+    logger.debug("Cache SAVE (negativa, %s): %s", reason, cache_key)
+
+
+def record_stale_served(cache_key: str) -> None:
+    with _stats_lock:
+        _stats["stale_served"] += 1
+        _stats["last_stale_served_at"] = time.time()
+    logger.debug("Cache STALE: %s", cache_key)
+
+
+def get_cache_stats() -> dict:
+    """Contatori della cache: rivalidazioni (304 o hash invariato), byte non scaricati, voci negative, scadute servite e rimosse per budget."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def get_backend_stats() -> list[dict]:
+    """Per ogni backend, nell'ordine di ``CACHE_BACKENDS``: nome, voci lette da questo processo e statistiche proprie."""
+    with _stats_lock:
+        hits = dict(_backend_hits)
+    return [{"name": backend.name, "hits": hits.get(backend.name, 0), **backend.get_stats()} for backend in _backends]
+
+
+def remove_from_cache(cache_key: str) -> None:
+    """Rimuove una voce da tutti i backend scrivibili e in tutti i suoi file locali (validatori, voce negativa, colonne)."""
+    _remove_files(cache_key)
+    for backend in _writable_backends():
+        if not isinstance(backend, FileBackend):
+            backend.delete(_entry_names(cache_key))
+
+
+def _remove_files(cache_key: str) -> None:
+    """Rimuove i file locali della voce, dal manifest e dalla memoria (anche dal telemetry store)."""
+    memory_cache.invalidate(cache_key)
+    if cache_key.startswith("columns_"):
+        telemetry_store.discard(describe_key(cache_key))
+    try:
+        for path in _entry_files(cache_key):
+            path.unlink(missing_ok=True)
+        # Chi ha già aperto il lock lo tiene; al più due worker scaricano la stessa voce
+        get_lock_path(cache_key).unlink(missing_ok=True)
+        # I processi che hanno ancora le colonne in memory-map continuano a leggerle finché non le rilasciano
+        shutil.rmtree(get_columns_dir(cache_key), ignore_errors=True)
+    except OSError as e:
+        logger.warning("Errore rimozione cache %s: %s", cache_key, e)
+    _manifest.forget(cache_key)
+
+
+def invalidate_cache(session_key: int | None = None, endpoint: str | None = None) -> int:
+    """Rimuove solo le voci di una sessione e/o di un endpoint; restituisce quante ne ha rimosse."""
+    _ensure_manifest()
+    keys = _manifest.keys(session_key=session_key, endpoint=endpoint)
+    for key in keys:
+        remove_from_cache(key)
+    logger.info("Cache invalidata (sessione=%s, endpoint=%s): %d voci", session_key, endpoint, len(keys))
+    return len(keys)
 
 
 def clear_cache() -> None:
+    """Svuota la cache locale e tutti i backend scrivibili (anche quelli condivisi)."""
+    _clear_files()
+    for backend in _writable_backends():
+        if not isinstance(backend, FileBackend):
+            backend.clear()
+
+
+def _clear_files() -> None:
     init_cache()
+    memory_cache.clear()
+    telemetry_store.clear_store()
+    _manifest.clear()
     try:
-        for file in CACHE_DIR.glob("*.json"):
-            file.unlink()
+        for pattern in (*_CACHE_PATTERNS, *_LEFTOVER_PATTERNS):
+            for file in CACHE_DIR.glob(pattern):
+                if file.is_dir():
+                    shutil.rmtree(file)
+                else:
+                    file.unlink()
         logger.info("Cache svuotato (%s)", CACHE_DIR)
     except OSError as e:
         logger.warning("Errore svuotamento cache: %s", e)
@@ -74,4 +587,258 @@ def clear_cache() -> None:
 def cache_size_mb() -> float:
     if not CACHE_DIR.exists():
         return 0.0
-    return sum(f.stat().st_size for f in CACHE_DIR.glob("*.json")) / (1024 * 1024)
+    _ensure_manifest()
+    return _manifest.totals()["bytes"] / (1024 * 1024)
+
+
+def get_manifest_stats() -> dict:
+    """Voci, byte e letture totali dal manifest, più il dettaglio per endpoint."""
+    _ensure_manifest()
+    return {
+        **_manifest.totals(),
+        "endpoints": [
+            {"endpoint": endpoint, "entries": entries, "bytes": size}
+            for endpoint, entries, size in _manifest.endpoints()
+        ],
+    }
+
+
+def _entry_files(cache_key: str) -> tuple[Path, ...]:
+    return (get_frame_path(cache_key), get_cache_path(cache_key), get_meta_path(cache_key), get_negative_path(cache_key))
+
+
+def _key_from_name(name: str) -> str | None:
+    for suffix in _ENTRY_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return None
+
+
+def _entry_size(cache_key: str) -> tuple[int, float]:
+    """Byte di tutti i file della voce e data di modifica più recente."""
+    size, mtime = 0, 0.0
+    columns_dir = get_columns_dir(cache_key)
+    column_files = list(columns_dir.iterdir()) if columns_dir.is_dir() else []
+    for path in (*_entry_files(cache_key), *column_files):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        size += stat.st_size
+        mtime = max(mtime, stat.st_mtime)
+    return size, mtime
+
+
+def _ensure_manifest() -> None:
+    """Importa nel manifest le voci già su disco, se è vuoto (primo avvio o cache di una versione precedente).
+
+    È l'unica scansione della directory; poi il manifest viene aggiornato a ogni scrittura.
+    """
+    global _manifest_checked
+    if _manifest_checked:
+        return
+    with _manifest_lock:
+        if _manifest_checked:
+            return
+        if CACHE_DIR.exists() and _manifest.is_empty():
+            keys = {_key_from_name(file.name) for pattern in _CACHE_PATTERNS for file in CACHE_DIR.glob(pattern)}
+            for key in keys:
+                size, mtime = _entry_size(key)
+                if size:
+                    _manifest.record(key, size, created=mtime)
+            if keys:
+                logger.info("Manifest cache ricostruito: %d voci", len(keys))
+        _manifest_checked = True
+
+
+def touch_entry(cache_key: str) -> None:
+    """Segna la voce come usata di recente (anche se servita dal livello in memoria)."""
+    _manifest.touch(cache_key)
+
+
+def pin_entry(cache_key: str) -> None:
+    """Protegge la voce dall'eviction; restano fissate solo le ultime ``CACHE_PINNED_MAX_ENTRIES``."""
+    with _manifest_lock:
+        if cache_key in _pinned:
+            _pinned.remove(cache_key)
+        _pinned.append(cache_key)
+
+
+def _record_write(cache_key: str) -> None:
+    """Aggiorna nel manifest la voce appena scritta e rientra nel budget."""
+    _ensure_manifest()
+    size, _ = _entry_size(cache_key)
+    _manifest.record(cache_key, size)
+    _evict_over_budget()
+
+
+def _evict_over_budget() -> None:
+    """Rimuove le voci meno usate di recente finché la cache non rientra in ``CACHE_MAX_MB``.
+
+    Legge il manifest a pagine solo fino a coprire l'eccedenza, saltando le voci fissate.
+    """
+    excess = _manifest.totals()["bytes"] - CACHE_MAX_MB * 1024 * 1024
+    if excess <= 0:
+        return
+    with _manifest_lock:
+        pinned = set(_pinned)
+    victims, offset = [], 0
+    while excess > 0:
+        page = _manifest.least_recent(offset, _EVICTION_BATCH)
+        if not page:
+            break
+        offset += len(page)
+        for key, size in page:
+            if excess <= 0:
+                break
+            if key in pinned:
+                continue
+            victims.append((key, size))
+            excess -= size
+    for key, size in victims:
+        _remove_files(key)
+        logger.debug("Cache EVICT: %s (%d byte)", key, size)
+    if victims:
+        with _stats_lock:
+            _stats["evicted"] += len(victims)
+            _stats["evicted_bytes"] += sum(size for _, size in victims)
+
+
+class FileBackend(CacheBackend):
+    """Cache su disco in ``CACHE_DIR``: scritture atomiche, manifest, LRU e budget ``CACHE_MAX_MB``."""
+
+    name = "file"
+
+    def stat_many(self, names: list[str], ttl_hours: float | None) -> dict[str, float]:
+        found = {}
+        for name in names:
+            try:
+                created = (CACHE_DIR / name).stat().st_mtime
+            except OSError:
+                continue
+            if is_fresh(created, ttl_hours):
+                found[name] = created
+        return found
+
+    def get_many(self, names: list[str], ttl_hours: float | None) -> Entries:
+        found = {}
+        for name in names:
+            try:
+                with open(CACHE_DIR / name, "rb") as f:
+                    created = os.fstat(f.fileno()).st_mtime
+                    if not is_fresh(created, ttl_hours):
+                        continue
+                    found[name] = (f.read(), created)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning("Errore lettura cache %s: %s", name, e)
+                continue
+            touch_entry(_key_from_name(name))
+            logger.debug("Cache HIT: %s", name)
+        return found
+
+    def set_many(self, entries: Entries) -> None:
+        init_cache()
+        for name, (data, created) in entries.items():
+            path = CACHE_DIR / name
+            try:
+                with _atomic_writer(path) as f:
+                    f.write(data)
+                os.utime(path, (created, created))
+                logger.debug("Cache SAVE: %s", name)
+            except OSError as e:
+                logger.warning("Errore salvataggio cache %s: %s", name, e)
+            _record_write(_key_from_name(name))
+
+    def renew(self, names: list[str], created: float) -> None:
+        for name in names:
+            try:
+                os.utime(CACHE_DIR / name, (created, created))
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning("Errore rinnovo cache %s: %s", name, e)
+
+    def delete(self, names: list[str]) -> None:
+        for key in {_key_from_name(name) for name in names}:
+            _remove_files(key)
+
+    def clear(self) -> None:
+        _clear_files()
+
+
+def _create_backends(names: tuple[str, ...]) -> list[CacheBackend]:
+    factories = {
+        "file": FileBackend,
+        "snapshot": cache_snapshot.SnapshotBackend,
+        "memory": lambda: MemoryBackend(int(CACHE_MEMORY_BACKEND_MAX_MB * 1024 * 1024)),
+        "kv": lambda: RespBackend(CACHE_KV_URL, CACHE_KV_TIMEOUT_SECONDS, CACHE_KV_EXPIRY_HOURS, CACHE_KV_RETRY_SECONDS),
+    }
+    backends = []
+    for name in names:
+        if name not in factories:
+            logger.warning("Backend di cache sconosciuto ignorato: %s", name)
+            continue
+        backends.append(factories[name]())
+    return backends
+
+
+_backends = _create_backends(CACHE_BACKENDS)
+
+
+def _writable_backends() -> list[CacheBackend]:
+    return [backend for backend in _backends if not backend.read_only]
+
+
+def has_remote_backend() -> bool:
+    """``True`` se tra i backend c'è una cache di rete condivisa (``kv``)."""
+    return any(isinstance(backend, RespBackend) for backend in _backends)
+
+
+def _count_hits(backend_name: str, hits: int) -> None:
+    with _stats_lock:
+        _backend_hits[backend_name] = _backend_hits.get(backend_name, 0) + hits
+
+
+def _load_entries(names: list[str], ttl_hours: float | None) -> dict[str, bytes]:
+    """Voci valide per nome, ciascuna dal primo backend che la ha.
+
+    Ogni backend riceve una sola richiesta a blocchi con i nomi ancora mancanti;
+    le voci trovate vengono copiate nei backend scrivibili che lo precedono.
+    """
+    found: dict[str, bytes] = {}
+    missing = list(names)
+    for index, backend in enumerate(_backends):
+        if not missing:
+            break
+        hits = backend.get_many(missing, ttl_hours)
+        if not hits:
+            continue
+        _count_hits(backend.name, len(hits))
+        if backend.promote:
+            for upper in _backends[:index]:
+                if not upper.read_only:
+                    upper.set_many(hits)
+        found.update((name, data) for name, (data, _) in hits.items())
+        missing = [name for name in missing if name not in hits]
+    return found
+
+
+def _stat_entries(names: list[str], ttl_hours: float | None) -> dict[str, float]:
+    """Data di scrittura delle voci valide per nome, dal primo backend che le ha."""
+    found: dict[str, float] = {}
+    missing = list(names)
+    for backend in _backends:
+        if not missing:
+            break
+        found.update(backend.stat_many(missing, ttl_hours))
+        missing = [name for name in missing if name not in found]
+    return found
+
+
+def _store_entries(entries: dict[str, bytes], created: float | None = None) -> None:
+    """Scrive le voci in tutti i backend scrivibili, con data di scrittura ``created`` (default: ora)."""
+    created = time.time() if created is None else created
+    for backend in _writable_backends():
+        backend.set_many({name: (data, created) for name, data in entries.items()})
@@ -0,0 +1,310 @@
+"""Backend della cache: livelli intercambiabili sotto ``utils/cache.py``.
+
+Ogni backend conserva voci binarie per nome (``<chiave>.npz``, ``<chiave>.json``,
+gli stessi nomi dei file su disco) insieme alla loro data di scrittura, da cui
+``utils/cache.py`` calcola il TTL. ``CACHE_BACKENDS`` fissa l'ordine dei
+livelli: le letture si fermano al primo che ha la voce valida e la copiano nei
+livelli precedenti, le scritture vanno a tutti quelli scrivibili.
+
+Implementazioni:
+
+- ``file`` (``cache.FileBackend``): la cache su disco di ``CACHE_DIR``, con
+  manifest e budget;
+- ``snapshot`` (``cache_snapshot.SnapshotBackend``): lo snapshot in sola
+  lettura incluso nel deploy;
+- ``memory`` (``MemoryBackend``): voci binarie in un LRU del processo, al posto
+  delle voci su disco (i DataFrame già decodificati restano in
+  ``utils/memory_cache.py``, sopra tutti i livelli);
+- ``kv`` (``RespBackend``): un server chiave-valore condiviso tra worker e
+  istanze che parla il protocollo di Redis (RESP). In locale si può usare
+  ``python -m tools.kv_server``.
+
+Le letture e le scritture hanno la variante a blocchi (``get_many``,
+``set_many``, ``stat_many``): il backend di rete la esegue con un solo giro
+(``MGET`` o una pipeline di comandi), così il prefetch di una sessione non
+paga un round trip per voce.
+"""
+
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Voci ``{nome: (dati, data di scrittura)}``
+Entries = dict[str, tuple[bytes, float]]
+
+
+def is_fresh(created: float, ttl_hours: float | None) -> bool:
+    """Voce scritta in ``created`` ancora valida con ``ttl_hours`` (``None``: non scade)."""
+    return ttl_hours is None or time.time() < created + ttl_hours * 3600
+
+
+class CacheBackend:
+    """Livello della cache; le sottoclassi implementano almeno ``get_many`` e, se scrivibili, ``set_many``."""
+
+    name = "base"
+    read_only = False
+    # Le voci trovate qui vengono copiate nei livelli che lo precedono
+    promote = True
+
+    def get_many(self, names: list[str], ttl_hours: float | None) -> Entries:
+        """Voci valide con ``ttl_hours`` tra ``names``; quelle assenti o scadute mancano dal risultato."""
+        raise NotImplementedError
+
+    def set_many(self, entries: Entries) -> None:
+        raise NotImplementedError
+
+    def stat_many(self, names: list[str], ttl_hours: float | None) -> dict[str, float]:
+        """Data di scrittura delle voci valide, senza bisogno dei dati."""
+        return {name: created for name, (_, created) in self.get_many(names, ttl_hours).items()}
+
+    def renew(self, names: list[str], created: float) -> None:
+        """Porta a ``created`` la data di scrittura delle voci presenti (rinnovo del TTL)."""
+        entries = self.get_many(names, None)
+        if entries:
+            self.set_many({name: (data, created) for name, (data, _) in entries.items()})
+
+    def delete(self, names: list[str]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get_stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Voci binarie in memoria del processo, entro ``max_bytes`` (LRU)."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+
+    def get_many(self, names: list[str], ttl_hours: float | None) -> Entries:
+        found = {}
+        with self._lock:
+            for name in names:
+                entry = self._entries.get(name)
+                if entry is not None and is_fresh(entry[1], ttl_hours):
+                    self._entries.move_to_end(name)
+                    found[name] = entry
+        return found
+
+    def set_many(self, entries: Entries) -> None:
+        with self._lock:
+            for name, (data, created) in entries.items():
+                if len(data) > self.max_bytes:
+                    continue
+                self._pop(name)
+                self._entries[name] = (data, created)
+                self._bytes += len(data)
+            while self._bytes > self.max_bytes and self._entries:
+                self._bytes -= len(self._entries.popitem(last=False)[1][0])
+
+    def renew(self, names: list[str], created: float) -> None:
+        with self._lock:
+            for name in names:
+                if name in self._entries:
+                    self._entries[name] = (self._entries[name][0], created)
+
+    def delete(self, names: list[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._pop(name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _pop(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+class RespError(Exception):
+    """Risposta di errore (``-ERR ...``) del server chiave-valore."""
+
+
+def _encode_command(command: tuple) -> bytes:
+    parts = [b"*%d\r\n" % len(command)]
+    for arg in command:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode("ascii")
+        parts += [b"$%d\r\n" % len(arg), arg, b"\r\n"]
+    return b"".join(parts)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connessione chiusa dal server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        # Restituito e non sollevato: in una pipeline vanno lette comunque tutte le risposte
+        return RespError(payload.decode("utf-8"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("risposta troncata dal server")
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        return None if length < 0 else [_read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"risposta RESP non valida: {line[:32]!r}")
+
+
+# Ogni valore inizia con la data di scrittura (epoch, double little-endian)
+_HEADER = struct.Struct("<d")
+
+
+class RespBackend(CacheBackend):
+    """Cache condivisa su un server chiave-valore compatibile Redis (``redis://[:password@]host[:port][/db]``).
+
+    Ogni voce scade sul server dopo ``expiry_hours`` anche se nessuno la
+    rilegge. Se il server non risponde, il backend si disattiva per
+    ``retry_seconds`` e la cache continua con gli altri livelli.
+    """
+
+    name = "kv"
+
+    def __init__(self, url: str, timeout: float, expiry_hours: float, retry_seconds: float, prefix: str = "openf1:"):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self.expiry_ms = int(expiry_hours * 3600 * 1000)
+        self.retry_seconds = retry_seconds
+        self.prefix = prefix
+        self._local = threading.local()
+        self._down_until = 0.0
+        self._errors = 0
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        self._local.conn, self._local.pid = conn, os.getpid()
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._pipeline(setup)
+        return conn
+
+    def _disconnect(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    def _pipeline(self, commands: list[tuple]) -> list:
+        sock, reader = self._connect()
+        sock.sendall(b"".join(_encode_command(command) for command in commands))
+        replies = [_read_reply(reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def _execute(self, commands: list[tuple], default):
+        """Esegue i comandi in pipeline; se il server non è disponibile restituisce ``default``."""
+        if not commands or time.monotonic() < self._down_until:
+            return default
+        try:
+            return self._pipeline(commands)
+        except (OSError, RespError) as e:
+            self._disconnect()
+            self._errors += 1
+            self._down_until = time.monotonic() + self.retry_seconds
+            logger.warning("Cache KV %s:%s non disponibile (%s): riprovo tra %d s", self.host, self.port, e, self.retry_seconds)
+            return default
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def get_many(self, names: list[str], ttl_hours: float | None) -> Entries:
+        if not names:
+            return {}
+        replies = self._execute([("MGET", *map(self._key, names))], None)
+        found = {}
+        for name, value in zip(names, replies[0] if replies else ()):
+            if value is None or len(value) < _HEADER.size:
+                continue
+            (created,) = _HEADER.unpack_from(value)
+            if is_fresh(created, ttl_hours):
+                found[name] = (value[_HEADER.size:], created)
+        return found
+
+    def stat_many(self, names: list[str], ttl_hours: float | None) -> dict[str, float]:
+        replies = self._execute([("GETRANGE", self._key(name), 0, _HEADER.size - 1) for name in names], None)
+        found = {}
+        for name, header in zip(names, replies or ()):
+            if header and len(header) == _HEADER.size:
+                (created,) = _HEADER.unpack(header)
+                if is_fresh(created, ttl_hours):
+                    found[name] = created
+        return found
+
+    def set_many(self, entries: Entries) -> None:
+        self._execute(
+            [
+                ("SET", self._key(name), _HEADER.pack(created) + data, "PX", self.expiry_ms)
+                for name, (data, created) in entries.items()
+            ],
+            None,
+        )
+
+    def delete(self, names: list[str]) -> None:
+        if names:
+            self._execute([("DEL", *map(self._key, names))], None)
+
+    def clear(self) -> None:
+        """Rimuove dal server solo le chiavi con il prefisso della dashboard."""
+        cursor = b"0"
+        while True:
+            replies = self._execute([("SCAN", cursor, "MATCH", f"{self.prefix}*", "COUNT", 1000)], None)
+            if replies is None:
+                return
+            cursor, keys = replies[0]
+            if keys:
+                self._execute([("DEL", *keys)], None)
+            if cursor == b"0":
+                return
+
+    def get_stats(self) -> dict:
+        return {"errors": self._errors, "available": time.monotonic() >= self._down_until}
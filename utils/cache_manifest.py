@@ -0,0 +1,180 @@
+"""Manifest SQLite della cache su disco: una riga per chiave, condivisa tra i processi.
+
+Per ogni voce registra endpoint, sessione, pilota, byte (di tutti i suoi file),
+data di scrittura, ultimo accesso e numero di letture. I totali (voci, byte,
+letture) sono mantenuti da trigger in una riga a parte, quindi dimensione e
+statistiche della cache si leggono senza scorrere la directory. Da qui partono
+anche l'eviction LRU (ordine per ultimo accesso) e l'invalidazione mirata per
+sessione o endpoint.
+
+Endpoint, sessione e pilota vengono ricavati dalla chiave di cache
+(``get_cache_key``); le voci della cache a intervalli (indice e segmenti) e
+le colonne in memory-map risultano sotto l'endpoint originale (es. ``car_data``).
+
+Conserva anche le date di fine di sessioni e meeting viste da qualunque
+processo (``end_dates``), da cui ``cache_ttl_hours`` decide se una voce non
+scade più anche in un worker appena avviato.
+
+Gli errori SQLite vengono solo registrati nel log: il manifest non deve mai
+impedire di leggere o scrivere la cache.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Parametri con cui iniziano le chiavi (ordinati alfabeticamente da get_cache_key)
+_PARAM_NAMES = ("cache_suffix", "driver_number", "meeting_key", "session_key", "year")
+_ENDPOINT_RE = re.compile(rf"^(?:interval_|columns_)?(.+?)_(?:{'|'.join(_PARAM_NAMES)})=")
+_SESSION_RE = re.compile(r"(?:^|_)session_key=(\d+)")
+_DRIVER_RE = re.compile(r"(?:^|_)driver_number=(\d+)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    session_key INTEGER,
+    driver_number INTEGER,
+    bytes INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_session ON entries (session_key);
+CREATE INDEX IF NOT EXISTS entries_endpoint ON entries (endpoint);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    hits INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (1, 0, 0, 0);
+CREATE TABLE IF NOT EXISTS end_dates (
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    date_end REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.bytes, hits = hits + NEW.hits;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE ON entries BEGIN
+    UPDATE totals SET bytes = bytes + NEW.bytes - OLD.bytes, hits = hits + NEW.hits - OLD.hits;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.bytes, hits = hits - OLD.hits;
+END;
+"""
+
+
+def describe_key(cache_key: str) -> tuple[str, int | None, int | None]:
+    """``(endpoint, session_key, driver_number)`` ricavati dalla chiave di cache."""
+    endpoint = _ENDPOINT_RE.match(cache_key)
+    session = _SESSION_RE.search(cache_key)
+    driver = _DRIVER_RE.search(cache_key)
+    return (
+        endpoint.group(1) if endpoint else cache_key.split("_", 1)[0],
+        int(session.group(1)) if session else None,
+        int(driver.group(1)) if driver else None,
+    )
+
+
+class CacheManifest:
+    """Manifest su ``path``; una connessione per thread (e per processo, dopo un fork)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _execute(self, sql: str, params=()) -> list[tuple]:
+        try:
+            return self._connect().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Errore manifest cache (%s): %s", self.path, e)
+            return []
+
+    def is_empty(self) -> bool:
+        rows = self._execute("SELECT entries FROM totals")
+        return not rows or rows[0][0] == 0
+
+    def record(self, cache_key: str, size: int, created: float | None = None) -> None:
+        """Registra (o aggiorna) una voce appena scritta, con ``size`` byte."""
+        endpoint, session_key, driver_number = describe_key(cache_key)
+        now = created or time.time()
+        self._execute(
+            """
+            INSERT INTO entries (key, endpoint, session_key, driver_number, bytes, created, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET bytes = excluded.bytes, created = excluded.created, last_access = excluded.last_access
+            """,
+            (cache_key, endpoint, session_key, driver_number, size, now, now),
+        )
+
+    def touch(self, cache_key: str) -> None:
+        self._execute("UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), cache_key))
+
+    def forget(self, cache_key: str) -> None:
+        self._execute("DELETE FROM entries WHERE key = ?", (cache_key,))
+
+    def clear(self) -> None:
+        self._execute("DELETE FROM entries")
+
+    def record_end(self, kind: str, item_id: int, date_end: float) -> None:
+        """Registra la data di fine (epoch) di una sessione o di un meeting (``kind``: ``session``/``meeting``)."""
+        self._execute(
+            "INSERT INTO end_dates VALUES (?, ?, ?) ON CONFLICT (kind, id) DO UPDATE SET date_end = excluded.date_end",
+            (kind, item_id, date_end),
+        )
+
+    def end_date(self, kind: str, item_id: int) -> float | None:
+        rows = self._execute("SELECT date_end FROM end_dates WHERE kind = ? AND id = ?", (kind, item_id))
+        return rows[0][0] if rows else None
+
+    def end_dates(self, kind: str) -> dict[int, float]:
+        return dict(self._execute("SELECT id, date_end FROM end_dates WHERE kind = ?", (kind,)))
+
+    def totals(self) -> dict:
+        rows = self._execute("SELECT entries, bytes, hits FROM totals")
+        entries, size, hits = rows[0] if rows else (0, 0, 0)
+        return {"entries": entries, "bytes": size, "hits": hits}
+
+    def least_recent(self, offset: int, limit: int) -> list[tuple[str, int]]:
+        """Voci ``(chiave, byte)`` dalla meno usata di recente, a pagine."""
+        return self._execute("SELECT key, bytes FROM entries ORDER BY last_access LIMIT ? OFFSET ?", (limit, offset))
+
+    def keys(self, session_key: int | None = None, endpoint: str | None = None) -> list[str]:
+        """Chiavi di una sessione e/o di un endpoint."""
+        clauses, params = [], []
+        if session_key is not None:
+            clauses.append("session_key = ?")
+            params.append(session_key)
+        if endpoint is not None:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return [row[0] for row in self._execute(f"SELECT key FROM entries {where}", params)]
+
+    def endpoints(self) -> list[tuple[str, int, int]]:
+        """``(endpoint, voci, byte)`` per endpoint, dal più grande."""
+        return self._execute(
+            "SELECT endpoint, COUNT(*), SUM(bytes) FROM entries GROUP BY endpoint ORDER BY SUM(bytes) DESC"
+        )
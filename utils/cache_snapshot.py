@@ -0,0 +1,171 @@
+"""Snapshot di cache in sola lettura, distribuito insieme al deploy.
+
+Su Vercel la cache scrivibile (``/tmp/openf1-cache``) parte vuota a ogni
+istanza fredda. Lo snapshot è una cartella (``OPENF1_CACHE_SNAPSHOT_DIR``,
+default ``cache-snapshot/`` nella root del repo) con le voci di cache di alcune
+stagioni e un ``index.json``: ``utils/cache.py`` la consulta come livello
+inferiore quando la cache scrivibile non ha la voce.
+
+È il backend ``snapshot`` di ``CACHE_BACKENDS`` (``utils/cache_backends.py``);
+le colonne in memory-map (``.cols``) vengono lette direttamente da ``load_columns``.
+L'indice viene letto una sola volta per processo, quindi ogni ricerca è un
+accesso a dizionario, senza scansioni della directory. Per ogni voce conserva
+la data di scrittura originale, e copia dal manifest della cache di partenza
+le date di fine di sessioni e meeting: ``cache_ttl_hours`` le usa anche su
+un'istanza fredda, così le voci di sessioni concluse (TTL ``None``) restano
+sempre valide e le altre scadono come nella cache scrivibile.
+
+Lo snapshot si costruisce con ``python -m tools.build_snapshot``.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from utils.cache_backends import CacheBackend, Entries
+from utils.cache_manifest import CacheManifest
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(os.environ.get("OPENF1_CACHE_SNAPSHOT_DIR", Path(__file__).parent.parent / "cache-snapshot"))
+INDEX_NAME = "index.json"
+FORMAT_VERSION = 1
+
+# tipo di file -> suffisso; validatori e voci negative non entrano nello snapshot
+_SUFFIXES = {"npz": ".npz", "json": ".json", "cols": ".cols"}
+_SKIPPED_SUFFIXES = (".meta.json", ".neg.json")
+
+_lock = threading.Lock()
+_index: dict | None = None
+_END_KINDS = ("session", "meeting")
+
+
+def _loaded_index() -> dict:
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = _read_index(SNAPSHOT_DIR)
+    return _index
+
+
+def _entries() -> dict[str, dict]:
+    return _loaded_index().get("entries", {})
+
+
+def _read_index(directory: Path) -> dict:
+    index_path = directory / INDEX_NAME
+    if not index_path.exists():
+        return {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Snapshot cache non leggibile (%s): %s", index_path, e)
+        return {}
+    if index.get("version") != FORMAT_VERSION:
+        logger.warning("Snapshot cache con versione non supportata: %s", index.get("version"))
+        return {}
+    logger.info("Snapshot cache: %d voci da %s", len(index["entries"]), directory)
+    return index
+
+
+def lookup(cache_key: str, kind: str, ttl_hours: float | None) -> Path | None:
+    """Percorso del file ``kind`` (``npz``, ``json``, ``cols``) della voce, se è nello snapshot e valida con ``ttl_hours``."""
+    entry = _entries().get(cache_key)
+    if entry is None or kind not in entry["files"]:
+        return None
+    if ttl_hours is not None and time.time() >= entry["mtime"] + ttl_hours * 3600:
+        return None
+    return SNAPSHOT_DIR / f"{cache_key}{_SUFFIXES[kind]}"
+
+
+def created_at(cache_key: str) -> float | None:
+    """Data di scrittura originale della voce nello snapshot, se presente."""
+    entry = _entries().get(cache_key)
+    return None if entry is None else entry["mtime"]
+
+
+def end_date(kind: str, item_id: int) -> float | None:
+    """Data di fine (epoch) di una sessione o di un meeting, come nel manifest della cache da cui è nato lo snapshot."""
+    return _loaded_index().get("ends", {}).get(kind, {}).get(str(item_id))
+
+
+def entry_count() -> int:
+    return len(_entries())
+
+
+class SnapshotBackend(CacheBackend):
+    """Voci dello snapshot come livello in sola lettura; già su disco locale, quindi non vengono ricopiate altrove."""
+
+    name = "snapshot"
+    read_only = True
+    promote = False
+
+    def stat_many(self, names: list[str], ttl_hours: float | None) -> dict[str, float]:
+        found = {}
+        for name in names:
+            classified = _classify(name)
+            if classified is not None and lookup(*classified, ttl_hours) is not None:
+                found[name] = _entries()[classified[0]]["mtime"]
+        return found
+
+    def get_many(self, names: list[str], ttl_hours: float | None) -> Entries:
+        found = {}
+        for name, created in self.stat_many(names, ttl_hours).items():
+            try:
+                found[name] = ((SNAPSHOT_DIR / name).read_bytes(), created)
+            except OSError as e:
+                logger.warning("Errore lettura snapshot %s: %s", name, e)
+        return found
+
+    def get_stats(self) -> dict:
+        return {"entries": entry_count()}
+
+
+def _classify(name: str) -> tuple[str, str] | None:
+    if name.endswith(_SKIPPED_SUFFIXES):
+        return None
+    for kind, suffix in _SUFFIXES.items():
+        if name.endswith(suffix):
+            return name[: -len(suffix)], kind
+    return None
+
+
+def build_snapshot(source: Path, target: Path) -> dict:
+    """Copia le voci della cache ``source`` in ``target`` e scrive l'indice; restituisce voci e byte copiati.
+
+    ``target`` viene sostituita per intero.
+    """
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+    entries: dict[str, dict] = {}
+    total_bytes = 0
+    for path in sorted(source.iterdir()):
+        classified = _classify(path.name)
+        if classified is None:
+            continue
+        key, kind = classified
+        mtime = (path / "columns.json").stat().st_mtime if kind == "cols" else path.stat().st_mtime
+        if kind == "cols":
+            shutil.copytree(path, target / path.name)
+            total_bytes += sum(file.stat().st_size for file in path.iterdir())
+        else:
+            shutil.copy2(path, target / path.name)
+            total_bytes += path.stat().st_size
+        entry = entries.setdefault(key, {"mtime": mtime, "files": []})
+        entry["files"].append(kind)
+        entry["mtime"] = max(entry["mtime"], mtime)
+    manifest_path = source / "manifest.sqlite3"
+    ends = {}
+    if manifest_path.exists():
+        manifest = CacheManifest(manifest_path)
+        ends = {kind: manifest.end_dates(kind) for kind in _END_KINDS}
+    with open(target / INDEX_NAME, "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "built": time.time(), "entries": entries, "ends": ends}, f)
+    return {"entries": len(entries), "bytes": total_bytes}
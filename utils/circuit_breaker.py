@@ -0,0 +1,91 @@
+"""Circuit breaker per le chiamate upstream a OpenF1.
+
+Dopo ``API_BREAKER_FAILURE_THRESHOLD`` errori consecutivi (timeout, errori di
+connessione, risposte 5xx) il circuito si apre: per ``API_BREAKER_RESET_SECONDS``
+le richieste falliscono subito con ``CircuitOpenError`` invece di attendere i
+timeout. Allo scadere passa una sola richiesta di prova: se va a buon fine il
+circuito si richiude, altrimenti si riapre per un altro intervallo.
+
+Lo stato è per processo: ogni worker gunicorn scopre da sé che upstream non
+risponde, al costo di pochi timeout.
+"""
+
+import logging
+import threading
+import time
+
+import requests
+
+from config import API_BREAKER_FAILURE_THRESHOLD, API_BREAKER_RESET_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_lock = threading.Lock()
+_state = CLOSED
+_failures = 0
+_opened_at = 0.0
+_probe_in_flight = False
+_stats = {"opened": 0, "rejected": 0, "failures": 0}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Upstream considerato non disponibile: la richiesta non è stata inviata."""
+
+
+def before_request() -> None:
+    """Da chiamare prima di ogni richiesta upstream; solleva ``CircuitOpenError`` se il circuito è aperto."""
+    global _state, _probe_in_flight
+    with _lock:
+        if _state == CLOSED:
+            return
+        if _state == OPEN and time.monotonic() - _opened_at >= API_BREAKER_RESET_SECONDS:
+            _state = HALF_OPEN
+            _probe_in_flight = False
+        if _state == HALF_OPEN and not _probe_in_flight:
+            _probe_in_flight = True
+            return
+        _stats["rejected"] += 1
+        remaining = max(0.0, API_BREAKER_RESET_SECONDS - (time.monotonic() - _opened_at))
+    raise CircuitOpenError(f"OpenF1 non raggiungibile: nuove richieste tra {remaining:.0f}s")
+
+
+def record_success() -> None:
+    global _state, _failures, _probe_in_flight
+    with _lock:
+        if _state != CLOSED:
+            logger.info("Circuit breaker OpenF1 richiuso")
+        _state = CLOSED
+        _failures = 0
+        _probe_in_flight = False
+
+
+def record_failure() -> None:
+    global _state, _failures, _opened_at, _probe_in_flight
+    with _lock:
+        _failures += 1
+        _stats["failures"] += 1
+        if _state == HALF_OPEN or (_state == CLOSED and _failures >= API_BREAKER_FAILURE_THRESHOLD):
+            _state = OPEN
+            _opened_at = time.monotonic()
+            _probe_in_flight = False
+            _stats["opened"] += 1
+            logger.warning(
+                "Circuit breaker OpenF1 aperto dopo %d errori: richieste sospese per %ss",
+                _failures,
+                API_BREAKER_RESET_SECONDS,
+            )
+
+
+def is_open() -> bool:
+    with _lock:
+        return _state != CLOSED
+
+
+def get_stats() -> dict:
+    """Stato corrente e contatori (aperture, richieste rifiutate, errori upstream) del processo."""
+    with _lock:
+        return {"state": _state, "consecutive_failures": _failures, **_stats}
@@ -0,0 +1,97 @@
+"""Formato binario colonnare (NumPy ``.npz``) per i DataFrame in cache.
+
+Ogni colonna è salvata come array a dtype fisso, quindi la lettura ricostruisce
+direttamente il DataFrame senza passare da testo JSON e dict intermedi:
+
+- numeriche e booleane: array nativo (conserva i dtype compatti di ``api/schemas.py``);
+- date: ``datetime64`` in UTC, con il fuso ripristinato in lettura;
+- categorie: codici interi più l'elenco delle categorie;
+- stringhe: array unicode più maschera dei valori mancanti;
+- tutto il resto (liste, dict, tipi misti): un valore JSON per riga.
+
+Non usa pickle: i file vengono letti con ``allow_pickle=False``.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+
+_ARRAY = "array"
+_DATETIME = "datetime"
+_CATEGORY = "category"
+_STR = "str"
+_JSON = "json"
+
+
+def _is_str_column(values: pd.Series) -> bool:
+    present = values.dropna()
+    return all(isinstance(value, str) for value in present)
+
+
+def _encode_strings(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    mask = values.isna().to_numpy()
+    strings = np.array(["" if missing else value for value, missing in zip(values, mask)], dtype=str)
+    return strings, mask
+
+
+def _encode_column(column: pd.Series) -> tuple[str, dict[str, np.ndarray], dict]:
+    dtype = column.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return _DATETIME, {"": column.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()}, {"tz": "UTC"}
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = pd.Series(dtype.categories)
+        if _is_str_column(categories):
+            return _CATEGORY, {"": column.cat.codes.to_numpy(), "categories": categories.to_numpy(dtype=str)}, {}
+    elif isinstance(dtype, np.dtype) and dtype.kind in "biufM":
+        return _ARRAY, {"": column.to_numpy()}, {}
+    if _is_str_column(column):
+        strings, mask = _encode_strings(column)
+        return _STR, {"": strings, "mask": mask}, {}
+    encoded = [json.dumps(None if _is_missing(value) else value, default=str) for value in column]
+    return _JSON, {"": np.array(encoded, dtype=str)}, {}
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def write_frame(file, df: pd.DataFrame) -> None:
+    """Scrive ``df`` in formato colonnare nel file (percorso o file binario aperto)."""
+    arrays: dict[str, np.ndarray] = {}
+    columns = []
+    for index, name in enumerate(df.columns):
+        kind, parts, extra = _encode_column(df[name])
+        for suffix, array in parts.items():
+            arrays[f"c{index}_{suffix}" if suffix else f"c{index}"] = array
+        columns.append({"name": str(name), "kind": kind, **extra})
+    meta = {"version": FORMAT_VERSION, "rows": len(df), "columns": columns}
+    np.savez(file, __meta__=np.array(json.dumps(meta)), **arrays)
+
+
+def read_frame(file) -> pd.DataFrame:
+    """Ricostruisce un DataFrame scritto da ``write_frame``."""
+    with np.load(file, allow_pickle=False) as npz:
+        meta = json.loads(str(npz["__meta__"]))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"versione formato colonnare non supportata: {meta.get('version')}")
+        data = {}
+        for index, column in enumerate(meta["columns"]):
+            key = f"c{index}"
+            kind = column["kind"]
+            values = npz[key]
+            if kind == _DATETIME:
+                data[column["name"]] = pd.Series(values).dt.tz_localize(column.get("tz", "UTC"))
+            elif kind == _CATEGORY:
+                data[column["name"]] = pd.Categorical.from_codes(values, categories=npz[f"{key}_categories"])
+            elif kind == _STR:
+                data[column["name"]] = np.where(npz[f"{key}_mask"], None, values.astype(object))
+            elif kind == _JSON:
+                data[column["name"]] = [json.loads(value) for value in values]
+            else:
+                data[column["name"]] = values
+    if not data:
+        return pd.DataFrame(index=pd.RangeIndex(meta["rows"]))
+    return pd.DataFrame(data)
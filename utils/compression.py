@@ -0,0 +1,83 @@
+"""Compressione opzionale delle voci di cache, riconosciuta in lettura dai magic byte.
+
+Codec disponibili: ``gzip``, ``bz2`` e ``lzma`` (libreria standard) e ``zstd``
+se è installato il pacchetto ``zstandard``. Ogni formato inizia con una firma
+propria, quindi ``decompress`` non ha bisogno di sapere con quale codec (o se)
+la voce è stata scritta: voci compresse e non compresse convivono nella stessa
+cache e cambiare ``CACHE_COMPRESSION`` non invalida nulla.
+"""
+
+import bz2
+import gzip
+import logging
+import lzma
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dipendenza opzionale
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_warned_unavailable: set[str] = set()
+
+
+def _zstd_compress(data: bytes, level: int | None) -> bytes:
+    return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data, max_output_size=2**31)
+
+
+# codec -> (magic, compress(dati, livello), decompress(dati))
+_CODECS = {
+    "gzip": (
+        b"\x1f\x8b",
+        lambda data, level: gzip.compress(data, compresslevel=6 if level is None else level, mtime=0),
+        gzip.decompress,
+    ),
+    "bz2": (b"BZh", lambda data, level: bz2.compress(data, 9 if level is None else level), bz2.decompress),
+    "lzma": (b"\xfd7zXZ\x00", lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+    "zstd": (b"\x28\xb5\x2f\xfd", _zstd_compress, _zstd_decompress),
+}
+
+
+def available_codecs() -> list[str]:
+    return [codec for codec in _CODECS if codec != "zstd" or zstandard is not None]
+
+
+def detect(data: bytes) -> str | None:
+    """Codec con cui è compresso ``data`` (bastano i primi byte), ``None`` se non compresso."""
+    for codec, (magic, _, _) in _CODECS.items():
+        if data.startswith(magic):
+            return codec
+    return None
+
+
+def compress(data: bytes, codec: str | None, level: int | None = None) -> bytes:
+    """Comprime ``data`` con ``codec`` (``None``: invariato); un codec non disponibile lascia i dati invariati."""
+    if codec is None:
+        return data
+    if codec not in available_codecs():
+        if codec not in _warned_unavailable:
+            _warned_unavailable.add(codec)
+            logger.warning("Codec di compressione non disponibile: %s (voci salvate senza compressione)", codec)
+        return data
+    return _CODECS[codec][1](data, level)
+
+
+def decompress(data: bytes) -> bytes:
+    """Decomprime ``data`` in base alla firma iniziale; i dati non compressi tornano invariati.
+
+    Una voce compressa danneggiata solleva ``ValueError``.
+    """
+    codec = detect(data)
+    if codec is None:
+        return data
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("voce compressa con zstd ma il pacchetto zstandard non è installato")
+    try:
+        return _CODECS[codec][2](data)
+    except Exception as e:  # ogni codec ha le sue eccezioni (OSError, EOFError, LZMAError, ZstdError)
+        raise ValueError(f"voce {codec} non valida: {e}") from e
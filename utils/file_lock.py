@@ -0,0 +1,62 @@
+"""Lock consultivi per chiave di cache, condivisi tra processi (worker gunicorn).
+
+``single_flight`` coalesce le richieste solo dentro un processo: con più worker
+ognuno andrebbe upstream per la stessa chiave fredda. ``key_lock`` prende un
+``flock`` esclusivo su ``CACHE_DIR/locks/<chiave>.lock``, così il primo worker
+scarica e salva la voce e gli altri, ottenuto il lock, la trovano già in cache.
+
+Il lock è solo un'ottimizzazione: dopo ``CACHE_LOCK_TIMEOUT_SECONDS`` si procede
+comunque, e senza ``fcntl`` (Windows) non fa nulla. Il file del lock viene
+rimosso insieme alla voce (eviction, invalidazione, svuotamento della cache). La correttezza delle letture
+concorrenti è garantita dalle scritture atomiche di ``utils/cache.py``.
+"""
+
+import contextlib
+import logging
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from config import CACHE_LOCK_TIMEOUT_SECONDS
+from utils import cache
+
+logger = logging.getLogger(__name__)
+
+_POLL_SECONDS = 0.05
+
+
+@contextlib.contextmanager
+def key_lock(cache_key: str, timeout: float = CACHE_LOCK_TIMEOUT_SECONDS):
+    """Lock esclusivo tra processi sulla chiave, con attesa massima ``timeout`` secondi."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = cache.get_lock_path(cache_key)
+    try:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(lock_path, "a+b")
+    except OSError as e:
+        logger.warning("Lock cache non disponibile per %s: %s", cache_key, e)
+        yield
+        return
+    with handle:
+        deadline = time.monotonic() + timeout
+        locked = False
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    logger.warning("Timeout lock cache %s dopo %.0f s: procedo senza lock", cache_key, timeout)
+                    break
+                time.sleep(_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            if locked:
+                fcntl.flock(handle, fcntl.LOCK_UN)
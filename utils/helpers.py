@@ -6,6 +6,11 @@ import plotly.graph_objects as go
 from utils.telemetry import lap_duration_seconds_from_row
 
 
+def as_text(value) -> str:
+    """Testo di una cella, ``""`` se mancante: nelle colonne categoriche i valori assenti sono NaN (che è "vero")."""
+    return value if isinstance(value, str) else ""
+
+
 def driver_label(num: int, df_drivers: pd.DataFrame) -> str:
     """Restituisce un'etichetta leggibile per il pilota."""
     if df_drivers.empty:
@@ -14,8 +19,8 @@ def driver_label(num: int, df_drivers: pd.DataFrame) -> str:
     if row.empty:
         return f"Driver #{int(num)}"
     row = row.iloc[0]
-    full_name = row.get("full_name") or row.get("name_acronym") or ""
-    team = row.get("team_name") or ""
+    full_name = as_text(row.get("full_name")) or as_text(row.get("name_acronym"))
+    team = as_text(row.get("team_name"))
     if full_name and team:
         return f"#{int(num)} - {full_name} ({team})"
     if full_name:
@@ -25,6 +25,26 @@ TRANSLATIONS = {
         "move_down": "Sposta giù",
         "reset_order": "Reset ordine",
         "print_pdf": "Stampa PDF",
+        "clear_cache": "🗑 Svuota cache",
+        "clear_session_cache": "🗑 Sessione",
+        "clear_endpoint_cache": "🗑 Endpoint",
+        "cache_endpoint_placeholder": "Endpoint in cache",
+        "cache_size": "💾 Cache: {size:.2f} / {limit} MB ({entries} voci, {hits} letture)",
+        "cache_cleared": "✅ Cache svuotato!",
+        "cache_invalidated": "✅ {target}: {count} voci rimosse",
+        "cache_evicted": "{count} voci rimosse per spazio",
+        "cache_snapshot": "Snapshot: {hits} letture ({entries} voci)",
+        "cache_kv": "Cache condivisa: {hits} letture",
+        "cache_kv_down": "Cache condivisa non raggiungibile ({errors} errori), {hits} letture",
+        "cache_negative": "404/vuote: {hits} evitate, {stored} salvate",
+        "cache_revalidated": "304: {saved:.2f} MB risparmiati",
+        "cache_memory": "RAM: {hits} hit, {misses} miss, {evictions} rimosse ({size:.1f} MB)",
+        "cache_rate_limit": "Rate limit: {requests} richieste, {waited} in attesa (max {max_wait:.1f} s)",
+        "cache_breaker": "Circuit breaker: {opened} aperture, {rejected} richieste rifiutate, {failures} errori",
+        "cache_breaker_open": "Circuit breaker aperto: {opened} aperture, {rejected} richieste rifiutate, {failures} errori",
+        "cache_single_flight": "Richieste unite: {coalesced} su {total}",
+        "stale_banner_open": "⚠ OpenF1 non risponde: i dati mostrati vengono dalla cache e potrebbero non essere aggiornati.",
+        "stale_banner_refresh": "⟳ Alcuni dati mostrati vengono dalla cache scaduta e sono in aggiornamento in background.",
         "status_select_session": "Seleziona una sessione.",
         "status_no_laps": "Nessun giro trovato.",
         "status_laps_summary": "Laps: {laps} | Drivers: {drivers} | Max lap: {max_lap}",
@@ -154,6 +174,26 @@ TRANSLATIONS = {
         "move_down": "Move Down",
         "reset_order": "Reset order",
         "print_pdf": "Print PDF",
+        "clear_cache": "🗑 Clear cache",
+        "clear_session_cache": "🗑 Session",
+        "clear_endpoint_cache": "🗑 Endpoint",
+        "cache_endpoint_placeholder": "Cached endpoint",
+        "cache_size": "💾 Cache: {size:.2f} / {limit} MB ({entries} entries, {hits} reads)",
+        "cache_cleared": "✅ Cache cleared!",
+        "cache_invalidated": "✅ {target}: {count} entries removed",
+        "cache_evicted": "{count} entries evicted for space",
+        "cache_snapshot": "Snapshot: {hits} reads ({entries} entries)",
+        "cache_kv": "Shared cache: {hits} reads",
+        "cache_kv_down": "Shared cache unreachable ({errors} errors), {hits} reads",
+        "cache_negative": "404/empty: {hits} avoided, {stored} stored",
+        "cache_revalidated": "304: {saved:.2f} MB saved",
+        "cache_memory": "RAM: {hits} hits, {misses} misses, {evictions} evicted ({size:.1f} MB)",
+        "cache_rate_limit": "Rate limit: {requests} requests, {waited} waited (max {max_wait:.1f} s)",
+        "cache_breaker": "Circuit breaker: {opened} trips, {rejected} requests rejected, {failures} errors",
+        "cache_breaker_open": "Circuit breaker open: {opened} trips, {rejected} requests rejected, {failures} errors",
+        "cache_single_flight": "Coalesced requests: {coalesced} of {total}",
+        "stale_banner_open": "⚠ OpenF1 is not responding: data shown comes from the cache and may be out of date.",
+        "stale_banner_refresh": "⟳ Some data shown comes from the expired cache and is being refreshed in the background.",
         "status_select_session": "Select a session.",
         "status_no_laps": "No laps found.",
         "status_laps_summary": "Laps: {laps} | Drivers: {drivers} | Max lap: {max_lap}",
@@ -0,0 +1,106 @@
+"""Cache per intervalli temporali degli endpoint con filtro ``date``.
+
+Per ogni (endpoint, sessione, pilota) tiene un indice dei segmenti già scaricati:
+ogni segmento copre un intervallo ``[inizio, fine]`` e i suoi record sono salvati
+in una voce di cache separata, salvata quando la risposta in streaming è completa.
+Una richiesta contenuta negli intervalli coperti viene servita localmente; per
+le altre vengono calcolati solo i "buchi" mancanti da scaricare.
+
+Gli intervalli sono in nanosecondi UTC; ``UNBOUNDED_START`` e ``UNBOUNDED_END``
+rappresentano una richiesta senza limite su quel lato (es. l'intera sessione).
+I segmenti scaduti o rimossi dalla cache smettono semplicemente di coprire il
+loro intervallo. I segmenti non hanno validatori HTTP: scadono solo per le
+sessioni recenti o in corso (vedi ``cache_ttl_hours``) e vengono riscaricati.
+"""
+
+import logging
+import threading
+
+from utils.cache import CACHE_EXPIRY_HOURS, NEGATIVE_TTL_HOURS, cached_keys, get_cache_key, load_from_cache, save_to_cache
+
+logger = logging.getLogger(__name__)
+
+UNBOUNDED_START = -(2**63)
+UNBOUNDED_END = 2**63 - 1
+
+_entry_locks: dict[str, threading.Lock] = {}
+_entry_locks_guard = threading.Lock()
+
+
+def entry_key(endpoint: str, params: dict) -> str:
+    return get_cache_key(f"interval_{endpoint}", **params)
+
+
+def entry_lock(key: str) -> threading.Lock:
+    """Lock per voce, per serializzare lettura-fusione-scrittura della stessa voce."""
+    with _entry_locks_guard:
+        return _entry_locks.setdefault(key, threading.Lock())
+
+
+def segment_key(key: str, start: int, end: int) -> str:
+    return f"{key}_segment={start}-{end}"
+
+
+def load_entry(key: str, ttl_hours: float | None = CACHE_EXPIRY_HOURS) -> dict:
+    """Carica l'indice dei segmenti, scartando quelli la cui voce non è più in cache.
+
+    I segmenti vuoti (404 o nessuna riga) scadono come le voci negative, a meno
+    che la sessione sia ormai immutabile (``ttl_hours=None``).
+    """
+    entry = load_from_cache(key, ttl_hours)
+    if not isinstance(entry, dict) or not isinstance(entry.get("segments"), list):
+        return {"segments": []}
+    empty_ttl_hours = None if ttl_hours is None else min(ttl_hours, NEGATIVE_TTL_HOURS)
+    # Una verifica a blocchi per i segmenti con righe e una per quelli vuoti (TTL diversi)
+    cached = cached_keys([segment["key"] for segment in entry["segments"] if segment.get("rows")], ttl_hours)
+    cached |= cached_keys([segment["key"] for segment in entry["segments"] if not segment.get("rows")], empty_ttl_hours)
+    entry["segments"] = [segment for segment in entry["segments"] if segment["key"] in cached]
+    return entry
+
+
+def save_entry(key: str, entry: dict) -> None:
+    save_to_cache(key, entry)
+
+
+def add_segment(entry: dict, start: int, end: int, key: str, rows: int) -> None:
+    entry["segments"].append({"start": start, "end": end, "key": key, "rows": rows})
+
+
+def covered_ranges(entry: dict) -> list[list[int]]:
+    return merge_ranges([[segment["start"], segment["end"]] for segment in entry["segments"]])
+
+
+def overlapping_segments(entry: dict, start: int, end: int) -> list[dict]:
+    """Segmenti che intersecano ``[start, end]``, in ordine di inizio."""
+    segments = [segment for segment in entry["segments"] if segment["start"] <= end and segment["end"] >= start]
+    return sorted(segments, key=lambda segment: segment["start"])
+
+
+def merge_ranges(ranges: list[list[int]]) -> list[list[int]]:
+    """Unisce intervalli sovrapposti o adiacenti."""
+    merged: list[list[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(ranges: list[list[int]], start: int, end: int) -> list[list[int]]:
+    """Restituisce le parti di ``[start, end]`` non coperte dagli intervalli in cache."""
+    gaps = []
+    cursor = start
+    for cached_start, cached_end in merge_ranges(ranges):
+        if cached_end < cursor:
+            continue
+        if cached_start > end:
+            break
+        if cached_start > cursor:
+            gaps.append([cursor, cached_start])
+        cursor = max(cursor, cached_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append([cursor, end])
+    return gaps
@@ -0,0 +1,83 @@
+"""Decodifica incrementale di array JSON in blocchi di DataFrame.
+
+Permette di leggere risposte (o file di cache) con centinaia di migliaia di
+record senza tenere in memoria né l'intero testo né l'intera lista di dict:
+i record vengono decodificati uno alla volta e accumulati in buffer per colonna,
+poi restituiti come DataFrame di al massimo ``chunk_rows`` righe.
+"""
+
+import codecs
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+import pandas as pd
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """Restituisce uno alla volta gli elementi di un array JSON letto a blocchi di byte."""
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+
+    def pending():
+        yield from chunks
+        yield None  # fine dello stream
+
+    for chunk in pending():
+        final = chunk is None
+        buf = buf[pos:] + text_decoder.decode(chunk or b"", final=final)
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            char = buf[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError("Risposta JSON non valida: atteso un array")
+                started = True
+                pos += 1
+                continue
+            if char == ",":
+                pos += 1
+                continue
+            if char == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # elemento incompleto: serve il blocco successivo
+            if end == len(buf) and not isinstance(item, (dict, list)) and not final:
+                break  # un numero a fine buffer potrebbe continuare nel blocco successivo
+            yield item
+            pos = end
+
+    if not started:
+        return
+    raise ValueError("Risposta JSON troncata: array non chiuso")
+
+
+def iter_frames(records: Iterable[dict], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Accumula i record in buffer per colonna e restituisce DataFrame di ``chunk_rows`` righe."""
+    buffers: dict[str, list] = {}
+    rows = 0
+    for record in records:
+        for key in record:
+            if key not in buffers:
+                buffers[key] = [None] * rows
+        for key, column in buffers.items():
+            column.append(record.get(key))
+        rows += 1
+        if rows >= chunk_rows:
+            yield pd.DataFrame(buffers)
+            buffers = {key: [] for key in buffers}
+            rows = 0
+    if rows:
+        yield pd.DataFrame(buffers)
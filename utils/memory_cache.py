@@ -0,0 +1,89 @@
+"""Livello in memoria (LRU) davanti alla cache su file.
+
+Conserva i DataFrame già costruiti per chiave di cache, così le callback che
+rileggono lo stesso endpoint nello stesso processo (es. stint e pit a ogni
+cambio pilota) non rileggono né ricostruiscono il file. Il limite è in byte
+(``CACHE_MEMORY_MAX_MB``, misurato con ``memory_usage(deep=True)``) e vengono
+rimosse per prime le voci usate meno di recente.
+
+Ogni voce ha la stessa scadenza della voce su file da cui proviene. ``get``
+restituisce una copia superficiale: aggiungere o sostituire colonne non tocca
+il DataFrame condiviso.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from config import CACHE_MEMORY_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, tuple[pd.DataFrame, int, float | None]]" = OrderedDict()
+_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _max_bytes() -> int:
+    return int(CACHE_MEMORY_MAX_MB * 1024 * 1024)
+
+
+def get(key: str) -> pd.DataFrame | None:
+    """DataFrame in memoria per ``key``, o ``None`` se assente o scaduto."""
+    global _bytes
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[2] is not None and time.time() >= entry[2]:
+            del _entries[key]
+            _bytes -= entry[1]
+            entry = None
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+    return entry[0].copy(deep=False)
+
+
+def put(key: str, df: pd.DataFrame, expires_at: float | None) -> None:
+    """Inserisce ``df`` fino a ``expires_at`` (epoch, ``None`` = non scade), rimuovendo le voci LRU oltre il limite."""
+    global _bytes
+    size = int(df.memory_usage(deep=True).sum())
+    if size > _max_bytes():
+        return
+    with _lock:
+        previous = _entries.pop(key, None)
+        if previous is not None:
+            _bytes -= previous[1]
+        _entries[key] = (df, size, expires_at)
+        _bytes += size
+        while _bytes > _max_bytes() and _entries:
+            evicted_key, (_, evicted_size, _) = _entries.popitem(last=False)
+            _bytes -= evicted_size
+            _stats["evictions"] += 1
+            logger.debug("Cache RAM EVICT: %s (%d byte)", evicted_key, evicted_size)
+
+
+def invalidate(key: str) -> None:
+    global _bytes
+    with _lock:
+        entry = _entries.pop(key, None)
+        if entry is not None:
+            _bytes -= entry[1]
+
+
+def clear() -> None:
+    global _bytes
+    with _lock:
+        _entries.clear()
+        _bytes = 0
+
+
+def get_stats() -> dict:
+    """Hit, miss ed eviction del processo, con voci e byte occupati."""
+    with _lock:
+        return {**_stats, "entries": len(_entries), "bytes": _bytes}
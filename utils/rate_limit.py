@@ -0,0 +1,159 @@
+"""Rate limiter a token bucket condiviso tra i worker per le chiamate OpenF1.
+
+Lo stato del bucket (token disponibili e ultimo refill) vive in un piccolo file
+binario protetto da ``flock``: tutti i processi gunicorn sulla stessa macchina
+consumano dallo stesso bucket. Dove ``fcntl`` non esiste (Windows) il bucket
+resta locale al processo.
+
+Due corsie di priorità:
+- ``interactive`` (default): richieste dei callback Dash;
+- ``background``: prefetch/backfill, che lascia sempre ``API_RATE_LIMIT_BACKGROUND_RESERVE``
+  token liberi per le richieste interattive e cede il passo a quelle in attesa.
+"""
+
+import contextlib
+import contextvars
+import logging
+import os
+import struct
+import threading
+import time
+
+from config import (
+    API_RATE_LIMIT_BACKGROUND_RESERVE,
+    API_RATE_LIMIT_BURST,
+    API_RATE_LIMIT_PER_SECOND,
+    API_RATE_LIMIT_STATE_FILE,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+_STATE = struct.Struct("dd")  # token disponibili, timestamp ultimo refill
+_MAX_SLEEP_SECONDS = 0.25
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("openf1_priority", default=INTERACTIVE)
+_thread_lock = threading.Lock()
+_state_fd: int | None = None
+_local_state = [float(API_RATE_LIMIT_BURST), time.time()]
+_interactive_waiting = 0
+_stats = {lane: {"requests": 0, "waited": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0} for lane in LANES}
+
+
+@contextlib.contextmanager
+def priority(lane: str):
+    """Imposta la corsia di priorità per le richieste eseguite nel blocco."""
+    if lane not in LANES:
+        raise ValueError(f"corsia di priorità sconosciuta: {lane}")
+    token = _priority.set(lane)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def _open_state_file() -> int | None:
+    global _state_fd
+    if fcntl is None:
+        return None
+    if _state_fd is None:
+        try:
+            API_RATE_LIMIT_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _state_fd = os.open(API_RATE_LIMIT_STATE_FILE, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            logger.warning("Rate limiter condiviso non disponibile (%s), uso bucket locale", e)
+            return None
+    return _state_fd
+
+
+@contextlib.contextmanager
+def _locked_state():
+    """Blocca il bucket (thread + processi) e restituisce ``[token, ultimo_refill]`` modificabile."""
+    with _thread_lock:
+        fd = _open_state_file()
+        if fd is None:
+            yield _local_state
+            return
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            raw = os.pread(fd, _STATE.size, 0)
+            state = list(_STATE.unpack(raw)) if len(raw) == _STATE.size else [float(API_RATE_LIMIT_BURST), time.time()]
+            yield state
+            os.pwrite(fd, _STATE.pack(*state), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _refill(state: list, now: float) -> None:
+    elapsed = max(0.0, now - state[1])
+    state[0] = min(float(API_RATE_LIMIT_BURST), state[0] + elapsed * API_RATE_LIMIT_PER_SECOND)
+    state[1] = now
+
+
+def acquire() -> float:
+    """Attende un token per la corsia corrente; restituisce i secondi di attesa."""
+    if API_RATE_LIMIT_PER_SECOND <= 0:
+        return 0.0
+
+    global _interactive_waiting
+    lane = current_priority()
+    needed = 1.0 if lane == INTERACTIVE else 1.0 + API_RATE_LIMIT_BACKGROUND_RESERVE
+    started = time.monotonic()
+    waiting_registered = False
+
+    try:
+        while True:
+            with _locked_state() as state:
+                _refill(state, time.time())
+                # Le richieste di background cedono il passo a quelle interattive in attesa nel processo
+                yield_to_interactive = lane == BACKGROUND and _interactive_waiting > 0
+                if state[0] >= needed and not yield_to_interactive:
+                    state[0] -= 1.0
+                    break
+                wait = max((needed - state[0]) / API_RATE_LIMIT_PER_SECOND, 0.01)
+            if lane == INTERACTIVE and not waiting_registered:
+                with _thread_lock:
+                    _interactive_waiting += 1
+                waiting_registered = True
+            time.sleep(min(wait, _MAX_SLEEP_SECONDS))
+    finally:
+        if waiting_registered:
+            with _thread_lock:
+                _interactive_waiting -= 1
+
+    waited = time.monotonic() - started
+    with _thread_lock:
+        lane_stats = _stats[lane]
+        lane_stats["requests"] += 1
+        if waited > 0.001:
+            lane_stats["waited"] += 1
+            lane_stats["wait_seconds"] += waited
+            lane_stats["max_wait_seconds"] = max(lane_stats["max_wait_seconds"], waited)
+    return waited
+
+
+def penalize(seconds: float) -> None:
+    """Svuota il bucket per ``seconds`` (es. ``Retry-After`` di un 429), per tutti i worker."""
+    if API_RATE_LIMIT_PER_SECOND <= 0 or seconds <= 0:
+        return
+    with _locked_state() as state:
+        _refill(state, time.time())
+        state[0] = min(state[0], 0.0) - seconds * API_RATE_LIMIT_PER_SECOND
+
+
+def get_stats() -> dict:
+    """Metriche di attesa per corsia (processo corrente)."""
+    with _thread_lock:
+        return {lane: dict(values) for lane, values in _stats.items()}
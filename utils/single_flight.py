@@ -0,0 +1,57 @@
+"""Coalescenza delle richieste concorrenti (single-flight) all'interno del processo.
+
+Se più thread (callback Dash, thread dei worker gunicorn) chiedono la stessa
+chiave mentre una richiesta è già in corso, solo il primo la esegue: gli altri
+attendono e ricevono lo stesso risultato (o la stessa eccezione).
+"""
+
+import threading
+
+_lock = threading.Lock()
+_in_flight: dict[str, "_Call"] = {}
+_stats = {"executed": 0, "coalesced": 0}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def do(key: str, fn):
+    """Esegue ``fn()`` una sola volta per ``key`` tra i chiamanti concorrenti."""
+    with _lock:
+        call = _in_flight.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = _Call()
+            _in_flight[key] = call
+            _stats["executed"] += 1
+        else:
+            _stats["coalesced"] += 1
+
+    if not is_leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = fn()
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            _in_flight.pop(key, None)
+        call.done.set()
+
+
+def get_stats() -> dict:
+    """Contatori: richieste eseguite e richieste coalescite su una già in corso."""
+    with _lock:
+        return {**_stats, "in_flight": len(_in_flight)}
@@ -45,6 +45,13 @@ def parse_time_str(s):
         return None
 
 
+def timestamp_to_ns(value) -> int:
+    """Converte una data (stringa ISO o Timestamp) in nanosecondi UTC; le date naive sono assunte UTC."""
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.value
+
+
 def fmt_duration(s: float | None) -> str:
     """Formatta durata da secondi a hh:mm:ss.sss (millisecondi, 3 cifre)."""
     if s is None:
@@ -0,0 +1,85 @@
+"""Archivio in memoria della telemetria di sessione in formato colonnare.
+
+Per ogni (endpoint, sessione, pilota) conserva un array NumPy per colonna,
+ordinato per timestamp (``date`` in nanosecondi UTC). I frame per giro vengono
+ritagliati localmente con una ricerca binaria sulla colonna ``date``.
+
+Ogni voce ha la stessa scadenza delle colonne in cache da cui proviene: una
+volta scaduta viene trattata come assente e riletta (o riscaricata).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import TELEMETRY_STORE_MAX_ENTRIES
+from utils.telemetry import timestamp_to_ns
+
+logger = logging.getLogger(__name__)
+
+_store: "OrderedDict[tuple, tuple[dict[str, np.ndarray], float | None]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def build_columns(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Converte un DataFrame di telemetria in colonne NumPy ordinate per ``date`` (int64 ns UTC).
+
+    I dtype delle altre colonne vengono mantenuti (es. quelli compatti dello schema).
+    """
+    if df.empty or "date" not in df.columns:
+        return {}
+
+    dates = pd.to_datetime(df["date"], errors="coerce", utc=True, format="ISO8601")
+    df = df.assign(date=dates).dropna(subset=["date"]).sort_values("date", kind="stable")
+    columns = {"date": df["date"].to_numpy(dtype="datetime64[ns]").view("int64")}
+    for col in df.columns:
+        if col != "date":
+            columns[col] = df[col].to_numpy()
+    return columns
+
+
+def slice_columns(columns: dict[str, np.ndarray], date_start, date_end) -> dict[str, np.ndarray]:
+    """Restituisce le righe con ``date_start < date < date_end`` come viste sugli array."""
+    if not columns:
+        return {}
+    dates = columns["date"]
+    lo = np.searchsorted(dates, timestamp_to_ns(date_start), side="right")
+    hi = np.searchsorted(dates, timestamp_to_ns(date_end), side="left")
+    return {col: values[lo:hi] for col, values in columns.items()}
+
+
+def get_columns(key: tuple) -> dict[str, np.ndarray] | None:
+    """Colonne in memoria per ``key``, o ``None`` se assenti o scadute."""
+    with _lock:
+        entry = _store.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and time.time() >= entry[1]:
+            del _store[key]
+            return None
+        _store.move_to_end(key)
+        return entry[0]
+
+
+def put_columns(key: tuple, columns: dict[str, np.ndarray], expires_at: float | None) -> None:
+    """Conserva ``columns`` fino a ``expires_at`` (epoch, ``None`` = non scade)."""
+    with _lock:
+        _store[key] = (columns, expires_at)
+        _store.move_to_end(key)
+        while len(_store) > TELEMETRY_STORE_MAX_ENTRIES:
+            evicted, _ = _store.popitem(last=False)
+            logger.debug("Telemetry store: rimosso %s", evicted)
+
+
+def discard(key: tuple) -> None:
+    with _lock:
+        _store.pop(key, None)
+
+
+def clear_store() -> None:
+    with _lock:
+        _store.clear()